@@ -0,0 +1,75 @@
+"""
+Общие средства для команд-бенчмарков: временная база данных, перцентили и
+сравнение результатов с базовыми.
+"""
+
+import math
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.db import connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+# Кеш ответов отключается, чтобы измерять обработку запроса, а не попадания в кеш.
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+@contextmanager
+def benchmark_database(alias='default'):
+    """
+    Создает пустую тестовую базу данных со всеми миграциями и удаляет ее
+    после выхода из блока. Рабочая база при этом не затрагивается. Для SQLite
+    база создается во временном файле, а не в памяти, чтобы к ней могли
+    обращаться несколько потоков.
+    """
+    connection = connections[alias]
+    setup_test_environment()
+    with tempfile.TemporaryDirectory() as directory:
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        old_test_name = test_settings.get('NAME')
+        if connection.vendor == 'sqlite':
+            test_settings['NAME'] = str(Path(directory) / 'benchmark.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            yield connection
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings['NAME'] = old_test_name
+            teardown_test_environment()
+
+
+def percentile(samples, point):
+    """Перцентиль `point` (0-100) по методу ближайшего ранга."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(point / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def percentiles(samples, points=(50, 90, 99)):
+    """Возвращает словарь {'p50': ..., 'p90': ..., 'p99': ...}."""
+    return {f'p{point}': percentile(samples, point) for point in points}
+
+
+def compare_results(results, baseline, tolerance):
+    """
+    Сравнивает результаты {режим: {эндпоинт: метрики}} с базовыми. Возвращает
+    список регрессий: число SQL-запросов не должно расти, медианная задержка
+    и пиковая память - расти больше чем на долю `tolerance`.
+    """
+    regressions = []
+    for mode, endpoints in results.items():
+        for endpoint, metrics in endpoints.items():
+            base = baseline.get(mode, {}).get(endpoint)
+            if base is None:
+                continue
+            for name, allowed in (('queries', 0), ('p50_ms', tolerance), ('peak_memory_kb', tolerance)):
+                current, previous = metrics.get(name), base.get(name)
+                if current is None or previous is None:
+                    continue
+                if current > previous * (1 + allowed):
+                    regressions.append(f'{mode} {endpoint}: {name} {previous} -> {current}')
+    return regressions
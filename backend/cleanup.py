@@ -0,0 +1,39 @@
+"""
+Пакетное удаление устаревших строк.
+
+Один DELETE по большой выборке держит блокировку записи SQLite на все время
+удаления, а на PostgreSQL создает длинную транзакцию, за время которой
+autovacuum не может убрать мертвые строки. delete_in_batches() удаляет
+выборку пачками ограниченного размера, каждую в своей транзакции, с паузой
+между ними, чтобы успевали пройти запросы других процессов.
+"""
+
+import time
+
+from django.db import transaction
+
+
+def delete_in_batches(queryset, batch_size, pause=0.0):
+    """
+    Удаляет записи `queryset` пачками по `batch_size`. Сигналы удаления и
+    каскадные удаления работают как при обычном delete(). Возвращает число
+    удаленных записей модели queryset.
+    """
+    model = queryset.model
+    using = queryset.db
+    # Без сортировки планировщик выбирает строки по индексу условия.
+    ids = queryset.order_by().values_list('pk', flat=True)
+    total = 0
+    while True:
+        batch = list(ids[:batch_size])
+        if not batch:
+            return total
+        with transaction.atomic(using=using):
+            _, deleted = model._base_manager.using(using).filter(pk__in=batch).delete()
+        count = deleted.get(model._meta.label, 0)
+        if not count:
+            # Строки удалены параллельно или удаление ничего не изменило.
+            return total
+        total += count
+        if pause and len(batch) == batch_size:
+            time.sleep(pause)
@@ -0,0 +1,134 @@
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from rest_framework import permissions
+
+PRIMARY_DB = 'default'
+PIN_COOKIE = 'db_pin_primary'
+
+# Состояние маршрутизации текущего запроса. Вне запроса (команды, shell)
+# состояния нет, и все запросы к базе идут на основной сервер.
+_routing_state = ContextVar('db_routing_state', default=None)
+
+
+class RoutingState:
+    """Решение о маршрутизации, принятое для одного HTTP-запроса."""
+
+    def __init__(self):
+        self.use_replica = False
+        self.pinned = False
+
+
+def get_replicas():
+    return [alias for alias in settings.DATABASES if alias != PRIMARY_DB]
+
+
+class PrimaryReplicaRouter:
+    """
+    Отправляет чтения моделей `education` на реплики, а запись - на основной сервер.
+
+    Реплика используется только если ReplicaRoutingMiddleware разрешил ее для
+    текущего запроса и в этом запросе еще не было записи. После первой записи
+    все последующие чтения запроса закрепляются за основным сервером, чтобы
+    не прочитать устаревшие из-за задержки репликации данные.
+    """
+
+    replica_apps = {'education'}
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is None or not state.use_replica or state.pinned:
+            return PRIMARY_DB
+        if model._meta.app_label not in self.replica_apps:
+            return PRIMARY_DB
+        replicas = get_replicas()
+        return random.choice(replicas) if replicas else PRIMARY_DB
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.pinned = True
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Все базы содержат одни и те же данные.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема реплик приходит с основного сервера репликацией, поэтому
+        # migrate --database=replicaN ничего не создает.
+        if db != PRIMARY_DB:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Разрешает чтение с реплик для безопасных запросов к ViewSet приложения `education`.
+
+    После запроса с записью клиенту ставится cookie, и в течение
+    DATABASE_REPLICA_PIN_SECONDS его запросы читают с основного сервера,
+    чтобы сразу видеть свои изменения.
+    """
+
+    # Поддерживает и ASGI: иначе Django выполнял бы в потоке всю цепочку
+    # после этого middleware, включая асинхронные представления.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RoutingState()
+        token = _routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+        return self.pin_primary(state, response)
+
+    async def __acall__(self, request):
+        state = RoutingState()
+        token = _routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+        return self.pin_primary(state, response)
+
+    def pin_primary(self, state, response):
+        if state.pinned and get_replicas():
+            response.set_cookie(
+                PIN_COOKIE, str(int(time.time())),
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.route(request, view_func)
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        # Асинхронный вариант, чтобы Django не переносил вызов в поток.
+        self.route(request, view_func)
+        return None
+
+    def route(self, request, view_func):
+        state = _routing_state.get()
+        # ViewSet DRF хранит класс в view_func.cls, представления Django - в view_class.
+        view_cls = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+        state.use_replica = (
+            request.method in permissions.SAFE_METHODS
+            and view_cls is not None
+            and view_cls.__module__.startswith('education.')
+            and PIN_COOKIE not in request.COOKIES
+        )
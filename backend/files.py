@@ -0,0 +1,114 @@
+"""
+Отдача файлов из хранилища.
+
+Файлы из локального хранилища отдаются через FileResponse с поддержкой
+одного диапазона Range (продолжение скачивания, просмотр PDF по частям) либо
+передаются веб-серверу заголовком X-Accel-Redirect (nginx) или X-Sendfile
+(Apache, lighttpd), см. FILE_DOWNLOAD_OFFLOAD. Для удаленных хранилищ (S3)
+клиент перенаправляется на временную ссылку хранилища.
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect
+from django.utils.http import content_disposition_header
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class FileRange:
+    """Файл, из которого читается только диапазон [start, start + length)."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Возвращает (начало, конец) включительно для заголовка Range или None,
+    если заголовка нет или он не поддерживается (несколько диапазонов) -
+    тогда отдается весь файл.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    elif last:
+        start, end = max(size - int(last), 0), size - 1
+        if not int(last):
+            raise RangeNotSatisfiable
+    else:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    return start, end
+
+
+def file_response(request, field_file, filename=None):
+    """Ответ с содержимым файла FileField (см. описание модуля)."""
+    storage, name = field_file.storage, field_file.name
+    filename = filename or os.path.basename(name)
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        return HttpResponseRedirect(storage.url(name))
+    if not os.path.isfile(path):
+        raise Http404('Файл не найден.')
+
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    offload = settings.FILE_DOWNLOAD_OFFLOAD
+    if offload in ('x-accel-redirect', 'x-sendfile'):
+        # Диапазоны и условные запросы обрабатывает веб-сервер.
+        response = HttpResponse(content_type=content_type)
+        if offload == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = quote(settings.FILE_DOWNLOAD_ACCEL_PREFIX + name)
+        else:
+            response['X-Sendfile'] = path
+        response['Content-Disposition'] = content_disposition_header(False, filename)
+        return response
+
+    size = os.path.getsize(path)
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size)
+    except RangeNotSatisfiable:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), filename=filename, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            FileRange(open(path, 'rb'), start, end - start + 1),
+            filename=filename, content_type=content_type, status=206,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    return response
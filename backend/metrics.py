@@ -0,0 +1,341 @@
+"""
+Метрики производительности запросов.
+
+PerformanceMetricsMiddleware измеряет для каждого действия ViewSet (или
+именованного URL) полное время запроса, число и время SQL-запросов, время
+сериализации и рендеринга и размер ответа. Значения складываются в
+гистограммы в памяти процесса и отдаются в формате Prometheus на /metrics.
+При нескольких процессах (gunicorn) у каждого свои гистограммы.
+
+SQL считается обертками execute_wrapper, которые ставятся на соединения при
+их открытии и находят метрики текущего запроса через ContextVar - поэтому
+учитываются и запросы async-представлений, выполняемые в потоках.
+Время сериализации отмечают сами сериализаторы (SerializationTimingMixin,
+быстрые сериализаторы) через phase(); SQL внутри фазы из нее вычитается.
+
+Часть запросов (METRICS_SLOW_SAMPLE_RATE) записывается вместе с SQL, и если
+такой запрос дольше METRICS_SLOW_REQUEST_MS, он пишется в лог
+backend.metrics.slow.
+"""
+
+import bisect
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger('backend.metrics.slow')
+
+_request_metrics = ContextVar('request_metrics', default=None)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# {имя: (описание, границы корзин)}
+HISTOGRAMS = {
+    'http_request_duration_seconds': ('Полное время обработки запроса.', DURATION_BUCKETS),
+    'http_request_db_queries': ('Число SQL-запросов.', QUERY_BUCKETS),
+    'http_request_db_duration_seconds': ('Время SQL-запросов.', DURATION_BUCKETS),
+    'http_request_serialization_seconds': ('Время сериализации без SQL.', DURATION_BUCKETS),
+    'http_request_render_seconds': ('Время рендеринга ответа без SQL.', DURATION_BUCKETS),
+    'http_response_size_bytes': ('Размер тела ответа.', SIZE_BUCKETS),
+}
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами, как histogram в Prometheus."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Registry:
+    """Гистограммы и счетчик запросов с метками; обновляются под блокировкой."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.requests = {}
+
+    def record(self, labels, status, values):
+        with self.lock:
+            key = labels + (('status', str(status)),)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            for name, value in values.items():
+                histogram = self.histograms.get((name, labels))
+                if histogram is None:
+                    histogram = self.histograms[(name, labels)] = Histogram(HISTOGRAMS[name][1])
+                histogram.observe(value)
+
+    def clear(self):
+        with self.lock:
+            self.histograms.clear()
+            self.requests.clear()
+
+    def render(self):
+        """Текст в формате экспозиции Prometheus 0.0.4."""
+        lines = [
+            '# HELP http_requests_total Число обработанных запросов.',
+            '# TYPE http_requests_total counter',
+        ]
+        with self.lock:
+            for labels, count in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{format_labels(labels)} {count}')
+            for name, (description, buckets) in HISTOGRAMS.items():
+                lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+                for (metric, labels), histogram in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    total = 0
+                    for bound, count in zip((*buckets, '+Inf'), histogram.counts):
+                        total += count
+                        lines.append(f'{name}_bucket{format_labels(labels + (("le", str(bound)),))} {total}')
+                    lines.append(f'{name}_sum{format_labels(labels)} {histogram.sum!r}')
+                    lines.append(f'{name}_count{format_labels(labels)} {total}')
+        return '\n'.join(lines) + '\n'
+
+
+def format_labels(labels):
+    def escape(value):
+        return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in labels) + '}'
+
+
+registry = Registry()
+
+
+class RequestMetrics:
+    """Измерения одного запроса."""
+
+    def __init__(self, capture_sql):
+        self.endpoint = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.phases = {'serialization': 0.0, 'render': 0.0}
+        self.active = {}
+        # SQL записывается только для выбранных запросов: (время, sql, число
+        # параметров). Значения параметров не сохраняются: среди них хеши
+        # паролей, токены и персональные данные.
+        self.sql = [] if capture_sql else None
+
+    def start(self, name):
+        if name not in self.active:
+            self.active[name] = (time.perf_counter(), self.db_time)
+
+    def stop(self, name):
+        started, db_time = self.active.pop(name)
+        self.phases[name] += time.perf_counter() - started - (self.db_time - db_time)
+
+
+@contextmanager
+def phase(name):
+    """
+    Относит время блока к фазе запроса (serialization, render). Вложенные
+    блоки той же фазы не учитываются повторно; вне запроса ничего не делает.
+    """
+    metrics = _request_metrics.get()
+    if metrics is None or name in metrics.active:
+        yield
+        return
+    metrics.start(name)
+    try:
+        yield
+    finally:
+        metrics.stop(name)
+
+
+class SerializationTimingMixin:
+    """Относит to_representation сериализатора DRF к фазе сериализации."""
+
+    def to_representation(self, instance):
+        with phase('serialization'):
+            return super().to_representation(instance)
+
+
+def time_queries(execute, sql, params, many, context):
+    metrics = _request_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.queries += 1
+        metrics.db_time += elapsed
+        if metrics.sql is not None and len(metrics.sql) < settings.METRICS_SLOW_MAX_QUERIES:
+            metrics.sql.append((elapsed, sql, len(params) if params else 0))
+
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    if time_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_queries)
+
+
+def endpoint_name(request, view_func):
+    """'ViewSet.действие' для ViewSet DRF, иначе имя URL или класс представления."""
+    view_cls = getattr(view_func, 'cls', None)
+    actions = getattr(view_func, 'actions', None)
+    if view_cls is not None and actions:
+        action = actions.get(request.method.lower(), request.method.lower())
+        return f'{view_cls.__name__}.{action}'
+    match = request.resolver_match
+    if match is not None and match.url_name:
+        return match.url_name
+    view_cls = view_cls or getattr(view_func, 'view_class', None)
+    return view_cls.__name__ if view_cls is not None else view_func.__name__
+
+
+class PerformanceMetricsMiddleware:
+    """
+    Собирает метрики запроса (см. описание модуля). Должен стоять первым в
+    MIDDLEWARE, чтобы измерять работу остальных middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+            self.process_view = self.aprocess_view
+            self.process_template_response = self.aprocess_template_response
+        # Соединения, открытые до импорта модуля; новые получают обертку по сигналу.
+        for connection in connections.all(initialized_only=True):
+            install_query_timer(None, connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics, token, started = self.begin()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_metrics.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics, token, started = self.begin()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_metrics.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    def begin(self):
+        metrics = RequestMetrics(capture_sql=random.random() < settings.METRICS_SLOW_SAMPLE_RATE)
+        return metrics, _request_metrics.set(metrics), time.perf_counter()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        _request_metrics.get().endpoint = endpoint_name(request, view_func)
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        # Асинхронный вариант, чтобы Django не переносил вызов в поток.
+        _request_metrics.get().endpoint = endpoint_name(request, view_func)
+        return None
+
+    def process_template_response(self, request, response):
+        return self.time_render(response)
+
+    async def aprocess_template_response(self, request, response):
+        return self.time_render(response)
+
+    def time_render(self, response):
+        # Middleware стоит первым, поэтому process_template_response
+        # вызывается последним, сразу перед response.render().
+        metrics = _request_metrics.get()
+        metrics.start('render')
+        response.add_post_render_callback(lambda response: metrics.stop('render'))
+        return response
+
+    def finish(self, request, response, metrics, started):
+        labels = (('endpoint', metrics.endpoint or 'unresolved'), ('method', request.method))
+        values = {
+            'http_request_db_queries': metrics.queries,
+            'http_request_db_duration_seconds': metrics.db_time,
+            'http_request_serialization_seconds': metrics.phases['serialization'],
+            'http_request_render_seconds': metrics.phases['render'],
+        }
+
+        def record(size):
+            duration = time.perf_counter() - started
+            registry.record(labels, response.status_code, {
+                **values, 'http_request_duration_seconds': duration, 'http_response_size_bytes': size,
+            })
+            if metrics.sql is not None and duration * 1000 >= settings.METRICS_SLOW_REQUEST_MS:
+                log_slow_request(request, response, labels[0][1], duration, metrics)
+
+        if not response.streaming:
+            record(len(response.content))
+        elif response.has_header('Content-Length'):
+            # FileResponse: поток не оборачивается, чтобы сервер мог отдать файл через sendfile.
+            record(int(response['Content-Length']))
+        elif response.is_async:
+            response.streaming_content = acounted(response.streaming_content, record)
+        else:
+            # Потоковый ответ учитывается, когда клиент прочитал его целиком.
+            response.streaming_content = counted(response.streaming_content, record)
+        return response
+
+
+def counted(content, callback):
+    size = 0
+    for chunk in content:
+        size += len(chunk)
+        yield chunk
+    callback(size)
+
+
+async def acounted(content, callback):
+    size = 0
+    async for chunk in content:
+        size += len(chunk)
+        yield chunk
+    callback(size)
+
+
+def log_slow_request(request, response, endpoint, duration, metrics):
+    queries = '\n'.join(
+        f'  {elapsed * 1000:8.1f} мс  {sql}  [параметров: {count}]' for elapsed, sql, count in metrics.sql
+    )
+    logger.warning(
+        'Медленный запрос %s %s (%s): %.0f мс, статус %s, SQL: %d запросов за %.0f мс, '
+        'сериализация %.0f мс, рендеринг %.0f мс\n%s',
+        # Только путь: в строке запроса могут быть токены и персональные данные.
+        request.method, request.path, endpoint, duration * 1000, response.status_code,
+        metrics.queries, metrics.db_time * 1000, metrics.phases['serialization'] * 1000,
+        metrics.phases['render'] * 1000, queries,
+    )
+
+
+def metrics_view(request):
+    """
+    Метрики в формате Prometheus. Доступ - по токену METRICS_TOKEN
+    (Authorization: Bearer), а без него - только с адресов METRICS_ALLOWED_IPS.
+    """
+    if settings.METRICS_TOKEN:
+        allowed = request.headers.get('Authorization') == f'Bearer {settings.METRICS_TOKEN}'
+    else:
+        allowed = request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
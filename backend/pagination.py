@@ -0,0 +1,177 @@
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Курсорная (keyset) пагинация по сортировке из Meta.ordering модели.
+
+    К сортировке модели добавляется id, поэтому позиция в курсоре всегда
+    уникальна и страница выбирается условием WHERE по составному ключу,
+    а не через OFFSET. Глубокие страницы стоят столько же, сколько первая.
+    """
+
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-id',)
+    tie_breaker = 'id'
+
+    def get_ordering(self, request, queryset, view):
+        """Возвращает сортировку модели, дополненную уникальным id."""
+        ordering = list(queryset.model._meta.ordering) or list(self.ordering)
+
+        ordering_filters = [
+            filter_cls for filter_cls in getattr(view, 'filter_backends', [])
+            if hasattr(filter_cls, 'get_ordering')
+        ]
+        if ordering_filters:
+            ordering_from_filter = ordering_filters[0]().get_ordering(request, queryset, view)
+            if ordering_from_filter:
+                ordering = list(ordering_from_filter)
+
+        fields = [order.lstrip('-') for order in ordering]
+        if self.tie_breaker not in fields and 'pk' not in fields:
+            prefix = '-' if ordering[0].startswith('-') else ''
+            ordering.append(prefix + self.tie_breaker)
+
+        assert not any('__' in order for order in ordering), (
+            'Курсорная пагинация не поддерживает сортировку по связанным полям.'
+        )
+        return tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Вариант paginate_queryset для асинхронных представлений (async ORM)."""
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page([row async for row in queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """Запрос страницы: сортировка, условие по курсору и LIMIT."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (reverse, current_position) = (False, None)
+        else:
+            (_, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*self._reverse(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            queryset = queryset.filter(self._keyset_filter(current_position, reverse))
+
+        # Запрашиваем на одну запись больше, чтобы узнать, есть ли следующая страница.
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        """Запоминает страницу из результатов get_page_queryset() и позиции соседних страниц."""
+        if self.cursor is None:
+            (reverse, current_position) = (False, None)
+        else:
+            (_, reverse, current_position) = self.cursor
+
+        self.page = results[:self.page_size]
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = current_position is not None
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = current_position is not None
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_paginated_data(self, data):
+        return {'next': self.get_next_link(), 'previous': self.get_previous_link(), 'results': data}
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+        try:
+            values = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor._replace(position=values)
+
+    def encode_cursor(self, cursor):
+        if isinstance(cursor.position, list):
+            cursor = cursor._replace(position=json.dumps(cursor.position))
+        return super().encode_cursor(cursor)
+
+    def _get_position_from_instance(self, instance, ordering):
+        """Позиция записи - значения всех полей сортировки, включая id."""
+        position = []
+        for order in ordering:
+            field_name = order.lstrip('-')
+            if isinstance(instance, dict):
+                value = instance[field_name]
+            else:
+                value = getattr(instance, field_name)
+            position.append(value if isinstance(value, int) else str(value))
+        return position
+
+    def _keyset_filter(self, position, reverse):
+        """
+        Строит условие "строго после позиции" для составного ключа:
+        (a < x) OR (a = x AND b < y) OR ...
+        """
+        condition = Q()
+        for index, order in enumerate(self.ordering):
+            field_name = order.lstrip('-')
+            lookup = 'lt' if order.startswith('-') != reverse else 'gt'
+            equal = {
+                prev.lstrip('-'): value
+                for prev, value in zip(self.ordering[:index], position[:index])
+            }
+            condition |= Q(**equal, **{f'{field_name}__{lookup}': position[index]})
+        return condition
+
+    @staticmethod
+    def _reverse(ordering):
+        return tuple(order[1:] if order.startswith('-') else '-' + order for order in ordering)
@@ -0,0 +1,35 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson необязателен: без него используется стандартный json
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer, который рендерит ответы быстрых сериализаторов через orjson.
+
+    Представление помечает такие ответы атрибутом `fast_serialized`: их данные
+    состоят только из строк, чисел, None и вложенных списков и словарей, для
+    которых orjson выдает те же байты, что и json.dumps с настройками DRF
+    по умолчанию (UNICODE_JSON, COMPACT_JSON). Остальные ответы рендерятся
+    обычным JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        view = renderer_context.get('view')
+        if (
+            orjson is None
+            or data is None
+            or not getattr(view, 'fast_serialized', False)
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data)
+        # Как и JSONRenderer, экранируем U+2028 и U+2029 для совместимости с JavaScript.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -52,8 +52,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.metrics.PerformanceMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'backend.db_router.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -84,14 +86,87 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+#
+# По умолчанию используется SQLite. Для продакшена задаются переменные окружения:
+# DB_ENGINE=django.db.backends.postgresql, DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT.
+# DB_REPLICAS - список реплик через запятую: хосты для PostgreSQL или пути
+# к файлам для SQLite (для локальной проверки маршрутизации).
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'django.db.backends.sqlite3')
+
+
+def _database(name, host=''):
+    return {
+        'ENGINE': DB_ENGINE,
+        'NAME': name,
+        'USER': os.environ.get('DB_USER', ''),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': host,
+        'PORT': os.environ.get('DB_PORT', ''),
+        # Постоянные соединения с проверкой перед повторным использованием
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+    }
+
 
 DATABASES = {
+    'default': _database(os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'), os.environ.get('DB_HOST', '')),
+}
+
+for _index, _replica in enumerate(filter(None, os.environ.get('DB_REPLICAS', '').split(',')), start=1):
+    if DB_ENGINE == 'django.db.backends.sqlite3':
+        DATABASES[f'replica{_index}'] = _database(_replica.strip())
+    else:
+        DATABASES[f'replica{_index}'] = _database(DATABASES['default']['NAME'], _replica.strip())
+    DATABASES[f'replica{_index}']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['backend.db_router.PrimaryReplicaRouter']
+
+# Сколько секунд после записи клиент читает с основного сервера
+DATABASE_REPLICA_PIN_SECONDS = int(os.environ.get('DB_REPLICA_PIN_SECONDS', 5))
+
+# Профиль производительности SQLite (см. backend/sqlite.py): WAL позволяет
+# читать во время записи, synchronous=NORMAL в режиме WAL не теряет
+# целостность, busy_timeout заменяет немедленную ошибку "database is locked"
+# ожиданием блокировки. Режим журнала записывается в файл базы и включается
+# один раз командой enable_sqlite_wal; SQLITE_PRAGMAS применяются к каждому
+# соединению и файл базы не меняют.
+SQLITE_PERFORMANCE_PROFILE = os.environ.get('SQLITE_PERFORMANCE_PROFILE', '1') == '1'
+SQLITE_JOURNAL_MODE = 'WAL'
+SQLITE_PRAGMAS = {
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,  # в КиБ, около 20 МБ
+    'mmap_size': 268435456,  # 256 МБ
+    'temp_store': 'MEMORY',
+}
+# Как часто (в секундах) выполнять PRAGMA optimize на открытых соединениях
+SQLITE_OPTIMIZE_INTERVAL = 3600
+
+
+# Кеш
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Для нескольких процессов на одном сервере можно использовать файловый кеш:
+# CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+# CACHE_LOCATION=/var/tmp/enickazakh_cache
+# В кеше хранятся отозванные токены и ведра троттлинга, поэтому в рабочем
+# окружении он должен быть общим для всех процессов: LocMemCache годится только
+# для разработки, и "manage.py check --deploy" с ним завершается ошибкой users.E001.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'enickazakh'),
     }
 }
 
+# Время жизни закешированных ответов справочников (секунды)
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300))
+
+# Начиная с какого числа строк списки админки для больших таблиц показывают
+# оценку планировщика вместо COUNT(*) (education/changelist.py)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.environ.get('ADMIN_ESTIMATED_COUNT_THRESHOLD', 100000))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -133,6 +208,77 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Хранилище файлов публикаций. По умолчанию - папка MEDIA_ROOT; FILE_STORAGE=s3
+# включает S3-совместимое хранилище (AWS S3, MinIO), для него нужен пакет
+# django-storages[s3]. Файлы из S3 отдаются по временным подписанным ссылкам.
+FILE_STORAGE = os.environ.get('FILE_STORAGE', 'local')
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+if FILE_STORAGE == 's3':
+    STORAGES['default'] = {
+        'BACKEND': 'storages.backends.s3.S3Storage',
+        'OPTIONS': {
+            'bucket_name': os.environ.get('S3_BUCKET', 'enic'),
+            'endpoint_url': os.environ.get('S3_ENDPOINT_URL') or None,  # MinIO: http://minio:9000
+            'access_key': os.environ.get('S3_ACCESS_KEY'),
+            'secret_key': os.environ.get('S3_SECRET_KEY'),
+            'region_name': os.environ.get('S3_REGION') or None,
+            'file_overwrite': False,
+            'querystring_auth': True,
+            'querystring_expire': 300,
+        },
+    }
+
+# Загрузка файлов частями (education/uploads.py). Недогруженные части хранятся
+# в UPLOAD_STAGING_ROOT - при нескольких серверах это должна быть общая папка.
+UPLOAD_STAGING_ROOT = os.environ.get('UPLOAD_STAGING_ROOT', os.path.join(BASE_DIR, 'var', 'uploads'))
+UPLOAD_MAX_SIZE = int(os.environ.get('UPLOAD_MAX_SIZE', 200 * 1024 * 1024))
+UPLOAD_CHUNK_MAX_SIZE = 8 * 1024 * 1024
+# Через сколько секунд незавершенная загрузка удаляется командой cleanup_uploads
+UPLOAD_SESSION_TTL = 24 * 60 * 60
+# Через сколько секунд зависшее завершение загрузки (процесс упал) можно повторить
+UPLOAD_COMPLETE_TIMEOUT = 10 * 60
+
+# Отдача файлов (backend/files.py): '' - через Django с поддержкой Range,
+# 'x-accel-redirect' - через nginx (internal location FILE_DOWNLOAD_ACCEL_PREFIX,
+# указывающий на MEDIA_ROOT), 'x-sendfile' - через Apache или lighttpd.
+FILE_DOWNLOAD_OFFLOAD = os.environ.get('FILE_DOWNLOAD_OFFLOAD', '')
+FILE_DOWNLOAD_ACCEL_PREFIX = '/protected-media/'
+
+# Извлечение текста из файлов публикаций (education/extraction.py, команда
+# extract_publication_text). Для PDF нужен пакет pypdf, DOCX читается без него.
+TEXT_EXTRACTION_BATCH_SIZE = 20
+TEXT_EXTRACTION_MAX_ATTEMPTS = 3
+TEXT_EXTRACTION_RETRY_DELAY = 60  # секунды, удваивается с каждой попыткой
+TEXT_EXTRACTION_MAX_RETRY_DELAY = 3600
+TEXT_EXTRACTION_CLAIM_TIMEOUT = 1800
+TEXT_EXTRACTION_MAX_CHARS = 2_000_000
+TEXT_EXTRACTION_KEYWORDS = 8
+
+# Метрики запросов (backend/metrics.py, /metrics в формате Prometheus).
+# Без METRICS_TOKEN метрики доступны только с адресов METRICS_ALLOWED_IPS.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+# Доля запросов, для которых записывается SQL; такие запросы дольше
+# METRICS_SLOW_REQUEST_MS пишутся в лог backend.metrics.slow.
+METRICS_SLOW_SAMPLE_RATE = float(os.environ.get('METRICS_SLOW_SAMPLE_RATE', 0.1))
+METRICS_SLOW_REQUEST_MS = 500
+METRICS_SLOW_MAX_QUERIES = 200
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'backend.metrics.slow': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+        'users.outbox': {'handlers': ['console'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -144,15 +290,51 @@ AUTH_USER_MODEL = 'users.User'
 # Настройки REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
+        'users.authentication.TokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.BasicAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'backend.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'backend.pagination.KeysetCursorPagination',
+    'PAGE_SIZE': 20,
+    # Число доверенных прокси перед приложением. Адрес клиента для троттлинга
+    # берется из X-Forwarded-For только при NUM_PROXIES > 0 (N-й адрес с конца),
+    # иначе - из REMOTE_ADDR: заголовок клиента подделывается.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
+    # Ведра токенов для входа и сброса пароля (users/throttling.py)
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': os.environ.get('AUTH_THROTTLE_IP_RATE', '30/min'),
+        'auth_identity': os.environ.get('AUTH_THROTTLE_IDENTITY_RATE', '5/min'),
+    },
 }
 
+# Пакетная загрузка заявок (/api/applications/bulk/)
+APPLICATION_BULK_MAX_ROWS = 10000
+APPLICATION_BULK_CHUNK_SIZE = 500
+APPLICATION_BULK_CHUNK_SIZE_MAX = 2000
+
+# Перевод заявок в другой статус (/api/applications/transition/)
+APPLICATION_TRANSITION_MAX_IDS = 10000
+APPLICATION_TRANSITION_CHUNK_SIZE = 1000
+
+# Потоковая выгрузка заявок (/api/applications/export/): строк в одной пачке чтения
+APPLICATION_EXPORT_CHUNK_SIZE = 2000
+
+# Токены доступа (users/tokens.py)
+TOKEN_AUTH = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+}
+
+# Срок действия ссылки для сброса пароля (секунды)
+PASSWORD_RESET_TOKEN_TTL = int(os.environ.get('PASSWORD_RESET_TOKEN_TTL', 24 * 60 * 60))
+
 # Настройки CORS
 CORS_ALLOW_ALL_ORIGINS = True  # Только для разработки, в продакшене нужно указать конкретные домены
 CORS_ALLOW_CREDENTIALS = True
@@ -169,5 +351,20 @@ SPECTACULAR_SETTINGS = {
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # Для разработки
 DEFAULT_FROM_EMAIL = 'noreply@example.com'
 
+# Очередь исходящих писем (users/outbox.py, команда send_queued_mail)
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60  # секунды, удваивается с каждой попыткой
+EMAIL_OUTBOX_MAX_RETRY_DELAY = 3600
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 600
+
+# Очистка устаревших данных (команда cleanup_stale_data): строки удаляются
+# пачками по CLEANUP_BATCH_SIZE в отдельных коротких транзакциях, с паузой
+# CLEANUP_BATCH_PAUSE секунд между ними, чтобы не держать блокировку записи.
+CLEANUP_BATCH_SIZE = 1000
+CLEANUP_BATCH_PAUSE = 0.05
+# Через сколько дней после срока подачи удаляются неактивные программы мобильности
+MOBILITY_ARCHIVE_RETENTION_DAYS = int(os.environ.get('MOBILITY_ARCHIVE_RETENTION_DAYS', 365))
+
 # URL фронтенда для формирования ссылок
 FRONTEND_URL = 'http://localhost:3000'  # Изменить на реальный URL в продакшене
@@ -0,0 +1,59 @@
+import time
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_last_optimize = time.monotonic()
+
+
+def apply_pragmas(cursor, pragmas):
+    """Выполняет PRAGMA из словаря {имя: значение} на соединении SQLite."""
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def set_journal_mode(connection):
+    """
+    Переводит базу SQLite в режим журнала SQLITE_JOURNAL_MODE и возвращает
+    установленный режим. Режим хранится в самом файле базы, поэтому
+    выполняется один раз командой enable_sqlite_wal, а не при каждом
+    соединении.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}')
+        mode = cursor.fetchone()[0]
+        cursor.execute('PRAGMA optimize')
+    return mode
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Применяет PRAGMA профиля производительности, действующие в пределах соединения."""
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PERFORMANCE_PROFILE:
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, settings.SQLITE_PRAGMAS)
+
+
+@receiver(request_finished)
+def optimize_sqlite(sender, **kwargs):
+    """
+    Периодически выполняет PRAGMA optimize на открытых соединениях SQLite.
+
+    При постоянных соединениях (CONN_MAX_AGE) статистика планировщика иначе
+    обновлялась бы только при открытии соединения.
+    """
+    global _last_optimize
+    if not settings.SQLITE_PERFORMANCE_PROFILE:
+        return
+    now = time.monotonic()
+    if now - _last_optimize < settings.SQLITE_OPTIMIZE_INTERVAL:
+        return
+    _last_optimize = now
+    for connection in connections.all(initialized_only=True):
+        if connection.vendor == 'sqlite' and connection.connection is not None:
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA optimize')
@@ -0,0 +1,30 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryCountAssertionsMixin:
+    """Проверки количества SQL-запросов для тестов API."""
+    
+    def assertConstantQueries(self, url, create_rows, batches=(1, 5), client=None):
+        """
+        Проверяет, что число запросов к `url` не растет вместе с числом записей.
+        
+        `create_rows(n)` должна создать n новых записей, попадающих в ответ.
+        Запрос выполняется после каждой партии, и количество SQL-запросов
+        должно совпадать для всех партий.
+        """
+        client = client or self.client
+        counts = []
+        for size in batches:
+            create_rows(size)
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            counts.append(len(context.captured_queries))
+        
+        if len(set(counts)) != 1:
+            queries = '\n'.join(query['sql'] for query in context.captured_queries)
+            self.fail(
+                f'Число запросов к {url} растет вместе с числом записей: {counts}\n{queries}'
+            )
+        return counts[0]
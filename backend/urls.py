@@ -21,12 +21,14 @@ from django.conf.urls.static import static
 from rest_framework.routers import DefaultRouter
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 
+from backend.metrics import metrics_view
 from users.views import UserViewSet
 from education.views import (
     ProgramViewSet, AccreditationViewSet,
     PublicationViewSet, MobilityProgramViewSet,
-    ApplicationViewSet
+    ApplicationViewSet, UploadViewSet
 )
+from education.async_views import AsyncMobilityProgramView, AsyncProgramView, AsyncPublicationView
 
 # Создание роутера для API
 router = DefaultRouter()
@@ -36,6 +38,7 @@ router.register(r'accreditations', AccreditationViewSet)
 router.register(r'publications', PublicationViewSet)
 router.register(r'mobility-programs', MobilityProgramViewSet)
 router.register(r'applications', ApplicationViewSet)
+router.register(r'uploads', UploadViewSet)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -44,6 +47,18 @@ urlpatterns = [
     path('api/', include(router.urls)),
     path('api-auth/', include('rest_framework.urls')),
     
+    # Асинхронные представления каталога только для чтения (для ASGI)
+    path('api/async/programs/', AsyncProgramView.as_view(), name='async-program-list'),
+    path('api/async/programs/<int:pk>/', AsyncProgramView.as_view(), name='async-program-detail'),
+    path('api/async/mobility-programs/', AsyncMobilityProgramView.as_view(), name='async-mobility-program-list'),
+    path('api/async/mobility-programs/<int:pk>/', AsyncMobilityProgramView.as_view(),
+         name='async-mobility-program-detail'),
+    path('api/async/publications/', AsyncPublicationView.as_view(), name='async-publication-list'),
+    path('api/async/publications/<int:pk>/', AsyncPublicationView.as_view(), name='async-publication-detail'),
+    
+    # Метрики производительности в формате Prometheus
+    path('metrics', metrics_view, name='metrics'),
+    
     # API документация
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/schema/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
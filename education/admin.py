@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Program, Accreditation, Publication, MobilityProgram, Application
+from .changelist import LargeTableAdminMixin, UniversityIdFilter
+from .models import Program, Accreditation, Publication, MobilityProgram, Application, ApplicationStatusChange
 
 
 @admin.register(Program)
@@ -24,14 +25,15 @@ class AccreditationAdmin(admin.ModelAdmin):
 
 
 @admin.register(Publication)
-class PublicationAdmin(admin.ModelAdmin):
+class PublicationAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """Административная панель для публикаций."""
     
     list_display = ('title', 'publication_date', 'journal_name')
     list_filter = ('publication_date',)
     search_fields = ('title', 'abstract', 'keywords', 'journal_name', 'authors__email')
     date_hierarchy = 'publication_date'
-    filter_horizontal = ('authors',)
+    # Авторы ищутся через автодополнение, а не загружаются списком всех пользователей.
+    autocomplete_fields = ['authors']
 
 
 @admin.register(MobilityProgram)
@@ -45,11 +47,21 @@ class MobilityProgramAdmin(admin.ModelAdmin):
 
 
 @admin.register(Application)
-class ApplicationAdmin(admin.ModelAdmin):
+class ApplicationAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """Административная панель для заявок."""
     
     list_display = ('name', 'email', 'phone', 'subject', 'status', 'university', 'created_at')
-    list_filter = ('status', 'created_at', 'university')
+    list_select_related = ('university',)
+    list_filter = ('status', 'created_at', UniversityIdFilter)
     search_fields = ('name', 'email', 'phone', 'subject', 'message')
     date_hierarchy = 'created_at'
     readonly_fields = ('created_at', 'updated_at')
+    autocomplete_fields = ['university']
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and 'status' in form.changed_data:
+            ApplicationStatusChange.objects.create(
+                application=obj, from_status=form.initial['status'], to_status=obj.status,
+                changed_by=request.user,
+            )
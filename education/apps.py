@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class EducationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'education'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        # Профиль SQLite подключается здесь, так как у пакета проекта нет AppConfig.
+        from backend import sqlite  # noqa: F401
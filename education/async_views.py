@@ -0,0 +1,133 @@
+"""
+Асинхронные представления каталога только для чтения.
+
+Под ASGI (uvicorn, daphne) ViewSet DRF выполняется синхронно: Django переносит
+каждый запрос в пул потоков через sync_to_async. Эти представления - обычные
+async-представления Django: запрос обрабатывается в цикле событий, строки
+читаются через async ORM (aiterator, aget), а ответ строится быстрыми
+сериализаторами и побайтно совпадает с ответом соответствующего ViewSet.
+
+Поддерживаются курсорная пагинация, ?fields=, фильтры и сортировка ViewSet;
+?expand=, кеш ответов и условные запросы остаются в синхронных ViewSet.
+"""
+
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from backend.metrics import phase
+from backend.renderers import FastJSONRenderer
+
+from .fast_serializers import (
+    MobilityProgramFastSerializer, ProgramDetailFastSerializer, ProgramFastSerializer,
+    PublicationFastSerializer
+)
+from .mixins import sparse_param
+from .models import MobilityProgram, Program, Publication
+from .views import MobilityProgramViewSet
+
+
+class AsyncCatalogView(View):
+    """
+    Базовое async-представление списка (без pk) и записи (с pk).
+
+    `fast_serializer_class` строит ответ списка, `detail_fast_serializer_class` -
+    ответ записи (по умолчанию тот же). `filter_backends` и `ordering_fields`
+    задаются так же, как у ViewSet.
+    """
+
+    http_method_names = ['get', 'head', 'options']
+    queryset = None
+    fast_serializer_class = None
+    detail_fast_serializer_class = None
+    filter_backends = []
+    ordering_fields = None
+    pagination_class = api_settings.DEFAULT_PAGINATION_CLASS
+    # Ответ рендерится FastJSONRenderer через orjson (см. backend/renderers.py).
+    fast_serialized = True
+
+    async def get(self, request, pk=None):
+        self.request = Request(request)
+        try:
+            if sparse_param(self.request, 'expand'):
+                raise ValidationError({'expand': 'Разворачивание связей доступно в синхронном API.'})
+            if pk is None:
+                data = await self.list(self.request)
+            else:
+                data = await self.retrieve(self.request, pk)
+        except APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            return HttpResponse(JSONRenderer().render(detail), status=exc.status_code,
+                                content_type='application/json')
+        with phase('render'):
+            content = FastJSONRenderer().render(data, renderer_context={'view': self})
+        return HttpResponse(content, content_type='application/json')
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    def filter_queryset(self, queryset):
+        for backend in self.filter_backends:
+            queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+    def get_fast_serializer(self, serializer_class):
+        return serializer_class(
+            context={'request': self.request, 'view': self}, fields=sparse_param(self.request, 'fields'),
+        )
+
+    async def list(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_fast_serializer(self.fast_serializer_class)
+        if self.pagination_class is None:
+            with phase('serialization'):
+                return await serializer.aserialize(queryset)
+
+        paginator = self.pagination_class()
+        ordering = paginator.get_ordering(request, queryset, self)
+        rows = serializer.values(queryset, extra=[field.lstrip('-') for field in ordering])
+        page = await paginator.apaginate_queryset(rows, request, self)
+        if page is None:
+            with phase('serialization'):
+                return await serializer.aserialize(queryset)
+        with phase('serialization'):
+            data = await serializer.ato_representation(page)
+        return paginator.get_paginated_data(data)
+
+    async def retrieve(self, request, pk):
+        serializer = self.get_fast_serializer(self.detail_fast_serializer_class or self.fast_serializer_class)
+        queryset = self.get_queryset()
+        try:
+            row = await serializer.values(queryset, extra=('id',)).aget(pk=pk)
+        except queryset.model.DoesNotExist:
+            raise NotFound(f'No {queryset.model._meta.object_name} matches the given query.')
+        with phase('serialization'):
+            data = await serializer.ato_representation([row])
+        return data[0]
+
+
+class AsyncProgramView(AsyncCatalogView):
+    """Образовательные программы; запись выводится с аккредитациями."""
+
+    queryset = Program.objects.all()
+    fast_serializer_class = ProgramFastSerializer
+    detail_fast_serializer_class = ProgramDetailFastSerializer
+
+
+class AsyncMobilityProgramView(AsyncCatalogView):
+    """Программы мобильности с фильтрами и сортировкой MobilityProgramViewSet."""
+
+    queryset = MobilityProgram.objects.all()
+    fast_serializer_class = MobilityProgramFastSerializer
+    filter_backends = MobilityProgramViewSet.filter_backends
+    ordering_fields = MobilityProgramViewSet.ordering_fields
+
+
+class AsyncPublicationView(AsyncCatalogView):
+    """Публикации с авторами."""
+
+    queryset = Publication.objects.all()
+    fast_serializer_class = PublicationFastSerializer
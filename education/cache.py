@@ -0,0 +1,119 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+CACHE_PREFIX = 'response-cache'
+STATS_KEYS = ('hits', 'misses')
+# Заголовки ответа, которые сохраняются вместе с телом.
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+def _version_key(model):
+    return f'{CACHE_PREFIX}:version:{model._meta.label_lower}'
+
+
+def get_model_version(model):
+    """Возвращает текущую версию данных модели."""
+    return cache.get_or_set(_version_key(model), 1, timeout=None)
+
+
+def _incr(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def bump_model_version(model):
+    """
+    Увеличивает версию модели, делая недействительными все ответы, которые от нее зависят.
+
+    Версия увеличивается сразу, чтобы чтения внутри той же транзакции не видели
+    старых данных, и еще раз после коммита, чтобы отбросить ответы, которые
+    параллельные запросы успели закешировать до фиксации изменений.
+    """
+    _incr(_version_key(model))
+    transaction.on_commit(lambda: _incr(_version_key(model)))
+
+
+def record_stat(name):
+    _incr(f'{CACHE_PREFIX}:stats:{name}')
+
+
+def get_cache_stats():
+    """Возвращает счетчики попаданий и промахов кеша ответов."""
+    keys = {f'{CACHE_PREFIX}:stats:{name}': name for name in STATS_KEYS}
+    values = cache.get_many(keys.keys())
+    return {name: values.get(key, 0) for key, name in keys.items()}
+
+
+def reset_cache_stats():
+    cache.delete_many([f'{CACHE_PREFIX}:stats:{name}' for name in STATS_KEYS])
+
+
+class CachedResponseMixin:
+    """
+    Read-through кеш готовых JSON-ответов для публичных справочников.
+
+    Кешируются только GET-запросы к действиям из `cached_actions`. Ключ строится
+    из действия, URL, параметров запроса, заголовка Accept и версий моделей из
+    `cache_models`. Версии увеличиваются сигналами при изменении данных, поэтому
+    устаревшие записи никогда не читаются и просто истекают по таймауту.
+
+    Попадание в кеш возвращает сохраненные байты без обращения к базе и без
+    сериализации, поэтому использовать миксин можно только для действий,
+    открытых на чтение всем пользователям. Сохраненные ETag и Last-Modified
+    позволяют ответить 304 прямо из кеша.
+    """
+
+    cached_actions = ('list', 'retrieve')
+    cache_models = ()
+
+    def get_cache_models(self):
+        return self.cache_models or (self.queryset.model,)
+
+    def get_response_cache_key(self, request, action):
+        versions = '.'.join(str(get_model_version(model)) for model in self.get_cache_models())
+        query = urlencode(sorted(request.GET.lists()), doseq=True)
+        raw = '|'.join([request.path, query, request.META.get('HTTP_ACCEPT', '')])
+        digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+        return f'{CACHE_PREFIX}:{self.basename}:{action}:{versions}:{digest}'
+
+    def dispatch(self, request, *args, **kwargs):
+        action = self.action_map.get(request.method.lower()) if request.method == 'GET' else None
+        if action not in self.cached_actions:
+            return super().dispatch(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request, action)
+        cached = cache.get(key)
+        if cached is not None:
+            record_stat('hits')
+            content, headers = cached
+            response = get_conditional_response(
+                request,
+                etag=headers.get('ETag'),
+                last_modified=parse_http_date_safe(headers.get('Last-Modified', '')),
+            )
+            if response is None:
+                response = HttpResponse(content)
+            for name, value in headers.items():
+                response[name] = value
+            response['Vary'] = 'Accept'
+            response['X-Cache'] = 'HIT'
+            return response
+
+        record_stat('misses')
+        response = super().dispatch(request, *args, **kwargs)
+        renderer = getattr(response, 'accepted_renderer', None)
+        if response.status_code == 200 and renderer is not None and renderer.format == 'json':
+            response.render()
+            headers = {name: response[name] for name in CACHED_HEADERS if response.has_header(name)}
+            cache.set(key, (response.content, headers), timeout=settings.RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
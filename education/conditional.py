@@ -0,0 +1,119 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.exceptions import APIException
+
+
+class ConditionalResponse(APIException):
+    """Прерывает обработку запроса готовым ответом 304 или 412."""
+
+    status_code = 304
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+def compute_validators(queryset, related=(), extra=''):
+    """
+    Вычисляет ETag и Last-Modified для набора записей без их сериализации.
+
+    Используются только агрегаты MAX(updated_at) и COUNT(*) по queryset и по
+    связанным моделям из `related`, данные которых попадают в ответ. `extra`
+    включается в ETag и должен описывать представление (действие, параметры).
+    """
+    aggregates = {
+        'last_modified': Max('updated_at'),
+        'count': Count('pk', distinct=True),
+    }
+    for name in related:
+        aggregates[f'{name}_last_modified'] = Max(f'{name}__updated_at')
+        aggregates[f'{name}_count'] = Count(f'{name}__pk', distinct=True)
+
+    values = queryset.order_by().aggregate(**aggregates)
+    timestamps = [value for key, value in values.items() if key.endswith('last_modified') and value]
+    last_modified = max(timestamps) if timestamps else None
+
+    raw = '|'.join([queryset.model._meta.label_lower, extra] + [
+        f'{key}={values[key].isoformat() if hasattr(values[key], "isoformat") else values[key]}'
+        for key in sorted(values)
+    ])
+    etag = 'W/"%s"' % hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return etag, last_modified
+
+
+class ConditionalGetMixin:
+    """
+    Поддержка условных GET-запросов (ETag, Last-Modified, ответ 304).
+
+    Валидаторы считаются по `filter_queryset(get_queryset())` для действий из
+    `conditional_actions` еще до сериализации. Если заголовки If-None-Match
+    или If-Modified-Since совпадают, сериализатор не вызывается.
+
+    Last-Modified отдается только для одной записи: удаление строки или ее
+    выпадение из фильтра не меняет MAX(updated_at) списка, поэтому списки
+    проверяются только по ETag, который учитывает и число записей.
+
+    В `conditional_dependencies` задается словарь {действие: связи}, где связи -
+    имена отношений, изменения в которых меняют ответ (ключ 'default' - для
+    остальных действий).
+    """
+
+    conditional_actions = ('list', 'retrieve')
+    conditional_dependencies = {}
+
+    def is_conditional_detail(self):
+        """Ответ описывает одну запись (есть параметр поиска из URL)."""
+        return (self.lookup_url_kwarg or self.lookup_field) in self.kwargs
+
+    def get_conditional_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg in self.kwargs:
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset
+
+    def get_conditional_dependencies(self):
+        dependencies = self.conditional_dependencies
+        return dependencies.get(self.action, dependencies.get('default', ()))
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.conditional_headers = None
+        if request.method != 'GET' or self.action not in self.conditional_actions:
+            return
+
+        related = self.get_conditional_dependencies()
+        extra = '|'.join([
+            self.action,
+            str(sorted(self.kwargs.items())),
+            str(sorted(request.query_params.lists())),
+            request.META.get('HTTP_ACCEPT', ''),
+        ])
+        etag, last_modified = compute_validators(self.get_conditional_queryset(), related, extra)
+        timestamp = None
+        if last_modified and self.is_conditional_detail():
+            timestamp = int(last_modified.timestamp())
+
+        self.conditional_headers = {'ETag': etag}
+        if timestamp is not None:
+            self.conditional_headers['Last-Modified'] = http_date(timestamp)
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is not None:
+            raise ConditionalResponse(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, ConditionalResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        headers = getattr(self, 'conditional_headers', None)
+        if headers and response.status_code in (200, 304):
+            for name, value in headers.items():
+                response[name] = value
+        return response
@@ -0,0 +1,124 @@
+"""
+Извлечение текста и ключевых слов из файлов публикаций.
+
+Модуль не обращается к базе данных и не импортирует модели: функции
+выполняются в процессах пула обработчика (см. indexing.py), куда передаются
+только путь к файлу и параметры.
+"""
+
+import zipfile
+from collections import Counter, defaultdict
+from pathlib import Path
+from xml.etree import ElementTree
+
+from .stemming import stem_word, tokenize
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # pypdf нужен только для PDF
+    PdfReader = None
+
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+MIN_KEYWORD_LENGTH = 4
+# Служебные слова, которые часто встречаются в статьях, но не описывают их.
+STOP_WORDS = frozenset('''
+    также которые который которая которого между может могут более менее однако является
+    являются были было быть будет если когда только после через этого этой этих того
+    всех очень одного другой других данных данной работе работы статье статья рассмотрены
+    және үшін бойынша ретінде арқылы болып болады туралы сияқты мұнда оның олар бұл
+    with that this from which were have their these there also been into such than about
+'''.split())
+
+
+class ExtractionError(Exception):
+    """Текст не удалось извлечь; извлечение можно повторить."""
+
+
+class UnsupportedFormat(ExtractionError):
+    """Формат файла не поддерживается; повтор не поможет."""
+
+
+class MissingDependency(ExtractionError):
+    """Не установлен пакет, нужный для формата; задание ждет его установки."""
+
+
+def extract_pdf(path):
+    if PdfReader is None:
+        raise MissingDependency('Для извлечения текста из PDF нужен пакет pypdf.')
+    try:
+        reader = PdfReader(path)
+        for page in reader.pages:
+            yield page.extract_text() or ''
+    except Exception as exc:
+        raise ExtractionError(f'Не удалось прочитать PDF: {exc}') from exc
+
+
+def extract_docx(path):
+    """Текст абзацев word/document.xml; XML читается потоком."""
+    try:
+        with zipfile.ZipFile(path) as archive, archive.open('word/document.xml') as document:
+            parts = []
+            for _, element in ElementTree.iterparse(document):
+                if element.tag == f'{WORD_NS}t':
+                    parts.append(element.text or '')
+                elif element.tag == f'{WORD_NS}tab':
+                    parts.append('\t')
+                elif element.tag == f'{WORD_NS}p':
+                    yield ''.join(parts)
+                    parts.clear()
+                    element.clear()
+    except (KeyError, zipfile.BadZipFile, ElementTree.ParseError) as exc:
+        raise ExtractionError(f'Не удалось прочитать DOCX: {exc}') from exc
+
+
+def extract_plain(path):
+    with open(path, encoding='utf-8', errors='replace') as file:
+        yield from file
+
+
+EXTRACTORS = {
+    '.pdf': extract_pdf,
+    '.docx': extract_docx,
+    '.txt': extract_plain,
+}
+
+
+def extract_text(path, filename, max_chars):
+    """Текст файла не длиннее max_chars символов; формат определяется по имени файла."""
+    extension = Path(filename).suffix.lower()
+    try:
+        extractor = EXTRACTORS[extension]
+    except KeyError:
+        raise UnsupportedFormat(f'Формат {extension or "без расширения"} не поддерживается.')
+    parts, length = [], 0
+    for part in extractor(path):
+        parts.append(part)
+        length += len(part) + 1
+        if length >= max_chars:
+            break
+    return '\n'.join(parts)[:max_chars].strip()
+
+
+def derive_keywords(text, limit):
+    """
+    Самые частые слова текста без служебных. Слова с одной основой
+    считаются вместе, в результат попадает их самая частая форма.
+    """
+    counts = Counter()
+    forms = defaultdict(Counter)
+    for word in tokenize(text):
+        word = word.lower()
+        if len(word) < MIN_KEYWORD_LENGTH or word in STOP_WORDS or not word.isalpha():
+            continue
+        stem = stem_word(word)
+        counts[stem] += 1
+        forms[stem][word] += 1
+    return [forms[stem].most_common(1)[0][0] for stem, _ in counts.most_common(limit)]
+
+
+def process_file(path, filename, max_chars, keyword_limit):
+    """Задача процесса пула: возвращает (текст, ключевые слова через запятую)."""
+    text = extract_text(path, filename, max_chars)
+    keywords = ', '.join(derive_keywords(text, keyword_limit))
+    return text, keywords[:255].rsplit(', ', 1)[0] if len(keywords) > 255 else keywords
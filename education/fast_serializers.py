@@ -0,0 +1,270 @@
+"""
+Быстрые сериализаторы списков только для чтения.
+
+Строят словари ответа напрямую из строк queryset.values(), минуя вызов
+каждого поля ModelSerializer для каждой записи. Набор и порядок ключей берутся
+из обычного сериализатора, а значения приводятся так же, как это делают поля
+DRF, поэтому ответ побайтно совпадает с ответом обычного сериализатора.
+"""
+
+import datetime
+import functools
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Accreditation, Application, Publication
+from .serializers import (
+    AccreditationSerializer, ApplicationSerializer, MobilityProgramSerializer,
+    ProgramDetailSerializer, ProgramSerializer, PublicationSerializer, UserBriefSerializer
+)
+
+User = get_user_model()
+
+
+@functools.lru_cache(maxsize=None)
+def readable_fields(serializer_class):
+    """
+    Читаемые поля сериализатора DRF в порядке вывода. Набор полей зависит
+    только от класса, поэтому строится один раз, а не на каждый запрос.
+    """
+    fields = serializer_class(context={}).fields
+    return tuple(name for name, field in fields.items() if not field.write_only)
+
+
+def represent_date(value):
+    return value.isoformat() if value else None
+
+
+def datetime_converter():
+    """
+    Повторяет serializers.DateTimeField.to_representation (формат ISO 8601).
+    Часовой пояс определяется один раз на ответ, а не для каждого значения.
+    """
+    field_timezone = timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def represent_datetime(value):
+        if not value:
+            return None
+        aware = value.utcoffset() is not None
+        if field_timezone is not None:
+            value = value.astimezone(field_timezone) if aware else timezone.make_aware(value, field_timezone)
+        elif aware:
+            value = timezone.make_naive(value, datetime.timezone.utc)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return represent_datetime
+
+
+class FastSerializer:
+    """
+    Базовый быстрый сериализатор.
+
+    `serializer_class` - сериализатор DRF, ответ которого воспроизводится;
+    `lookups` - {ключ ответа: выражение для values()} для полей, которых нет
+    в модели. Метод `get_step()` можно расширить, чтобы вычислять ключ из
+    другой колонки.
+    """
+
+    serializer_class = None
+    lookups = {}
+
+    def __init__(self, context=None, fields=None):
+        self.context = context or {}
+        self.model = self.serializer_class.Meta.model
+        self.represent_datetime = datetime_converter()
+        names = self.get_field_names()
+        if fields is not None:
+            fields = set(fields)
+            names = [name for name in names if name in fields]
+        self.field_names = names
+        self.plan = self.get_plan()
+
+    def get_field_names(self):
+        """Читаемые поля обычного сериализатора в порядке вывода."""
+        return list(readable_fields(self.serializer_class))
+
+    def get_converter(self, model_field):
+        if isinstance(model_field, models.DateTimeField):
+            return self.represent_datetime
+        if isinstance(model_field, models.DateField):
+            return represent_date
+        if isinstance(model_field, models.FileField):
+            return self.file_converter(model_field)
+        return None
+
+    def file_converter(self, model_field):
+        """Повторяет serializers.FileField.to_representation (с use_url)."""
+        request = self.context.get('request')
+
+        def represent_file(value):
+            if not value:
+                return None
+            url = model_field.storage.url(value)
+            return request.build_absolute_uri(url) if request is not None else url
+        return represent_file
+
+    def get_step(self, name):
+        """Возвращает (ключ ответа, ключ строки values(), преобразование или None)."""
+        if name in self.lookups:
+            return name, name, None
+        return name, name, self.get_converter(self.model._meta.get_field(name))
+
+    def get_plan(self):
+        return [self.get_step(name) for name in self.field_names]
+
+    def values(self, queryset, extra=()):
+        """Строки queryset, содержащие все нужные колонки и `extra`."""
+        names, annotations = set(extra), {}
+        for _, source, _ in self.plan:
+            if source in self.lookups:
+                annotations[source] = self.lookups[source]
+            else:
+                names.add(source)
+        return queryset.select_related(None).prefetch_related(None).values(*names, **annotations)
+
+    def to_representation(self, rows):
+        plan = self.plan
+        return [
+            {key: convert(row[source]) if convert else row[source] for key, source, convert in plan}
+            for row in rows
+        ]
+
+    def serialize(self, queryset):
+        return self.to_representation(self.values(queryset))
+
+    async def ato_representation(self, rows):
+        """Вариант to_representation для асинхронных представлений."""
+        return self.to_representation(rows)
+
+    async def aserialize(self, queryset):
+        return await self.ato_representation([row async for row in self.values(queryset).aiterator()])
+
+
+class ProgramFastSerializer(FastSerializer):
+    serializer_class = ProgramSerializer
+
+
+class MobilityProgramFastSerializer(FastSerializer):
+    serializer_class = MobilityProgramSerializer
+
+
+class AccreditationFastSerializer(FastSerializer):
+    serializer_class = AccreditationSerializer
+    lookups = {'program_name': F('program__name')}
+
+
+class ProgramDetailFastSerializer(FastSerializer):
+    """Программа с аккредитациями; аккредитации всех программ загружаются одним запросом."""
+
+    serializer_class = ProgramDetailSerializer
+
+    def get_step(self, name):
+        if name == 'accreditations':
+            return name, 'id', lambda pk: self.accreditations.get(pk, [])
+        return super().get_step(name)
+
+    def accreditations_rows(self, rows):
+        serializer = AccreditationFastSerializer(context=self.context)
+        queryset = Accreditation.objects.filter(program_id__in=[row['id'] for row in rows])
+        return serializer, serializer.values(queryset, extra=('program',))
+
+    def group_accreditations(self, serializer, rows):
+        accreditations = {}
+        for row, item in zip(rows, serializer.to_representation(rows)):
+            accreditations.setdefault(row['program'], []).append(item)
+        return accreditations
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        self.accreditations = {}
+        if 'accreditations' in self.field_names:
+            serializer, queryset = self.accreditations_rows(rows)
+            self.accreditations = self.group_accreditations(serializer, list(queryset))
+        return super().to_representation(rows)
+
+    async def ato_representation(self, rows):
+        rows = list(rows)
+        self.accreditations = {}
+        if 'accreditations' in self.field_names:
+            serializer, queryset = self.accreditations_rows(rows)
+            self.accreditations = self.group_accreditations(
+                serializer, [row async for row in queryset.aiterator()]
+            )
+        return super().to_representation(rows)
+
+
+class ApplicationFastSerializer(FastSerializer):
+    serializer_class = ApplicationSerializer
+    lookups = {'university_name': F('university__university_name')}
+
+    def get_step(self, name):
+        if name == 'status_display':
+            # Подписи переводятся для каждого запроса, как в get_status_display().
+            labels = {value: str(label) for value, label in Application.STATUS_CHOICES}
+            return name, 'status', lambda value: labels.get(value, value)
+        return super().get_step(name)
+
+    def values(self, queryset, extra=()):
+        return super().values(queryset, (*extra, 'university'))
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        data = super().to_representation(rows)
+        if 'university_name' in self.field_names:
+            # Для заявки без ВУЗа DRF пропускает ключ university_name (SkipField).
+            for row, item in zip(rows, data):
+                if row['university'] is None:
+                    del item['university_name']
+        return data
+
+
+class PublicationFastSerializer(FastSerializer):
+    """Авторы всех публикаций загружаются одним запросом к промежуточной таблице."""
+
+    serializer_class = PublicationSerializer
+    author_fields = ('id', 'email', 'role', 'first_name', 'last_name', 'university_name')
+
+    def get_step(self, name):
+        if name == 'authors':
+            return name, 'id', lambda pk: self.authors.get(pk, [])
+        return super().get_step(name)
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        self.authors = {}
+        if 'authors' in self.field_names:
+            self.authors = self.group_authors(self.authors_queryset([row['id'] for row in rows]))
+        return super().to_representation(rows)
+
+    async def ato_representation(self, rows):
+        rows = list(rows)
+        self.authors = {}
+        if 'authors' in self.field_names:
+            queryset = self.authors_queryset([row['id'] for row in rows])
+            self.authors = self.group_authors([row async for row in queryset.aiterator()])
+        return super().to_representation(rows)
+
+    def authors_queryset(self, publication_ids):
+        return (
+            Publication.authors.through.objects.filter(publication_id__in=publication_ids)
+            .order_by('user_id')
+            .values('publication_id', *(f'user__{field}' for field in self.author_fields))
+        )
+
+    def group_authors(self, rows):
+        """{id публикации: [авторы в формате UserBriefSerializer]} в порядке id авторов."""
+        brief_fields = readable_fields(UserBriefSerializer)
+        authors = {}
+        for row in rows:
+            user = User(**{field: row[f'user__{field}'] for field in self.author_fields})
+            values = {'id': user.id, 'email': user.email, 'full_name': user.get_full_name()}
+            authors.setdefault(row['publication_id'], []).append(
+                {name: values[name] for name in brief_fields}
+            )
+        return authors
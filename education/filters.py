@@ -0,0 +1,142 @@
+import datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Application
+
+
+def parse_moment(value, name, end=False):
+    """
+    Разбирает дату или дату и время из параметра запроса.
+
+    Дата без времени означает начало дня, а для конца интервала (`end`) -
+    начало следующего дня. Возвращает (момент, включается ли граница).
+    """
+    try:
+        date = parse_date(value)
+        moment = None if date is not None else parse_datetime(value)
+    except ValueError:
+        date = moment = None
+    if date is None and moment is None:
+        raise ValidationError({name: 'Ожидается дата (ГГГГ-ММ-ДД) или дата и время в ISO 8601.'})
+
+    inclusive = True
+    if date is not None:
+        if end:
+            date += datetime.timedelta(days=1)
+            inclusive = False
+        moment = datetime.datetime.combine(date, datetime.time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment, inclusive
+
+
+def parse_day(value, name):
+    """Разбирает дату (ГГГГ-ММ-ДД) из параметра запроса."""
+    try:
+        date = parse_date(value)
+    except ValueError:
+        date = None
+    if date is None:
+        raise ValidationError({name: 'Ожидается дата (ГГГГ-ММ-ДД).'})
+    return date
+
+
+def split_values(value):
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+class ApplicationFilter(BaseFilterBackend):
+    """
+    Фильтры заявок:
+    - status: один или несколько статусов через запятую;
+    - created_from, created_to: границы даты создания (включительно).
+
+    Вместе с ограничением заявок ВУЗа используют индекс
+    (university, status, created_at).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        if params.get('status'):
+            statuses = split_values(params['status'])
+            unknown = set(statuses) - {value for value, _ in Application.STATUS_CHOICES}
+            if unknown:
+                raise ValidationError({'status': f'Неизвестный статус: {", ".join(sorted(unknown))}.'})
+            queryset = queryset.filter(status__in=statuses)
+
+        if params.get('created_from'):
+            moment, _ = parse_moment(params['created_from'], 'created_from')
+            queryset = queryset.filter(created_at__gte=moment)
+        if params.get('created_to'):
+            moment, inclusive = parse_moment(params['created_to'], 'created_to', end=True)
+            lookup = 'created_at__lte' if inclusive else 'created_at__lt'
+            queryset = queryset.filter(**{lookup: moment})
+        return queryset
+
+
+class MobilityProgramFilter(BaseFilterBackend):
+    """
+    Фильтры программ мобильности:
+    - is_active: true или false;
+    - country: одна или несколько стран через запятую;
+    - deadline_from, deadline_to: границы крайнего срока подачи заявок;
+    - start_from, start_to: границы даты начала программы.
+
+    Все границы дат включительные. Индексы: (is_active, application_deadline)
+    и (country, start_date).
+    """
+
+    ranges = {
+        'deadline': 'application_deadline',
+        'start': 'start_date',
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        if params.get('is_active'):
+            value = params['is_active'].lower()
+            if value not in ('true', 'false'):
+                raise ValidationError({'is_active': 'Ожидается true или false.'})
+            # is_active__in вместо is_active: условие "WHERE is_active" без
+            # сравнения SQLite не сопоставляет с индексом.
+            queryset = queryset.filter(is_active__in=[value == 'true'])
+
+        if params.get('country'):
+            queryset = queryset.filter(country__in=split_values(params['country']))
+
+        for prefix, field in self.ranges.items():
+            if params.get(f'{prefix}_from'):
+                date = parse_day(params[f'{prefix}_from'], f'{prefix}_from')
+                queryset = queryset.filter(**{f'{field}__gte': date})
+            if params.get(f'{prefix}_to'):
+                date = parse_day(params[f'{prefix}_to'], f'{prefix}_to')
+                queryset = queryset.filter(**{f'{field}__lte': date})
+        return queryset
+
+
+class ApplicationStatFilter(BaseFilterBackend):
+    """
+    Фильтры статистики заявок:
+    - created_from, created_to: границы дня создания заявок (включительно);
+    - university: id ВУЗа (только для администраторов).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        if params.get('created_from'):
+            queryset = queryset.filter(day__gte=parse_day(params['created_from'], 'created_from'))
+        if params.get('created_to'):
+            queryset = queryset.filter(day__lte=parse_day(params['created_to'], 'created_to'))
+
+        if params.get('university') and request.user.is_admin:
+            if not params['university'].isdigit():
+                raise ValidationError({'university': 'Ожидается id ВУЗа.'})
+            queryset = queryset.filter(university_id=int(params['university']))
+        return queryset
@@ -0,0 +1,198 @@
+"""
+Очередь извлечения текста из файлов публикаций.
+
+При сохранении публикации с новым файлом строка PublicationText ставится в
+очередь (сигнал в signals.py) - запрос загрузки только записывает эту строку.
+Команда extract_publication_text забирает пачки заданий так же, как очередь
+писем (users/outbox.py): условным UPDATE с уникальным токеном, поэтому
+обработчиков можно запускать сколько угодно. Текст извлекается в пуле
+процессов (extraction.py), результат записывается, а публикация заново
+индексируется для полнотекстового поиска вместе с текстом файла. Пустые
+ключевые слова публикации заполняются выделенными из текста.
+"""
+
+import tempfile
+import uuid
+from concurrent.futures import as_completed
+from contextlib import ExitStack, contextmanager
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.utils import timezone
+
+from .extraction import MissingDependency, UnsupportedFormat, process_file
+from .models import Publication, PublicationText
+from .search import index_instance
+
+
+def enqueue_publication(publication, using='default'):
+    """
+    Ставит файл публикации в очередь, если текст для него еще не извлекался.
+    Без файла извлеченный текст удаляется.
+    """
+    name = publication.file.name if publication.file else ''
+    texts = PublicationText.objects.using(using)
+    if not name:
+        texts.filter(publication_id=publication.pk).delete()
+        return
+    current = texts.filter(publication_id=publication.pk).values_list('file_name', flat=True).first()
+    if current is None:
+        texts.create(publication_id=publication.pk, file_name=name)
+    elif current != name:
+        texts.filter(publication_id=publication.pk).update(
+            file_name=name, text='', keywords='', status=PublicationText.STATUS_PENDING,
+            attempts=0, next_attempt_at=timezone.now(), claim_token='', claimed_at=None,
+            last_error='', extracted_at=None,
+        )
+
+
+def enqueue_missing():
+    """Ставит в очередь файлы, добавленные в обход сигналов. Возвращает их число."""
+    publications = (
+        Publication.objects.exclude(Q(file='') | Q(file__isnull=True))
+        .filter(extracted_text__isnull=True)
+        .values_list('id', 'file')
+    )
+    texts = PublicationText.objects.bulk_create(
+        [PublicationText(publication_id=pk, file_name=name) for pk, name in publications.iterator()],
+        ignore_conflicts=True,
+    )
+    return len(texts)
+
+
+def claim_batch(size):
+    """
+    Забирает до `size` заданий. Задания, зависшие в обработке дольше
+    TEXT_EXTRACTION_CLAIM_TIMEOUT (обработчик упал), возвращаются в работу.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TEXT_EXTRACTION_CLAIM_TIMEOUT)
+    ready = (
+        Q(status=PublicationText.STATUS_PENDING, next_attempt_at__lte=now)
+        | Q(status=PublicationText.STATUS_PROCESSING, claimed_at__lt=stale)
+    )
+    ids = list(
+        PublicationText.objects.filter(ready)
+        .order_by('next_attempt_at')
+        .values_list('publication_id', flat=True)[:size]
+    )
+    if not ids:
+        return []
+
+    token = uuid.uuid4().hex
+    PublicationText.objects.filter(ready, publication_id__in=ids).update(
+        status=PublicationText.STATUS_PROCESSING, claim_token=token, claimed_at=now,
+    )
+    return list(
+        PublicationText.objects.filter(claim_token=token, status=PublicationText.STATUS_PROCESSING)
+        .defer('text')
+    )
+
+
+def retry_delay(attempts):
+    delay = settings.TEXT_EXTRACTION_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.TEXT_EXTRACTION_MAX_RETRY_DELAY))
+
+
+@contextmanager
+def local_copy(name):
+    """Путь к файлу хранилища; файлы удаленных хранилищ скачиваются во временный файл."""
+    try:
+        path = default_storage.path(name)
+    except NotImplementedError:
+        path = None
+    if path is not None:
+        yield path
+        return
+    with default_storage.open(name, 'rb') as source, \
+            tempfile.NamedTemporaryFile(suffix=Path(name).suffix) as copy:
+        while block := source.read(64 * 1024):
+            copy.write(block)
+        copy.flush()
+        yield copy.name
+
+
+def claimed(job):
+    """Задание, которое все еще принадлежит этому обработчику (файл не заменили)."""
+    return PublicationText.objects.filter(
+        publication_id=job.publication_id, claim_token=job.claim_token,
+        status=PublicationText.STATUS_PROCESSING,
+    )
+
+
+def finish(job, text, keywords):
+    if not claimed(job).update(
+        text=text, keywords=keywords, status=PublicationText.STATUS_DONE, attempts=job.attempts + 1,
+        extracted_at=timezone.now(), claim_token='', last_error='',
+    ):
+        return False
+    publication = Publication.objects.get(pk=job.publication_id)
+    if keywords and not publication.keywords:
+        publication.keywords = keywords
+        # post_save переиндексирует публикацию.
+        publication.save(update_fields=['keywords', 'updated_at'])
+    else:
+        index_instance(publication)
+    return True
+
+
+def fail(job, exc):
+    if isinstance(exc, MissingDependency):
+        # Ошибка настройки, а не файла: попытка не засчитывается, задание
+        # повторяется после установки пакета с максимальной задержкой.
+        claimed(job).update(
+            status=PublicationText.STATUS_PENDING, claim_token='', last_error=str(exc),
+            next_attempt_at=timezone.now() + timedelta(seconds=settings.TEXT_EXTRACTION_MAX_RETRY_DELAY),
+        )
+        return
+    attempts = job.attempts + 1
+    if isinstance(exc, UnsupportedFormat) or attempts >= settings.TEXT_EXTRACTION_MAX_ATTEMPTS:
+        changes = {'status': PublicationText.STATUS_FAILED}
+    else:
+        changes = {
+            'status': PublicationText.STATUS_PENDING,
+            'next_attempt_at': timezone.now() + retry_delay(attempts),
+        }
+    claimed(job).update(attempts=attempts, claim_token='', last_error=str(exc), **changes)
+
+
+def extract_batch(size=None, executor=None):
+    """
+    Обрабатывает одну пачку заданий в пуле `executor` (без него - в текущем
+    процессе). Возвращает (извлечено, ошибок, забрано заданий); забранные
+    задания, файл которых заменили во время обработки, не входят ни в
+    извлеченные, ни в ошибки.
+    """
+    jobs = claim_batch(size or settings.TEXT_EXTRACTION_BATCH_SIZE)
+    done = failed = 0
+    options = (settings.TEXT_EXTRACTION_MAX_CHARS, settings.TEXT_EXTRACTION_KEYWORDS)
+    with ExitStack() as stack:
+        tasks = {}
+        for job in jobs:
+            try:
+                path = stack.enter_context(local_copy(job.file_name))
+            except OSError as exc:
+                fail(job, exc)
+                failed += 1
+                continue
+            if executor is None:
+                try:
+                    done += finish(job, *process_file(path, job.file_name, *options))
+                except Exception as exc:
+                    fail(job, exc)
+                    failed += 1
+            else:
+                tasks[executor.submit(process_file, path, job.file_name, *options)] = job
+        for future in as_completed(tasks):
+            job = tasks[future]
+            try:
+                result = future.result()
+            except Exception as exc:
+                fail(job, exc)
+                failed += 1
+            else:
+                done += finish(job, *result)
+    return done, failed, len(jobs)
@@ -0,0 +1,215 @@
+import json
+import platform
+import threading
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from backend.benchmark import NO_CACHE, benchmark_database, compare_results, percentiles
+from backend.urls import router
+from education.models import Program
+from education.seed import seed
+from users.models import User
+
+# Параметры запросов для действий, которым они нужны.
+ACTION_PARAMS = {
+    'search': lambda: {'q': 'образование'},
+    'by_program': lambda: {'program_id': Program.objects.order_by('pk').values_list('pk', flat=True).first()},
+}
+# Действия, доступные только ВУЗу; остальные запрашиваются администратором.
+UNIVERSITY_ACTIONS = {'my_applications'}
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест всех GET-эндпоинтов роутера API на данных education.seed: '
+        'задержка (p50/p90/p99), число SQL-запросов и пиковая память через тестовый клиент, '
+        'с --http - еще и одновременные HTTP-запросы к WSGI-серверу в этом процессе. '
+        'Результаты пишутся в JSON; с --baseline команда завершается ошибкой при регрессии. '
+        'Прогон выполняется на временной базе данных.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0, help='Множитель объема данных (education.seed).')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--requests', type=int, default=50, help='Запросов к каждому эндпоинту.')
+        parser.add_argument('--warmup', type=int, default=3, help='Запросов для прогрева.')
+        parser.add_argument('--http', action='store_true', help='Добавить прогон через HTTP.')
+        parser.add_argument('--concurrency', type=int, default=8, help='Одновременных HTTP-запросов.')
+        parser.add_argument('--endpoint', action='append', help='Только эти эндпоинты (можно повторять).')
+        parser.add_argument('--output', help='Файл для результатов в JSON.')
+        parser.add_argument('--baseline', help='JSON с базовыми результатами для сравнения.')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Допустимый рост задержки и памяти относительно базовых, доля.',
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as file:
+                baseline = json.load(file)
+
+        settings = override_settings(DEBUG=False, ALLOWED_HOSTS=['*'], CACHES=NO_CACHE)
+        with benchmark_database(), settings:
+            counts = seed(options['scale'], options['seed'])
+            endpoints = self.get_endpoints(options['endpoint'])
+            clients = self.get_clients()
+            results = {'client': {}}
+            for name, (url, role) in endpoints.items():
+                results['client'][name] = self.run_client(clients[role], url, options)
+                self.report('client', name, results['client'][name])
+            if options['http']:
+                results['http'] = self.run_http(endpoints, clients, options)
+
+        data = {
+            'meta': {
+                'created_at': timezone.now().isoformat(), 'scale': options['scale'], 'seed': options['seed'],
+                'requests': options['requests'], 'concurrency': options['concurrency'], 'rows': counts,
+                'database': connection.vendor, 'python': platform.python_version(), 'django': django.get_version(),
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(data, file, ensure_ascii=False, indent=2)
+            self.stdout.write(f'Результаты записаны в {options["output"]}')
+
+        if baseline is not None:
+            regressions = compare_results(results, baseline['results'], options['tolerance'])
+            if regressions:
+                raise CommandError('Регрессии относительно базовых результатов:\n' + '\n'.join(regressions))
+            self.stdout.write('Регрессий относительно базовых результатов нет.')
+
+    def get_endpoints(self, only):
+        """{имя: (URL, роль)} для списков, записей и GET-действий ViewSet роутера."""
+        endpoints = {}
+        for prefix, viewset, _ in router.registry:
+            model = viewset.queryset.model
+            routes = []
+            if hasattr(viewset, 'list'):
+                routes.append(('list', f'/api/{prefix}/'))
+            pk = model._default_manager.order_by('pk').values_list('pk', flat=True).first()
+            if hasattr(viewset, 'retrieve') and pk is not None:
+                routes.append(('retrieve', f'/api/{prefix}/{pk}/'))
+            for action in viewset.get_extra_actions():
+                if action.detail or 'get' not in action.mapping:
+                    continue
+                url = f'/api/{prefix}/{action.url_path}/'
+                if action.__name__ in ACTION_PARAMS:
+                    url += '?' + urlencode(ACTION_PARAMS[action.__name__]())
+                routes.append((action.__name__, url))
+            for action, url in routes:
+                name = f'{viewset.__name__}.{action}'
+                if only is None or name in only:
+                    role = User.UNIVERSITY if action in UNIVERSITY_ACTIONS else User.ADMIN
+                    endpoints[name] = (url, role)
+        return endpoints
+
+    def get_clients(self):
+        clients = {}
+        for role in (User.ADMIN, User.UNIVERSITY):
+            clients[role] = Client()
+            clients[role].force_login(User.objects.filter(role=role).order_by('pk').first())
+        return clients
+
+    def request(self, client, url):
+        response = client.get(url)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response.status_code, len(body)
+
+    def run_client(self, client, url, options):
+        for _ in range(options['warmup']):
+            self.request(client, url)
+        latencies, statuses = [], []
+        for _ in range(options['requests']):
+            started = time.perf_counter()
+            status, size = self.request(client, url)
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses.append(status)
+        # Запросы и память измеряются отдельно: учет замедляет обработку.
+        with CaptureQueriesContext(connection) as context:
+            self.request(client, url)
+        # Следующий запрос очищает журнал запросов соединения.
+        queries = len(context.captured_queries)
+        tracemalloc.start()
+        self.request(client, url)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            'url': url, 'status': statuses[-1] if statuses else None,
+            'errors': sum(1 for status in statuses if status >= 400),
+            **{f'{key}_ms': round(value, 3) for key, value in percentiles(latencies).items()},
+            'mean_ms': round(sum(latencies) / len(latencies), 3) if latencies else None,
+            'queries': queries, 'peak_memory_kb': round(peak / 1024, 1), 'bytes': size,
+        }
+
+    def run_http(self, endpoints, clients, options):
+        """Одновременные HTTP-запросы к многопоточному WSGI-серверу на свободном порту."""
+        server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler)
+        server.set_app(get_wsgi_application())
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        cookies = {role: f'sessionid={client.cookies["sessionid"].value}' for role, client in clients.items()}
+        base = f'http://127.0.0.1:{server.server_port}'
+
+        def call(request):
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as exc:
+                status = exc.code
+            return status, (time.perf_counter() - started) * 1000
+
+        results = {}
+        try:
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                for name, (url, role) in endpoints.items():
+                    request = urllib.request.Request(base + url, headers={'Cookie': cookies[role]})
+                    list(pool.map(call, [request] * options['warmup']))
+                    started = time.perf_counter()
+                    calls = list(pool.map(call, [request] * options['requests']))
+                    wall = time.perf_counter() - started
+                    latencies = [latency for _, latency in calls]
+                    results[name] = {
+                        'url': url, 'errors': sum(1 for status, _ in calls if status >= 400),
+                        **{f'{key}_ms': round(value, 3) for key, value in percentiles(latencies).items()},
+                        'rps': round(len(calls) / wall, 1) if wall else None,
+                    }
+                    self.report('http', name, results[name])
+        finally:
+            server.shutdown()
+            server.server_close()
+            connections.close_all()
+        return results
+
+    def report(self, mode, name, result):
+        line = (
+            f'{mode:<6} {name:<42} p50: {result["p50_ms"]:>8.1f} мс   p99: {result["p99_ms"]:>8.1f} мс'
+        )
+        if 'queries' in result:
+            line += f'   запросов: {result["queries"]:<4} память: {result["peak_memory_kb"]:>8.1f} КБ'
+        if 'rps' in result:
+            line += f'   {result["rps"]:>7.1f} запр/с'
+        if result['errors']:
+            line += f'   ошибок: {result["errors"]}'
+        self.stdout.write(line)
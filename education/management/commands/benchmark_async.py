@@ -0,0 +1,166 @@
+import asyncio
+import io
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.test.utils import override_settings
+
+from backend.benchmark import NO_CACHE, benchmark_database, percentiles
+
+from .benchmark_serializers import Command as SerializerBenchmark
+
+# (название, обработчик, префикс пути)
+SCENARIOS = [
+    ('wsgi, ViewSet', 'wsgi', '/api/'),
+    ('asgi, ViewSet', 'asgi', '/api/'),
+    ('asgi, async', 'asgi', '/api/async/'),
+]
+
+
+class ThreadCounter:
+    """Максимальное число потоков процесса за время прогона."""
+
+    def __init__(self):
+        self.peak = threading.active_count()
+        self.running = True
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+
+    def sample(self):
+        while self.running:
+            self.peak = max(self.peak, threading.active_count())
+            time.sleep(0.005)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.running = False
+        self.thread.join()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает запросы в секунду, задержку и память при обработке списков каталога: '
+        'ViewSet через WSGI (пул потоков), ViewSet через ASGI и async-представления '
+        '(education/async_views.py) через ASGI. Запросы подаются прямо в обработчики '
+        'Django без сети. Прогон выполняется на временной базе данных.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Число записей каждой модели.')
+        parser.add_argument('--requests', type=int, default=1000, help='Число запросов в каждом прогоне.')
+        parser.add_argument('--concurrency', type=int, default=200, help='Одновременных запросов.')
+        parser.add_argument(
+            '--endpoint', action='append',
+            help='Путь относительно /api/ (можно повторять). По умолчанию - списки каталога.',
+        )
+
+    def handle(self, *args, **options):
+        endpoints = options['endpoint'] or [
+            'programs/?page_size=50', 'mobility-programs/?page_size=50', 'publications/?page_size=50',
+        ]
+        settings = override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver'], CACHES=NO_CACHE)
+        with benchmark_database(), settings:
+            SerializerBenchmark().create_rows(options['rows'])
+            handlers = {'wsgi': get_wsgi_application(), 'asgi': get_asgi_application()}
+            for endpoint in endpoints:
+                self.stdout.write(f'{endpoint} (запросов: {options["requests"]}, '
+                                  f'одновременно: {options["concurrency"]})')
+                for name, kind, prefix in SCENARIOS:
+                    run = self.run_wsgi if kind == 'wsgi' else self.run_asgi
+                    args = (handlers[kind], prefix + endpoint, options['requests'], options['concurrency'])
+                    wall, latencies, statuses, threads = run(*args)
+                    # Память измеряется отдельным прогоном: tracemalloc замедляет обработку.
+                    tracemalloc.start()
+                    run(*args)
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    self.report(name, wall, latencies, statuses, threads, peak)
+
+    def report(self, name, wall, latencies, statuses, threads, peak):
+        stats = percentiles([latency * 1000 for latency in latencies], points=(50, 99))
+        errors = sum(1 for status in statuses if status != 200)
+        self.stdout.write(
+            f'  {name:<14} {len(latencies) / wall:>7.0f} запр/с   p50: {stats["p50"]:>7.1f} мс   '
+            f'p99: {stats["p99"]:>7.1f} мс   потоков: {threads:<4} память: {peak / 2 ** 20:>6.1f} МБ'
+            + (f'   ошибок: {errors}' if errors else '')
+        )
+
+    def run_wsgi(self, handler, url, requests, concurrency):
+        """Запросы к WSGI-обработчику из пула потоков, как в многопоточном WSGI-сервере."""
+        path, _, query = url.partition('?')
+
+        def call(_):
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query,
+                'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_HOST': 'testserver', 'HTTP_ACCEPT': 'application/json', 'REMOTE_ADDR': '127.0.0.1',
+                'wsgi.input': io.BytesIO(), 'wsgi.errors': io.StringIO(), 'wsgi.url_scheme': 'http',
+                'wsgi.version': (1, 0), 'wsgi.multithread': True, 'wsgi.multiprocess': False,
+                'wsgi.run_once': False,
+            }
+            status = []
+            started = time.perf_counter()
+            response = handler(environ, lambda line, headers, exc_info=None: status.append(line))
+            try:
+                b''.join(response)
+            finally:
+                response.close()
+            return int(status[0].split()[0]), time.perf_counter() - started
+
+        with ThreadCounter() as counter:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                results = list(pool.map(call, range(requests)))
+            wall = time.perf_counter() - started
+            # Закрываем соединения потоков пула.
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                list(pool.map(lambda _: connections.close_all(), range(concurrency)))
+        return wall, [latency for _, latency in results], [status for status, _ in results], counter.peak
+
+    def run_asgi(self, handler, url, requests, concurrency):
+        """Запросы к ASGI-обработчику из одного цикла событий, как в uvicorn."""
+        path, _, query = url.partition('?')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+            'root_path': '', 'headers': [(b'host', b'testserver'), (b'accept', b'application/json')],
+            'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+        }
+
+        async def call(semaphore):
+            async with semaphore:
+                messages = iter([{'type': 'http.request', 'body': b'', 'more_body': False}])
+                status = []
+
+                async def receive():
+                    message = next(messages, None)
+                    if message is None:
+                        # Клиент не отключается: ждем, пока Django отменит ожидание.
+                        await asyncio.Future()
+                    return message
+
+                async def send(message):
+                    if message['type'] == 'http.response.start':
+                        status.append(message['status'])
+
+                started = time.perf_counter()
+                await handler(dict(scope), receive, send)
+                return status[0], time.perf_counter() - started
+
+        async def main():
+            semaphore = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(call(semaphore) for _ in range(requests)))
+
+        with ThreadCounter() as counter:
+            started = time.perf_counter()
+            results = asyncio.run(main())
+            wall = time.perf_counter() - started
+        return wall, [latency for _, latency in results], [status for status, _ in results], counter.peak
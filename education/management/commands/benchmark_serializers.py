@@ -0,0 +1,124 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from backend.benchmark import benchmark_database
+from backend.renderers import FastJSONRenderer
+from education import fast_serializers, serializers, views
+from education.models import Accreditation, Application, MobilityProgram, Program, Publication
+from users.models import User
+
+
+class FastView:
+    """Заглушка представления, помечающая ответ для FastJSONRenderer."""
+
+    fast_serialized = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает обычные сериализаторы DRF с JSONRenderer и быстрые сериализаторы '
+        '(education/fast_serializers.py) с FastJSONRenderer на списках из N записей. '
+        'Проверяет, что ответы совпадают побайтно. Прогон выполняется на временной базе данных.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Число записей каждой модели.')
+        parser.add_argument('--repeat', type=int, default=3, help='Число повторов, берется лучшее время.')
+
+    def handle(self, *args, **options):
+        cases = [
+            ('programs', views.ProgramViewSet, serializers.ProgramSerializer,
+             fast_serializers.ProgramFastSerializer),
+            ('accreditations', views.AccreditationViewSet, serializers.AccreditationSerializer,
+             fast_serializers.AccreditationFastSerializer),
+            ('publications', views.PublicationViewSet, serializers.PublicationSerializer,
+             fast_serializers.PublicationFastSerializer),
+            ('mobility', views.MobilityProgramViewSet, serializers.MobilityProgramSerializer,
+             fast_serializers.MobilityProgramFastSerializer),
+            ('applications', views.ApplicationViewSet, serializers.ApplicationSerializer,
+             fast_serializers.ApplicationFastSerializer),
+        ]
+        with benchmark_database():
+            self.create_rows(options['rows'])
+            for name, viewset, serializer_class, fast_class in cases:
+                optimizations = viewset.queryset_optimizations
+                optimize = optimizations.get('list', optimizations.get('default'))
+                queryset = viewset.queryset.all()
+
+                def drf():
+                    rows = optimize(queryset.all()) if optimize else queryset.all()
+                    data = serializer_class(rows, many=True, context={}).data
+                    return JSONRenderer().render(data)
+
+                def fast():
+                    data = fast_class(context={}).serialize(queryset.all())
+                    return FastJSONRenderer().render(data, renderer_context={'view': FastView()})
+
+                drf_time, drf_body = self.measure(drf, options['repeat'])
+                fast_time, fast_body = self.measure(fast, options['repeat'])
+                if drf_body != fast_body:
+                    raise CommandError(f'{name}: ответы быстрого и обычного сериализатора различаются.')
+                self.stdout.write(
+                    f'{name:<15} drf: {drf_time * 1000:>8.1f} мс   fast: {fast_time * 1000:>8.1f} мс   '
+                    f'x{drf_time / fast_time:>5.1f}   {len(fast_body) // 1024} КБ'
+                )
+
+    def measure(self, func, repeat):
+        best, body = None, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, body
+
+    def create_rows(self, count):
+        today = datetime.date(2025, 9, 1)
+        now = timezone.now()
+        universities = User.objects.bulk_create(
+            User(email=f'university{index}@example.com', role=User.UNIVERSITY,
+                 university_name=f'Университет {index}')
+            for index in range(50)
+        )
+        programs = Program.objects.bulk_create(
+            Program(name=f'Программа {index}', description='Описание программы ' * 20, duration=48,
+                    start_date=today, end_date=today + datetime.timedelta(days=1460),
+                    created_at=now, updated_at=now)
+            for index in range(count)
+        )
+        Accreditation.objects.bulk_create(
+            Accreditation(program=programs[index], name=f'Аккредитация {index}', organization='IAAR',
+                          date_received=today - datetime.timedelta(days=index % 365),
+                          expiration_date=today + datetime.timedelta(days=1825),
+                          certificate_number=f'KZ-{index:06d}')
+            for index in range(count)
+        )
+        publications = Publication.objects.bulk_create(
+            Publication(title=f'Публикация {index}', publication_date=today - datetime.timedelta(days=index % 900),
+                        journal_name='Вестник', abstract='Аннотация ' * 30, keywords='наука, образование')
+            for index in range(count)
+        )
+        Publication.authors.through.objects.bulk_create(
+            Publication.authors.through(publication_id=publication.pk, user_id=universities[index % 50].pk)
+            for index, publication in enumerate(publications)
+        )
+        MobilityProgram.objects.bulk_create(
+            MobilityProgram(name=f'Обмен {index}', description='Описание ' * 40, host_institution='TU Berlin',
+                            country='Германия', city='Берлин', start_date=today,
+                            end_date=today + datetime.timedelta(days=180),
+                            application_deadline=today - datetime.timedelta(days=index % 120),
+                            requirements='Требования ' * 20, benefits='Преимущества ' * 20)
+            for index in range(count)
+        )
+        statuses = [status for status, _ in Application.STATUS_CHOICES]
+        Application.objects.bulk_create(
+            Application(name=f'Абитуриент {index}', email=f'student{index}@example.com', phone='+77000000000',
+                        subject='Поступление', message='Текст заявки ' * 10,
+                        status=statuses[index % len(statuses)],
+                        university=universities[index % 50] if index % 7 else None)
+            for index in range(count)
+        )
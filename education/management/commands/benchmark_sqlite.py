@@ -0,0 +1,115 @@
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from backend.sqlite import apply_pragmas
+
+# Значения по умолчанию SQLite и модуля sqlite3, с которыми Django работает без профиля.
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+}
+
+SCHEMA = """
+    CREATE TABLE application (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name VARCHAR(255) NOT NULL,
+        email VARCHAR(254) NOT NULL,
+        subject VARCHAR(255) NOT NULL,
+        message TEXT NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        created_at DATETIME NOT NULL
+    );
+    CREATE INDEX application_created_idx ON application (created_at DESC, id DESC);
+"""
+
+INSERT = """
+    INSERT INTO application (name, email, subject, message, status, created_at)
+    VALUES ('Абитуриент', 'student@example.com', 'Поступление', ?, 'new', datetime('now'))
+"""
+
+SELECT = 'SELECT id, name, status, created_at FROM application ORDER BY created_at DESC, id DESC LIMIT 20'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite при параллельных чтениях и записи '
+        'с настройками по умолчанию и с профилем производительности (SQLITE_PRAGMAS).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--duration', type=float, default=5.0, help='Длительность каждого прогона, с.')
+        parser.add_argument('--readers', type=int, default=4, help='Число потоков чтения.')
+        parser.add_argument('--writers', type=int, default=2, help='Число потоков записи.')
+        parser.add_argument('--rows', type=int, default=10000, help='Число строк перед прогоном.')
+
+    def handle(self, *args, **options):
+        profiles = [
+            ('default', DEFAULT_PRAGMAS),
+            ('performance', {'journal_mode': settings.SQLITE_JOURNAL_MODE, **settings.SQLITE_PRAGMAS}),
+        ]
+        results = {}
+        for name, pragmas in profiles:
+            results[name] = self.run_profile(pragmas, options)
+            reads, writes, errors = results[name]
+            self.stdout.write(
+                f'{name:<12} reads/s: {reads / options["duration"]:>10.1f}   '
+                f'writes/s: {writes / options["duration"]:>8.1f}   errors: {errors}'
+            )
+
+        default_total = sum(results['default'][:2]) or 1
+        speedup = sum(results['performance'][:2]) / default_total
+        self.stdout.write(self.style.SUCCESS(f'Общая пропускная способность: x{speedup:.2f}'))
+
+    def connect(self, path, pragmas):
+        connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+        apply_pragmas(connection.cursor(), pragmas)
+        return connection
+
+    def run_profile(self, pragmas, options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / 'benchmark.sqlite3')
+            connection = self.connect(path, pragmas)
+            connection.executescript(SCHEMA)
+            connection.execute('BEGIN')
+            connection.executemany(INSERT, (('x' * 500,) for _ in range(options['rows'])))
+            connection.execute('COMMIT')
+            connection.close()
+
+            counters = {'reads': 0, 'writes': 0, 'errors': 0}
+            lock = threading.Lock()
+            deadline = time.monotonic() + options['duration']
+
+            def worker(kind):
+                db = self.connect(path, pragmas)
+                done = errors = 0
+                while time.monotonic() < deadline:
+                    try:
+                        if kind == 'writes':
+                            db.execute('BEGIN IMMEDIATE')
+                            db.execute(INSERT, ('x' * 500,))
+                            db.execute('COMMIT')
+                        else:
+                            db.execute(SELECT).fetchall()
+                        done += 1
+                    except sqlite3.OperationalError:
+                        errors += 1
+                        if db.in_transaction:
+                            db.execute('ROLLBACK')
+                db.close()
+                with lock:
+                    counters[kind] += done
+                    counters['errors'] += errors
+
+            threads = [threading.Thread(target=worker, args=('reads',)) for _ in range(options['readers'])]
+            threads += [threading.Thread(target=worker, args=('writes',)) for _ in range(options['writers'])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            return counters['reads'], counters['writes'], counters['errors']
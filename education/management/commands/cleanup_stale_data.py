@@ -0,0 +1,48 @@
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from backend.cleanup import delete_in_batches
+from education.models import MobilityProgram
+from users.models import PasswordResetToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет устаревшие данные пачками (backend.cleanup): использованные и просроченные '
+        'токены сброса пароля, истекшие сессии и неактивные программы мобильности, срок подачи '
+        'заявок в которые прошел более MOBILITY_ARCHIVE_RETENTION_DAYS дней назад.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.CLEANUP_BATCH_SIZE,
+            help='Строк в одной транзакции удаления.',
+        )
+        parser.add_argument(
+            '--pause', type=float, default=settings.CLEANUP_BATCH_PAUSE,
+            help='Пауза между пачками, с.',
+        )
+
+    def handle(self, *args, **options):
+        def delete(queryset):
+            return delete_in_batches(queryset, options['batch_size'], options['pause'])
+
+        count = delete(PasswordResetToken.objects.stale())
+        self.stdout.write(f'Удалено токенов сброса пароля: {count}')
+
+        engine = import_module(settings.SESSION_ENGINE)
+        if hasattr(engine.SessionStore, 'get_model_class'):
+            session_model = engine.SessionStore.get_model_class()
+            count = delete(session_model.objects.filter(expire_date__lt=timezone.now()))
+            self.stdout.write(f'Удалено сессий: {count}')
+        else:
+            # Сессии не в базе данных: хранилище очищает их само.
+            engine.SessionStore.clear_expired()
+
+        deadline = timezone.localdate() - timedelta(days=settings.MOBILITY_ARCHIVE_RETENTION_DAYS)
+        count = delete(MobilityProgram.objects.filter(is_active=False, application_deadline__lt=deadline))
+        self.stdout.write(f'Удалено программ мобильности: {count}')
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from education.models import UploadSession
+from education.uploads import discard_upload
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет загрузки файлов, не обновлявшиеся дольше UPLOAD_SESSION_TTL секунд, '
+        'вместе с полученными частями (education.uploads).'
+    )
+
+    def handle(self, *args, **options):
+        expired = timezone.now() - timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+        count = 0
+        for session in UploadSession.objects.filter(updated_at__lt=expired).iterator():
+            discard_upload(session)
+            count += 1
+        self.stdout.write(f'Удалено загрузок: {count}')
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from backend.sqlite import set_journal_mode
+
+
+class Command(BaseCommand):
+    help = (
+        'Переводит базы SQLite в режим журнала SQLITE_JOURNAL_MODE (WAL). Режим хранится в '
+        'файле базы, поэтому команду достаточно выполнить один раз при развертывании.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=None,
+            help='Псевдоним базы данных (по умолчанию все базы SQLite).',
+        )
+
+    def handle(self, *args, **options):
+        if options['database']:
+            aliases = [options['database']]
+        else:
+            aliases = [alias for alias in connections if connections[alias].vendor == 'sqlite']
+        for alias in aliases:
+            connection = connections[alias]
+            if connection.vendor != 'sqlite':
+                raise CommandError(f'База {alias} не использует SQLite.')
+            self.stdout.write(f'{alias}: {set_journal_mode(connection)}')
@@ -0,0 +1,62 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from education.extraction import PdfReader
+from education.indexing import enqueue_missing, extract_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Извлекает текст из файлов публикаций из очереди (education.indexing) в пуле процессов, '
+        'выделяет ключевые слова и обновляет поисковый индекс. Можно запускать несколько '
+        'экземпляров: задания распределяются между ними.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Процессов извлечения текста (0 - в текущем процессе).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.TEXT_EXTRACTION_BATCH_SIZE,
+            help='Число файлов в пачке.',
+        )
+        parser.add_argument(
+            '--enqueue-missing', action='store_true',
+            help='Сначала поставить в очередь файлы, которых в ней нет (после импорта или update()).',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, опрашивая очередь.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help='Пауза между опросами пустой очереди в режиме --loop, с.',
+        )
+
+    def handle(self, *args, **options):
+        if options['enqueue_missing']:
+            self.stdout.write(f'Поставлено в очередь: {enqueue_missing()}')
+        if PdfReader is None:
+            self.stderr.write(
+                'Пакет pypdf не установлен: PDF-файлы остаются в очереди до его установки.'
+            )
+        workers = options['workers']
+        if workers:
+            # Дочерние процессы не должны унаследовать открытые соединения с базой.
+            connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers) if workers else nullcontext() as executor:
+            while True:
+                done, failed, claimed = extract_batch(options['batch_size'], executor)
+                if claimed:
+                    self.stdout.write(f'Извлечено: {done}, ошибок: {failed}')
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from education.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает статистику заявок по ВУЗам, статусам и дням (education.stats).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Псевдоним базы данных.')
+
+    def handle(self, *args, **options):
+        count = rebuild_stats(using=options['database'])
+        self.stdout.write(f'Групп статистики: {count}')
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from education.models import Program, Publication
+from education.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс публикаций и образовательных программ.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Псевдоним базы данных.')
+
+    def handle(self, *args, **options):
+        for model in (Publication, Program):
+            count = rebuild_index(model, using=options['database'])
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {count}')
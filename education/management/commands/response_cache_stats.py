@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from education.cache import get_cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает счетчики попаданий и промахов кеша ответов API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Обнулить счетчики после вывода.')
+
+    def handle(self, *args, **options):
+        stats = get_cache_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(f"hits: {stats['hits']}")
+        self.stdout.write(f"misses: {stats['misses']}")
+        self.stdout.write(f'hit ratio: {ratio:.2%}')
+        if options['reset']:
+            reset_cache_stats()
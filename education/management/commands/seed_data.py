@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from education.seed import BASE_COUNTS, seed
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу правдоподобными данными через bulk_create (education.seed): '
+        'пользователи всех ролей, программы, аккредитации, публикации с авторами, '
+        'программы мобильности и заявки. При scale=1: '
+        + ', '.join(f'{name} - {count}' for name, count in BASE_COUNTS.items()) + '.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0, help='Множитель объема данных.')
+        parser.add_argument('--seed', type=int, default=0, help='Число для генератора случайных чисел.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Записей в одном INSERT.')
+
+    def handle(self, *args, **options):
+        if User.objects.filter(email__endswith=f'.seed{options["seed"]}@example.com').exists():
+            raise CommandError(f'Данные с --seed {options["seed"]} уже созданы, укажите другой --seed.')
+        created = seed(options['scale'], options['seed'], options['batch_size'])
+        for name, count in created.items():
+            self.stdout.write(f'{name}: {count}')
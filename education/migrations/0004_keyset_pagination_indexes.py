@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-17 20:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('education', '0003_application'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='accreditation',
+            index=models.Index(fields=['-date_received', '-id'], name='accred_received_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['-created_at', '-id'], name='application_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mobilityprogram',
+            index=models.Index(fields=['-application_deadline', '-id'], name='mobility_deadline_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='program',
+            index=models.Index(fields=['-created_at', '-id'], name='program_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publication',
+            index=models.Index(fields=['-publication_date', '-id'], name='publication_date_id_idx'),
+        ),
+    ]
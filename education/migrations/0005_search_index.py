@@ -0,0 +1,63 @@
+from django.db import migrations
+
+from education.stemming import stem_text
+
+# Состояние индекса на момент миграции; education.search меняется вместе с
+# моделями, поэтому таблицы и поля индекса зафиксированы здесь. Индекс по
+# текущим полям строит команда rebuild_search_index.
+SEARCH_INDEXES = {
+    'Publication': ('education_publication_search', ('title', 'keywords'), ('abstract', 'journal_name')),
+    'Program': ('education_program_search', ('name',), ('description',)),
+}
+
+CREATE_SQL = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+        "USING fts5(title, body, tokenize = 'unicode61 remove_diacritics 2')",
+    ],
+    'postgresql': [
+        'CREATE TABLE IF NOT EXISTS {table} (object_id bigint PRIMARY KEY, document tsvector NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS {table}_gin ON {table} USING GIN (document)',
+    ],
+}
+
+INSERT_SQL = {
+    'sqlite': 'INSERT INTO {table} (rowid, title, body) VALUES (%s, %s, %s)',
+    'postgresql': (
+        "INSERT INTO {table} (object_id, document) VALUES (%s, "
+        "setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'D'))"
+    ),
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor not in CREATE_SQL:
+        raise NotImplementedError(f'Полнотекстовый поиск не поддерживается для {connection.vendor}.')
+    with connection.cursor() as cursor:
+        for name, (table, title_fields, body_fields) in SEARCH_INDEXES.items():
+            for sql in CREATE_SQL[connection.vendor]:
+                cursor.execute(sql.format(table=table))
+            model = apps.get_model('education', name)
+            rows = model._default_manager.using(connection.alias).values_list('pk', *title_fields, *body_fields)
+            for pk, *values in rows.iterator(chunk_size=1000):
+                title = ' '.join(stem_text(value) for value in values[:len(title_fields)])
+                body = ' '.join(stem_text(value) for value in values[len(title_fields):])
+                cursor.execute(INSERT_SQL[connection.vendor].format(table=table), [pk, title, body])
+
+
+def drop_search_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for table, *_ in SEARCH_INDEXES.values():
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('education', '0004_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('education', '0005_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['university', 'status', 'created_at'], name='application_univ_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mobilityprogram',
+            index=models.Index(fields=['is_active', 'application_deadline'], name='mobility_active_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mobilityprogram',
+            index=models.Index(fields=['country', 'start_date'], name='mobility_country_start_idx'),
+        ),
+    ]
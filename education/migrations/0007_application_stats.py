@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('education', '0006_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('new', 'Новая'), ('in_progress', 'В обработке'), ('completed', 'Завершена'), ('rejected', 'Отклонена')], max_length=20, verbose_name='Статус')),
+                ('day', models.DateField(verbose_name='День создания заявок')),
+                ('count', models.IntegerField(default=0, verbose_name='Число заявок')),
+                ('university', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='application_stats', to=settings.AUTH_USER_MODEL, verbose_name='ВУЗ')),
+            ],
+            options={
+                'verbose_name': 'статистика заявок',
+                'verbose_name_plural': 'статистика заявок',
+                'indexes': [models.Index(fields=['day'], name='application_stat_day_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('university__isnull', False)), fields=('university', 'status', 'day'), name='application_stat_key'), models.UniqueConstraint(condition=models.Q(('university__isnull', True)), fields=('status', 'day'), name='application_stat_no_university_key')],
+            },
+        ),
+    ]
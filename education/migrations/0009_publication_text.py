@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:22
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('education', '0008_upload_sessions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublicationText',
+            fields=[
+                ('publication', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='extracted_text', serialize=False, to='education.publication', verbose_name='Публикация')),
+                ('file_name', models.CharField(max_length=255, verbose_name='Файл')),
+                ('text', models.TextField(blank=True, verbose_name='Текст')),
+                ('keywords', models.CharField(blank=True, max_length=255, verbose_name='Ключевые слова')),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('processing', 'Обрабатывается'), ('done', 'Извлечен'), ('failed', 'Ошибка')], default='pending', max_length=20, verbose_name='Статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Следующая попытка')),
+                ('claim_token', models.CharField(blank=True, max_length=32)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('extracted_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата извлечения')),
+            ],
+            options={
+                'verbose_name': 'текст публикации',
+                'verbose_name_plural': 'тексты публикаций',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='publication_text_queue_idx')],
+            },
+        ),
+    ]
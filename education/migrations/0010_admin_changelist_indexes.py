@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('education', '0009_publication_text'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['status', '-created_at'], name='application_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='program',
+            index=models.Index(fields=['start_date'], name='program_start_date_idx'),
+        ),
+    ]
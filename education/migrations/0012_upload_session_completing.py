@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 22:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('education', '0011_application_status_history'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='uploadsession',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Загружается'), ('completing', 'Завершается'), ('completed', 'Завершена')], default='pending', max_length=20, verbose_name='Статус'),
+        ),
+    ]
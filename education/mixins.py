@@ -0,0 +1,319 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.decorators import action
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from backend.metrics import phase
+
+from .search import highlight, search
+
+User = get_user_model()
+
+# Поля пользователя, которые читает UserBriefSerializer (включая get_full_name).
+USER_BRIEF_FIELDS = ('id', 'email', 'first_name', 'last_name', 'role', 'university_name')
+
+
+def prefetch_authors(queryset):
+    """
+    Подгружает авторов публикаций одним запросом и только нужные колонки.
+    Авторы упорядочены по id, как в PublicationFastSerializer.
+    """
+    return queryset.prefetch_related(
+        Prefetch('authors', queryset=User.objects.only(*USER_BRIEF_FIELDS).order_by('id'))
+    )
+
+
+def select_program_name(queryset):
+    """Присоединяет программу аккредитации, не загружая ее описание."""
+    return queryset.select_related('program').defer('program__description')
+
+
+def select_program(queryset):
+    """Присоединяет программу аккредитации целиком."""
+    return queryset.select_related('program')
+
+
+def prefetch_accreditations(queryset):
+    """Подгружает аккредитации программ одним запросом."""
+    return queryset.prefetch_related('accreditations')
+
+
+def select_university_name(queryset):
+    """Присоединяет ВУЗ заявки, загружая из таблицы пользователей только название."""
+    fields = [field.name for field in queryset.model._meta.concrete_fields]
+    return queryset.select_related('university').only(*fields, 'university__university_name')
+
+
+class QuerysetOptimizationMixin:
+    """
+    Применяет оптимизации queryset в зависимости от действия ViewSet.
+
+    В `queryset_optimizations` задается словарь {действие: функция}, где
+    функция принимает queryset и возвращает оптимизированный. Ключ 'default'
+    используется для действий, не перечисленных явно.
+    """
+    
+    queryset_optimizations = {}
+    
+    def optimize_queryset(self, queryset):
+        optimizations = self.queryset_optimizations
+        optimize = optimizations.get(self.action, optimizations.get('default'))
+        if optimize is None:
+            return queryset
+        return optimize(queryset)
+    
+    def get_queryset(self):
+        return self.optimize_queryset(super().get_queryset())
+
+
+DISPLAY_METHOD_RE = re.compile(r'get_(\w+)_display')
+
+
+def serializer_lookups(serializer, model):
+    """
+    Определяет, что читает сериализатор из экземпляра модели.
+
+    Возвращает (колонки, связи для select_related, связи для prefetch_related),
+    где связи select_related - словарь {связь: колонки связанной модели или
+    None, если нужна вся запись}. Возвращает None, если сериализатор читает
+    атрибуты, которые нельзя сопоставить с колонками (source='*', методы).
+    """
+    columns, selected, prefetched = {model._meta.pk.name}, {}, set()
+    field_sources = getattr(getattr(serializer, 'Meta', None), 'field_sources', {})
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.SerializerMethodField):
+            if name not in field_sources:
+                return None
+            columns.update(field_sources[name])
+            continue
+        if field.source == '*':
+            return None
+
+        attr, *rest = field.source_attrs
+        match = DISPLAY_METHOD_RE.fullmatch(attr)
+        if match and not rest:
+            attr = match.group(1)
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+
+        if model_field.many_to_many or model_field.one_to_many:
+            prefetched.add(attr)
+            child = field.child if isinstance(field, serializers.ListSerializer) else field
+            if model_field.one_to_many and isinstance(child, serializers.BaseSerializer):
+                # Вложенные записи ссылаются на уже загруженного родителя
+                # (program_name у аккредитаций программы): его колонки тоже нужны.
+                nested = serializer_lookups(child, model_field.related_model)
+                if nested is None:
+                    return None
+                back = nested[1].get(model_field.field.name, set())
+                if back is None:
+                    return None
+                columns.update(back)
+        elif model_field.is_relation and model_field.concrete:
+            columns.add(attr)
+            child = field.child if isinstance(field, serializers.ListSerializer) else field
+            if rest:
+                related = selected.setdefault(attr, set())
+                if related is not None:
+                    related.add(rest[0])
+            elif isinstance(child, serializers.BaseSerializer):
+                nested = serializer_lookups(child, model_field.related_model)
+                related = nested[0] if nested and not nested[1] and not nested[2] else None
+                current = selected.get(attr, set())
+                selected[attr] = None if related is None or current is None else current | related
+        elif model_field.concrete:
+            columns.add(attr)
+        else:
+            return None
+    return columns, selected, prefetched
+
+
+def restrict_queryset(queryset, serializer):
+    """
+    Сокращает queryset до данных, которые выводит сериализатор: загружает
+    только нужные колонки (only), присоединяет и подгружает только нужные
+    связи. Существующие Prefetch с настроенными queryset сохраняются.
+    """
+    lookups = serializer_lookups(serializer, queryset.model)
+    if lookups is None:
+        return queryset
+    columns, selected, prefetched = lookups
+
+    # Поля сортировки нужны пагинации для курсора последней записи.
+    columns.update(field.lstrip('-') for field in queryset.model._meta.ordering)
+    only = set(columns)
+    for name, related_columns in selected.items():
+        related_model = queryset.model._meta.get_field(name).related_model
+        if related_columns is None:
+            related_columns = [field.name for field in related_model._meta.concrete_fields]
+        only.update(f'{name}__{column}' for column in {related_model._meta.pk.name, *related_columns})
+
+    kept = [
+        lookup for lookup in queryset._prefetch_related_lookups
+        if (lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup).split('__')[0] in prefetched
+    ]
+    existing = {(lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup) for lookup in kept}
+    kept += sorted(prefetched - existing)
+
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if selected:
+        queryset = queryset.select_related(*selected)
+    if kept:
+        queryset = queryset.prefetch_related(*kept)
+    # defer(None) сбрасывает прежние defer(): иначе only() их сохранит.
+    return queryset.defer(None).only(*sorted(only))
+
+
+def sparse_param(request, name):
+    """Список из параметра ?fields= или ?expand= запроса чтения, иначе None."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+class SparseFieldsetMixin(QuerysetOptimizationMixin):
+    """
+    Выбор полей ответа (?fields=id,name) и разворачивание связей (?expand=program)
+    для запросов чтения; сериализатор должен использовать DynamicFieldsMixin.
+
+    Для действий из `sparse_queryset_actions` выбранные поля сокращают и сам
+    запрос к базе (см. restrict_queryset). Развернутые связи добавляются к
+    зависимостям ConditionalGetMixin, поэтому миксин должен стоять перед ним.
+    """
+
+    sparse_queryset_actions = ('list', 'retrieve')
+
+    def get_sparse_param(self, name):
+        return sparse_param(getattr(self, 'request', None), name)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_sparse_param('fields')
+        context['expand'] = self.get_sparse_param('expand')
+        return context
+
+    def get_expanded_relations(self):
+        meta = getattr(self.get_serializer_class(), 'Meta', None)
+        expandable = getattr(meta, 'expandable_fields', {})
+        return [name for name in self.get_sparse_param('expand') or () if name in expandable]
+
+    def get_conditional_dependencies(self):
+        related = tuple(super().get_conditional_dependencies())
+        return related + tuple(name for name in self.get_expanded_relations() if name not in related)
+
+    def optimize_queryset(self, queryset):
+        queryset = super().optimize_queryset(queryset)
+        if self.action not in self.sparse_queryset_actions:
+            return queryset
+        if self.get_sparse_param('fields') is None and not self.get_expanded_relations():
+            return queryset
+        return restrict_queryset(queryset, self.get_serializer())
+
+
+class FastReadMixin(SparseFieldsetMixin):
+    """
+    Отдает списки через быстрый сериализатор (см. fast_serializers.py).
+
+    Быстрый путь используется для действий из `fast_actions`, если ответ
+    рендерится в JSON и не запрошено разворачивание связей (?expand=);
+    ?fields= поддерживается. В остальных случаях работает обычный сериализатор.
+    Пользовательские действия-списки получают данные через serialize_list().
+    """
+
+    fast_serializer_class = None
+    fast_actions = ('list',)
+    fast_serialized = False
+
+    def use_fast_serializer(self):
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        return (
+            self.fast_serializer_class is not None
+            and self.action in self.fast_actions
+            and self.request.method in SAFE_METHODS
+            and renderer is not None and renderer.format == 'json'
+            and not self.get_expanded_relations()
+        )
+
+    def get_fast_serializer(self):
+        # Ответ помечается для FastJSONRenderer (backend/renderers.py).
+        self.fast_serialized = True
+        return self.fast_serializer_class(
+            context=self.get_serializer_context(), fields=self.get_sparse_param('fields'),
+        )
+
+    def get_pagination_fields(self):
+        """Поля сортировки, которые пагинация читает из последней строки страницы."""
+        get_ordering = getattr(self.paginator, 'get_ordering', None)
+        if get_ordering is None:
+            return []
+        return [field.lstrip('-') for field in get_ordering(self.request, self.get_queryset(), self)]
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_serializer():
+            return super().list(request, *args, **kwargs)
+        serializer = self.get_fast_serializer()
+        rows = serializer.values(
+            self.filter_queryset(self.get_queryset()), extra=self.get_pagination_fields(),
+        )
+        page = self.paginate_queryset(rows)
+        with phase('serialization'):
+            data = serializer.to_representation(rows if page is None else page)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def serialize_list(self, queryset):
+        """Данные списка без пагинации для пользовательских действий."""
+        if self.use_fast_serializer():
+            with phase('serialization'):
+                return self.get_fast_serializer().serialize(queryset)
+        return self.get_serializer(queryset, many=True).data
+
+
+class FullTextSearchMixin:
+    """
+    Добавляет в ViewSet действие search (?q=...&limit=...) с полнотекстовым поиском.
+
+    Результаты отсортированы по релевантности; к каждому объекту добавляются
+    ранг (search_rank) и фрагмент текста с выделенными совпадениями (search_snippet).
+    """
+    
+    search_limit = 20
+    max_search_limit = 100
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Полнотекстовый поиск."""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"detail": "Необходимо указать q."}, status=400)
+        try:
+            limit = min(int(request.query_params.get('limit', self.search_limit)), self.max_search_limit)
+        except ValueError:
+            return Response({"detail": "limit должен быть числом."}, status=400)
+        
+        ranked = search(self.get_queryset().model, query, limit=max(limit, 1))
+        instances = self.get_queryset().in_bulk([pk for pk, _ in ranked])
+        results = []
+        for pk, rank in ranked:
+            instance = instances.get(pk)
+            if instance is None:
+                continue
+            data = self.get_serializer(instance).data
+            data['search_rank'] = rank
+            data['search_snippet'] = highlight(instance, query)
+            results.append(data)
+        return Response(results)
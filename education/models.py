@@ -1,4 +1,7 @@
-from django.db import models
+import uuid
+
+from django.db import models, router, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from users.models import User
 
@@ -19,6 +22,10 @@ class Program(models.Model):
         verbose_name = _('образовательная программа')
         verbose_name_plural = _('образовательные программы')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='program_created_id_idx'),
+            models.Index(fields=['start_date'], name='program_start_date_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -46,6 +53,9 @@ class Accreditation(models.Model):
         verbose_name = _('аккредитация')
         verbose_name_plural = _('аккредитации')
         ordering = ['-date_received']
+        indexes = [
+            models.Index(fields=['-date_received', '-id'], name='accred_received_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.program.name}"
@@ -74,6 +84,9 @@ class Publication(models.Model):
         verbose_name = _('публикация')
         verbose_name_plural = _('публикации')
         ordering = ['-publication_date']
+        indexes = [
+            models.Index(fields=['-publication_date', '-id'], name='publication_date_id_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -102,6 +115,11 @@ class MobilityProgram(models.Model):
         verbose_name = _('программа мобильности')
         verbose_name_plural = _('программы мобильности')
         ordering = ['-application_deadline']
+        indexes = [
+            models.Index(fields=['-application_deadline', '-id'], name='mobility_deadline_id_idx'),
+            models.Index(fields=['is_active', 'application_deadline'], name='mobility_active_deadline_idx'),
+            models.Index(fields=['country', 'start_date'], name='mobility_country_start_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.host_institution} ({self.country})"
@@ -122,6 +140,14 @@ class Application(models.Model):
         (STATUS_REJECTED, _('Отклонена')),
     ]
     
+    # Допустимые переходы статусов (education/workflow.py): {из: (в, ...)}
+    TRANSITIONS = {
+        STATUS_NEW: (STATUS_IN_PROGRESS, STATUS_REJECTED),
+        STATUS_IN_PROGRESS: (STATUS_COMPLETED, STATUS_REJECTED),
+        STATUS_REJECTED: (STATUS_NEW,),
+        STATUS_COMPLETED: (),
+    }
+    
     name = models.CharField(_('ФИО'), max_length=255)
     email = models.EmailField(_('Email'))
     phone = models.CharField(_('Телефон'), max_length=20)
@@ -144,6 +170,206 @@ class Application(models.Model):
         verbose_name = _('заявка')
         verbose_name_plural = _('заявки')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='application_created_id_idx'),
+            models.Index(fields=['university', 'status', 'created_at'], name='application_univ_status_idx'),
+            models.Index(fields=['status', '-created_at'], name='application_status_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.subject} ({self.get_status_display()})"
+    
+    def save(self, *args, **kwargs):
+        # Статистика заявок (stats.py) обновляется сигналами в той же транзакции.
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
+class ApplicationStatusChange(models.Model):
+    """
+    Смена статуса заявки. Журнал только пополняется и пишется пачками
+    (см. workflow.py), поэтому строка хранит лишь ключи и время.
+    """
+    
+    application = models.ForeignKey(
+        Application,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='status_changes',
+        verbose_name=_('Заявка')
+    )
+    from_status = models.CharField(_('Прежний статус'), max_length=20, choices=Application.STATUS_CHOICES)
+    to_status = models.CharField(_('Новый статус'), max_length=20, choices=Application.STATUS_CHOICES)
+    changed_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_('Изменил')
+    )
+    changed_at = models.DateTimeField(_('Дата изменения'), default=timezone.now)
+    
+    class Meta:
+        verbose_name = _('смена статуса заявки')
+        verbose_name_plural = _('история статусов заявок')
+        indexes = [
+            models.Index(fields=['application', 'changed_at'], name='application_status_change_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.application_id}: {self.from_status} -> {self.to_status}"
+
+
+class ApplicationStat(models.Model):
+    """
+    Число заявок ВУЗа с данным статусом, созданных в данный день.
+
+    Таблица поддерживается при сохранении и удалении заявок (см. stats.py),
+    поэтому статистика считается по группам, а не по всем заявкам.
+    """
+    
+    university = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='application_stats',
+        verbose_name=_('ВУЗ')
+    )
+    status = models.CharField(_('Статус'), max_length=20, choices=Application.STATUS_CHOICES)
+    day = models.DateField(_('День создания заявок'))
+    count = models.IntegerField(_('Число заявок'), default=0)
+    
+    class Meta:
+        verbose_name = _('статистика заявок')
+        verbose_name_plural = _('статистика заявок')
+        constraints = [
+            # NULL в уникальном ключе не совпадает с NULL, поэтому для заявок
+            # без ВУЗа нужен отдельный ключ.
+            models.UniqueConstraint(
+                fields=['university', 'status', 'day'],
+                condition=models.Q(university__isnull=False),
+                name='application_stat_key',
+            ),
+            models.UniqueConstraint(
+                fields=['status', 'day'],
+                condition=models.Q(university__isnull=True),
+                name='application_stat_no_university_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='application_stat_day_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.university_id} - {self.status} - {self.day}: {self.count}"
+
+
+class StoredFile(models.Model):
+    """Файл в хранилище. Одинаковое содержимое (по SHA-256) хранится один раз."""
+    
+    sha256 = models.CharField(_('SHA-256'), max_length=64, unique=True)
+    name = models.CharField(_('Имя в хранилище'), max_length=255)
+    size = models.PositiveBigIntegerField(_('Размер, байт'))
+    created_at = models.DateTimeField(_('Дата создания'), auto_now_add=True)
+    
+    class Meta:
+        verbose_name = _('файл')
+        verbose_name_plural = _('файлы')
+    
+    def __str__(self):
+        return self.name
+
+
+class UploadSession(models.Model):
+    """Загрузка файла частями, которую можно продолжить после обрыва (см. uploads.py)."""
+    
+    STATUS_PENDING = 'pending'
+    STATUS_COMPLETING = 'completing'
+    STATUS_COMPLETED = 'completed'
+    
+    STATUS_CHOICES = [
+        (STATUS_PENDING, _('Загружается')),
+        (STATUS_COMPLETING, _('Завершается')),
+        (STATUS_COMPLETED, _('Завершена')),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+        verbose_name=_('Пользователь')
+    )
+    filename = models.CharField(_('Имя файла'), max_length=255)
+    size = models.PositiveBigIntegerField(_('Размер, байт'))
+    sha256 = models.CharField(_('SHA-256'), max_length=64, blank=True)
+    offset = models.PositiveBigIntegerField(_('Получено байт'), default=0)
+    status = models.CharField(_('Статус'), max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    stored_file = models.ForeignKey(
+        StoredFile,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload_sessions',
+        verbose_name=_('Файл')
+    )
+    created_at = models.DateTimeField(_('Дата создания'), auto_now_add=True)
+    updated_at = models.DateTimeField(_('Дата обновления'), auto_now=True)
+    
+    class Meta:
+        verbose_name = _('загрузка файла')
+        verbose_name_plural = _('загрузки файлов')
+    
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+
+class PublicationText(models.Model):
+    """
+    Текст, извлеченный из файла публикации, и задание на его извлечение
+    (см. extraction.py). Хранится отдельно, чтобы списки публикаций не читали
+    текст файлов.
+    """
+    
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    
+    STATUS_CHOICES = [
+        (STATUS_PENDING, _('В очереди')),
+        (STATUS_PROCESSING, _('Обрабатывается')),
+        (STATUS_DONE, _('Извлечен')),
+        (STATUS_FAILED, _('Ошибка')),
+    ]
+    
+    publication = models.OneToOneField(
+        Publication,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='extracted_text',
+        verbose_name=_('Публикация')
+    )
+    file_name = models.CharField(_('Файл'), max_length=255)
+    text = models.TextField(_('Текст'), blank=True)
+    keywords = models.CharField(_('Ключевые слова'), max_length=255, blank=True)
+    status = models.CharField(_('Статус'), max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(_('Попыток'), default=0)
+    next_attempt_at = models.DateTimeField(_('Следующая попытка'), default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(_('Последняя ошибка'), blank=True)
+    extracted_at = models.DateTimeField(_('Дата извлечения'), null=True, blank=True)
+    
+    class Meta:
+        verbose_name = _('текст публикации')
+        verbose_name_plural = _('тексты публикаций')
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='publication_text_queue_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.publication_id}: {self.file_name} ({self.status})"
@@ -0,0 +1,83 @@
+import csv
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # orjson необязателен: без него используется стандартный json
+    orjson = None
+
+
+class Echo:
+    """Псевдофайл для csv.writer: write() возвращает строку, а не пишет ее."""
+
+    def write(self, value):
+        return value
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Рендерит список объектов в NDJSON (один JSON-объект на строку).
+
+    Для потоковой выдачи используется stream(), принимающий итератор пачек строк.
+    """
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def dumps(self, item):
+        if orjson is not None:
+            return orjson.dumps(item, default=encoders.JSONEncoder().default) + b'\n'
+        return json.dumps(
+            item, cls=encoders.JSONEncoder, ensure_ascii=False, separators=(',', ':'),
+        ).encode() + b'\n'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        return b''.join(self.dumps(item) for item in items)
+
+    def stream(self, chunks, fields):
+        for chunk in chunks:
+            yield b''.join(self.dumps(item) for item in chunk)
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Рендерит список объектов в CSV с заголовком. Отсутствующие ключи
+    выводятся пустыми ячейками. Строки, которые табличный редактор принял бы
+    за формулу, начинаются с апострофа.
+
+    Для потоковой выдачи используется stream(), принимающий итератор пачек строк.
+    """
+
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+    # Первые символы, с которых Excel и LibreOffice начинают формулу.
+    formula_prefixes = ('=', '+', '-', '@', '\t', '\r')
+
+    def escape(self, value):
+        if isinstance(value, str) and value.startswith(self.formula_prefixes):
+            return f"'{value}"
+        return value
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        fields = list(dict.fromkeys(key for item in items for key in item))
+        return b''.join(self.stream([items], fields))
+
+    def stream(self, chunks, fields):
+        writer = csv.DictWriter(Echo(), fieldnames=fields, restval='', extrasaction='ignore')
+        yield writer.writeheader().encode(self.charset)
+        for chunk in chunks:
+            yield ''.join(
+                writer.writerow({key: self.escape(value) for key, value in item.items()})
+                for item in chunk
+            ).encode(self.charset)
@@ -0,0 +1,220 @@
+"""
+Полнотекстовый поиск по публикациям и образовательным программам.
+
+Для каждой модели ведется отдельный инвертированный индекс, ключом которого
+служит первичный ключ записи: виртуальная таблица FTS5 в SQLite или таблица
+с tsvector и GIN-индексом в PostgreSQL. Тексты индексируются уже приведенными
+к основам (см. stemming.py), поэтому русская и казахская морфология
+обрабатываются одинаково на обеих СУБД.
+"""
+
+import re
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connections, router
+from django.utils.html import escape
+
+from .stemming import stem_text, stem_word, tokenize
+
+# Описание индексируемых моделей: {метка модели: (таблица индекса, поля заголовка,
+# поля текста, поле для фрагмента)}. Заголовок весит больше текста при ранжировании.
+# Поле можно указать через связь: 'extracted_text.text' - текст файла публикации.
+SEARCH_INDEXES = {
+    'education.publication': (
+        'education_publication_search', ('title', 'keywords'),
+        ('abstract', 'journal_name', 'extracted_text.text'), 'abstract',
+    ),
+    'education.program': (
+        'education_program_search', ('name',), ('description',), 'description',
+    ),
+}
+
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+SNIPPET_WORDS = 30
+
+
+class SQLiteSearchBackend:
+    """Индекс на виртуальной таблице FTS5 с ранжированием BM25."""
+
+    def create(self, cursor, table):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} "
+            f"USING fts5(title, body, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+    def drop(self, cursor, table):
+        cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+    def index(self, cursor, table, pk, title, body):
+        cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [pk])
+        cursor.execute(f'INSERT INTO {table} (rowid, title, body) VALUES (%s, %s, %s)', [pk, title, body])
+
+    def remove(self, cursor, table, pk):
+        cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [pk])
+
+    def search(self, cursor, table, stems, limit):
+        match = ' '.join(f'"{stem}"*' for stem in stems)
+        cursor.execute(
+            f'SELECT rowid, -bm25({table}, %s, %s) AS rank FROM {table} '
+            f'WHERE {table} MATCH %s ORDER BY rank DESC LIMIT %s',
+            [TITLE_WEIGHT, BODY_WEIGHT, match, limit],
+        )
+        return cursor.fetchall()
+
+
+class PostgreSQLSearchBackend:
+    """Индекс на столбце tsvector с GIN-индексом и ранжированием ts_rank_cd."""
+
+    def create(self, cursor, table):
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {table} '
+            f'(object_id bigint PRIMARY KEY, document tsvector NOT NULL)'
+        )
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {table}_gin ON {table} USING GIN (document)')
+
+    def drop(self, cursor, table):
+        cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+    def index(self, cursor, table, pk, title, body):
+        cursor.execute(
+            f"INSERT INTO {table} (object_id, document) VALUES (%s, "
+            f"setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'D')) "
+            f"ON CONFLICT (object_id) DO UPDATE SET document = EXCLUDED.document",
+            [pk, title, body],
+        )
+
+    def remove(self, cursor, table, pk):
+        cursor.execute(f'DELETE FROM {table} WHERE object_id = %s', [pk])
+
+    def search(self, cursor, table, stems, limit):
+        query = ' & '.join(f'{stem}:*' for stem in stems)
+        weights = '{%s, 0, 0, %s}' % (BODY_WEIGHT / TITLE_WEIGHT, 1.0)
+        cursor.execute(
+            f"SELECT object_id, ts_rank_cd(%s::float4[], document, query) AS rank "
+            f"FROM {table}, to_tsquery('simple', %s) query "
+            f"WHERE document @@ query ORDER BY rank DESC LIMIT %s",
+            [weights, query, limit],
+        )
+        return cursor.fetchall()
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend(),
+    'postgresql': PostgreSQLSearchBackend(),
+}
+
+
+def get_backend(connection):
+    try:
+        return BACKENDS[connection.vendor]
+    except KeyError:
+        raise NotImplementedError(f'Полнотекстовый поиск не поддерживается для {connection.vendor}.')
+
+
+def is_indexed(model):
+    return model._meta.label_lower in SEARCH_INDEXES
+
+
+def get_value(instance, path):
+    """Значение поля по пути через связи; пустая строка, если связанной записи нет."""
+    value = instance
+    for name in path.split('.'):
+        try:
+            value = getattr(value, name)
+        except (AttributeError, ObjectDoesNotExist):
+            return ''
+    return value
+
+
+def get_relations(model):
+    """Связи из путей полей индекса (для select_related)."""
+    _, title_fields, body_fields, _ = SEARCH_INDEXES[model._meta.label_lower]
+    return [path.split('.', 1)[0] for path in (*title_fields, *body_fields) if '.' in path]
+
+
+def get_document(instance):
+    """Возвращает основы слов заголовка и текста записи."""
+    _, title_fields, body_fields, _ = SEARCH_INDEXES[instance._meta.label_lower]
+    title = ' '.join(stem_text(get_value(instance, field)) for field in title_fields)
+    body = ' '.join(stem_text(get_value(instance, field)) for field in body_fields)
+    return title, body
+
+
+def index_instance(instance, using=None):
+    """Добавляет или обновляет запись в поисковом индексе."""
+    table = SEARCH_INDEXES[instance._meta.label_lower][0]
+    connection = connections[using or router.db_for_write(type(instance))]
+    with connection.cursor() as cursor:
+        get_backend(connection).index(cursor, table, instance.pk, *get_document(instance))
+
+
+def remove_instance(instance, using=None):
+    """Удаляет запись из поискового индекса."""
+    table = SEARCH_INDEXES[instance._meta.label_lower][0]
+    connection = connections[using or router.db_for_write(type(instance))]
+    with connection.cursor() as cursor:
+        get_backend(connection).remove(cursor, table, instance.pk)
+
+
+def rebuild_index(model, using='default', batch_size=1000):
+    """Полностью перестраивает индекс модели. Возвращает число записей."""
+    table = SEARCH_INDEXES[model._meta.label_lower][0]
+    connection = connections[using]
+    backend = get_backend(connection)
+    count = 0
+    with connection.cursor() as cursor:
+        backend.drop(cursor, table)
+        backend.create(cursor, table)
+        instances = model._default_manager.using(using).select_related(*get_relations(model))
+        for instance in instances.iterator(chunk_size=batch_size):
+            backend.index(cursor, table, instance.pk, *get_document(instance))
+            count += 1
+    return count
+
+
+def parse_query(query):
+    """Возвращает уникальные основы слов запроса в исходном порядке."""
+    return list(dict.fromkeys(stem_word(word) for word in tokenize(query)))
+
+
+def search(model, query, limit=20):
+    """
+    Ищет записи модели по запросу. Возвращает список (pk, ранг),
+    отсортированный по убыванию релевантности.
+    """
+    stems = parse_query(query)
+    if not stems:
+        return []
+    table = SEARCH_INDEXES[model._meta.label_lower][0]
+    connection = connections[router.db_for_read(model)]
+    with connection.cursor() as cursor:
+        return get_backend(connection).search(cursor, table, stems, limit)
+
+
+def highlight(instance, query, words=SNIPPET_WORDS):
+    """
+    Возвращает фрагмент текста записи вокруг первого совпадения с запросом,
+    где совпавшие слова выделены тегом <mark>. Остальной текст экранируется.
+    """
+    snippet_field = SEARCH_INDEXES[instance._meta.label_lower][3]
+    text = getattr(instance, snippet_field) or str(instance)
+    stems = parse_query(query)
+    parts = re.split(r'(\w+)', text)
+    # Нечетные элементы parts - слова, четные - разделители между ними.
+    matches = [
+        index for index in range(1, len(parts), 2)
+        if any(stem_word(parts[index]).startswith(stem) for stem in stems)
+    ]
+    first = matches[0] if matches else 1
+    # Окно из `words` слов, начиная за четверть окна до первого совпадения.
+    start = max(0, first - words // 2)
+    end = min(len(parts), start + words * 2)
+    matches = set(matches)
+    result = ''.join(
+        f'<mark>{escape(part)}</mark>' if index in matches else escape(part)
+        for index, part in enumerate(parts[start:end], start=start)
+    )
+    prefix = '…' if start > 0 else ''
+    suffix = '…' if end < len(parts) else ''
+    return f'{prefix}{result.strip()}{suffix}'
@@ -0,0 +1,222 @@
+"""
+Генератор данных для разработки и нагрузочных тестов.
+
+seed() создает через bulk_create пользователей всех ролей, программы с
+аккредитациями, публикации с авторами, программы мобильности и заявки.
+Объем задается множителем `scale` (см. BASE_COUNTS), данные определяются
+числом `seed`: одинаковые параметры дают одинаковые записи. После вставки
+перестраиваются поисковый индекс и статистика заявок, так как bulk_create
+не отправляет сигналы.
+"""
+
+import datetime
+import random
+from collections import defaultdict
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import User
+
+from .models import Accreditation, Application, MobilityProgram, Program, Publication
+from .search import rebuild_index
+from .stats import rebuild_stats
+
+# Число записей при scale=1.
+BASE_COUNTS = {
+    'users': 200,
+    'admins': 3,
+    'universities': 20,
+    'programs': 100,
+    'publications': 300,
+    'mobility_programs': 60,
+    'applications': 1000,
+}
+PASSWORD = 'Seed-pass-123'
+# За сколько дней до сегодняшнего распределяются даты создания заявок.
+APPLICATION_DAYS = 365
+
+FIRST_NAMES = [
+    'Айгерим', 'Алихан', 'Данияр', 'Жансая', 'Арман', 'Мадина', 'Ерлан', 'Асель', 'Нурлан', 'Дана',
+    'Иван', 'Мария', 'Сергей', 'Анна', 'Тимур', 'Камила', 'Руслан', 'Алия', 'Олжас', 'Томирис',
+]
+LAST_NAMES = [
+    'Оспанов', 'Нурланова', 'Ахметов', 'Сериккызы', 'Жумабаев', 'Иванова', 'Ким', 'Петров',
+    'Абдрахманова', 'Касымов', 'Сейткали', 'Бекова', 'Тулеуов', 'Смирнова', 'Ермеков',
+]
+CITIES = ['Алматы', 'Астана', 'Шымкент', 'Караганда', 'Актобе', 'Павлодар', 'Туркестан', 'Семей']
+FIELDS = [
+    'Информационные системы', 'Педагогика и психология', 'Химическая технология', 'Экономика',
+    'Международные отношения', 'Машиностроение', 'Биотехнология', 'Журналистика', 'Математика',
+    'Ақпараттық жүйелер', 'Туризм', 'Архитектура', 'Филология', 'Нефтегазовое дело',
+]
+ACCREDITORS = ['IAAR', 'IQAA', 'АРКИСО', 'ASIIN', 'FIBAA', 'ABET']
+JOURNALS = [
+    'Вестник КазНУ', 'Известия НАН РК', 'ҚазҰУ Хабаршысы', 'Journal of Central Asian Studies',
+    'Педагогика и психология', 'Химический журнал Казахстана',
+]
+TOPICS = [
+    'цифровизация образования', 'академическая мобильность', 'казахский язык', 'нефтехимия',
+    'машинное обучение', 'устойчивое развитие', 'инклюзивное образование', 'водные ресурсы',
+    'инженерное образование', 'цифровая экономика', 'білім беру сапасы', 'тюркология',
+]
+HOSTS = [
+    ('TU Berlin', 'Германия', 'Берлин'), ('Sorbonne Université', 'Франция', 'Париж'),
+    ('KAIST', 'Южная Корея', 'Тэджон'), ('Boğaziçi University', 'Турция', 'Стамбул'),
+    ('University of Tartu', 'Эстония', 'Тарту'), ('Politecnico di Milano', 'Италия', 'Милан'),
+    ('Tsinghua University', 'Китай', 'Пекин'), ('University of Warsaw', 'Польша', 'Варшава'),
+]
+# Доли статусов заявок: большая часть заявок новые или в обработке.
+STATUS_WEIGHTS = {
+    Application.STATUS_NEW: 40,
+    Application.STATUS_IN_PROGRESS: 30,
+    Application.STATUS_COMPLETED: 20,
+    Application.STATUS_REJECTED: 10,
+}
+
+
+def sentence(rng, words, count):
+    return ' '.join(rng.choice(words) for _ in range(count)).capitalize() + '.'
+
+
+def text(rng, words, sentences):
+    return ' '.join(sentence(rng, words, rng.randint(6, 14)) for _ in range(sentences))
+
+
+def scaled_counts(scale):
+    return {name: max(1, round(count * scale)) for name, count in BASE_COUNTS.items()}
+
+
+def seed(scale=1.0, seed=0, batch_size=1000, today=None):
+    """Создает набор данных и возвращает {модель: число созданных записей}."""
+    rng = random.Random(seed)
+    counts = scaled_counts(scale)
+    today = today or timezone.localdate()
+    words = ' '.join(FIELDS + TOPICS).lower().split()
+    created = {}
+
+    with transaction.atomic():
+        password = make_password(PASSWORD)
+        users = []
+        for role, count in ((User.ADMIN, counts['admins']), (User.UNIVERSITY, counts['universities']),
+                            (User.USER, counts['users'])):
+            for index in range(count):
+                first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                users.append(User(
+                    email=f'{role}{index}.seed{seed}@example.com', password=password, role=role,
+                    first_name='' if role == User.UNIVERSITY else first_name,
+                    last_name='' if role == User.UNIVERSITY else last_name,
+                    university_name=f'{rng.choice(FIELDS)} университет {rng.choice(CITIES)} №{index}'
+                    if role == User.UNIVERSITY else '',
+                    is_staff=role == User.ADMIN,
+                ))
+        users = User.objects.bulk_create(users, batch_size=batch_size)
+        created['users'] = len(users)
+        universities = [user for user in users if user.role == User.UNIVERSITY]
+        authors = [user for user in users if user.role != User.ADMIN]
+
+        programs = Program.objects.bulk_create(
+            (
+                Program(
+                    name=f'{rng.choice(FIELDS)} ({rng.choice(["бакалавриат", "магистратура", "докторантура"])})',
+                    description=text(rng, words, rng.randint(2, 6)),
+                    duration=rng.choice([12, 24, 36, 48]),
+                    start_date=today.replace(month=9, day=1),
+                    end_date=today.replace(month=6, day=30) + datetime.timedelta(days=365 * rng.randint(1, 4)),
+                    is_active=rng.random() < 0.9,
+                )
+                for _ in range(counts['programs'])
+            ),
+            batch_size=batch_size,
+        )
+        created['programs'] = len(programs)
+
+        accreditations = []
+        for program in programs:
+            for _ in range(rng.randint(0, 3)):
+                received = today - datetime.timedelta(days=rng.randint(0, 1800))
+                accreditations.append(Accreditation(
+                    program=program, name=rng.choice(['Институциональная', 'Специализированная']),
+                    organization=rng.choice(ACCREDITORS), date_received=received,
+                    expiration_date=received + datetime.timedelta(days=365 * 5),
+                    certificate_number=f'KZ-{rng.randrange(10 ** 6):06d}',
+                ))
+        created['accreditations'] = len(Accreditation.objects.bulk_create(accreditations, batch_size=batch_size))
+
+        publications = Publication.objects.bulk_create(
+            (
+                Publication(
+                    title=sentence(rng, words, rng.randint(4, 9)).rstrip('.'),
+                    publication_date=today - datetime.timedelta(days=rng.randint(0, 3650)),
+                    journal_name=rng.choice(JOURNALS),
+                    abstract=text(rng, words, rng.randint(3, 8)),
+                    keywords=', '.join(rng.sample(TOPICS, 3)),
+                )
+                for _ in range(counts['publications'])
+            ),
+            batch_size=batch_size,
+        )
+        created['publications'] = len(publications)
+        Publication.authors.through.objects.bulk_create(
+            (
+                Publication.authors.through(publication_id=publication.pk, user_id=author.pk)
+                for publication in publications
+                for author in rng.sample(authors, min(len(authors), rng.randint(1, 4)))
+            ),
+            batch_size=batch_size,
+        )
+
+        mobility_programs = []
+        for _ in range(counts['mobility_programs']):
+            host, country, city = rng.choice(HOSTS)
+            start = today + datetime.timedelta(days=rng.randint(-180, 365))
+            mobility_programs.append(MobilityProgram(
+                name=f'Семестр в {host}', description=text(rng, words, rng.randint(2, 5)),
+                host_institution=host, country=country, city=city, start_date=start,
+                end_date=start + datetime.timedelta(days=rng.choice([120, 180, 365])),
+                application_deadline=start - datetime.timedelta(days=rng.randint(30, 120)),
+                requirements=text(rng, words, 2), benefits=text(rng, words, 2),
+                contact_email=f'exchange@{country.lower()}.example.com', is_active=rng.random() < 0.8,
+            ))
+        created['mobility_programs'] = len(MobilityProgram.objects.bulk_create(mobility_programs, batch_size=batch_size))
+
+        statuses, weights = zip(*STATUS_WEIGHTS.items())
+        applications = Application.objects.bulk_create(
+            (
+                Application(
+                    name=f'{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)}',
+                    email=f'applicant{index}.seed{seed}@example.com',
+                    phone=f'+7 7{rng.randrange(10 ** 9):09d}',
+                    subject=f'Поступление: {rng.choice(FIELDS)}',
+                    message=text(rng, words, rng.randint(1, 4)),
+                    status=rng.choices(statuses, weights)[0],
+                    university=rng.choice(universities) if rng.random() < 0.85 else None,
+                )
+                for index in range(counts['applications'])
+            ),
+            batch_size=batch_size,
+        )
+        created['applications'] = len(applications)
+        spread_created_at(Application, applications, rng, today)
+
+    for model in (Program, Publication):
+        rebuild_index(model)
+    rebuild_stats()
+    return created
+
+
+def spread_created_at(model, instances, rng, today):
+    """
+    Распределяет даты создания по последним APPLICATION_DAYS дням:
+    auto_now_add не дает задать их в bulk_create. Один UPDATE на день.
+    """
+    now = timezone.now()
+    by_day = defaultdict(list)
+    for instance in instances:
+        by_day[rng.randrange(APPLICATION_DAYS)].append(instance.pk)
+    for days, ids in by_day.items():
+        for start in range(0, len(ids), 500):
+            model.objects.filter(pk__in=ids[start:start + 500]).update(
+                created_at=now - datetime.timedelta(days=days, seconds=rng.randrange(86400)),
+            )
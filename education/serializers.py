@@ -1,10 +1,54 @@
+import os
+import sys
+
 from rest_framework import serializers
+from django.conf import settings
+from backend.metrics import SerializationTimingMixin
 from django.contrib.auth import get_user_model
-from .models import Program, Accreditation, Publication, MobilityProgram, Application
+from django.db import router, transaction
+from .models import Program, Accreditation, Publication, MobilityProgram, Application, UploadSession
+from .stats import record_created
 
 User = get_user_model()
 
 
+class DynamicFieldsMixin(SerializationTimingMixin):
+    """
+    Выбор полей ответа и разворачивание связей для ModelSerializer.
+    
+    Список полей (context['fields']) и разворачиваемых связей (context['expand'])
+    передает представление из параметров ?fields= и ?expand=; применяются они
+    только к корневому сериализатору ответа, вложенные выводятся целиком.
+    
+    В Meta.expandable_fields задается словарь {поле: (сериализатор, kwargs)}:
+    при разворачивании поле заменяется вложенным сериализатором. Сериализатор
+    можно указать именем класса из этого же модуля.
+    """
+    
+    def is_sparse_root(self):
+        root = self.root
+        return root is self or (isinstance(root, serializers.ListSerializer) and root.child is self)
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_sparse_root():
+            return fields
+        
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        expanded = [name for name in self.context.get('expand') or () if name in expandable]
+        for name in expanded:
+            serializer_class, kwargs = expandable[name]
+            if isinstance(serializer_class, str):
+                serializer_class = getattr(sys.modules[type(self).__module__], serializer_class)
+            fields[name] = serializer_class(read_only=True, **kwargs)
+        
+        requested = self.context.get('fields')
+        if requested is not None:
+            requested = set(requested).union(expanded)
+            fields = {name: field for name, field in fields.items() if name in requested}
+        return fields
+
+
 class UserBriefSerializer(serializers.ModelSerializer):
     """Краткий сериализатор для модели пользователя."""
     
@@ -13,20 +57,23 @@ class UserBriefSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'email', 'full_name']
+        # Колонки, которые читают вычисляемые поля (см. mixins.SparseFieldsetMixin)
+        field_sources = {'full_name': ('role', 'first_name', 'last_name', 'university_name')}
     
     def get_full_name(self, obj):
         return obj.get_full_name()
 
 
-class ProgramSerializer(serializers.ModelSerializer):
+class ProgramSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для модели образовательной программы."""
     
     class Meta:
         model = Program
         fields = '__all__'
+        expandable_fields = {'accreditations': ('AccreditationSerializer', {'many': True})}
 
 
-class AccreditationSerializer(serializers.ModelSerializer):
+class AccreditationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для модели аккредитации."""
     
     program_name = serializers.ReadOnlyField(source='program.name')
@@ -34,10 +81,48 @@ class AccreditationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Accreditation
         fields = '__all__'
+        expandable_fields = {'program': (ProgramSerializer, {})}
 
 
-class PublicationSerializer(serializers.ModelSerializer):
-    """Сериализатор для модели публикации."""
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Сериализатор загрузки файла частями."""
+    
+    file = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'size', 'sha256', 'offset', 'status', 'file', 'created_at']
+        read_only_fields = ['id', 'offset', 'status', 'file', 'created_at']
+        extra_kwargs = {'size': {'min_value': 1}}
+    
+    def validate_filename(self, value):
+        value = os.path.basename(value.replace('\\', '/'))
+        if not value:
+            raise serializers.ValidationError('Укажите имя файла.')
+        return value
+    
+    def validate_size(self, value):
+        if value > settings.UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f'Файл больше {settings.UPLOAD_MAX_SIZE} байт.')
+        return value
+    
+    def validate_sha256(self, value):
+        value = value.lower()
+        if value and (len(value) != 64 or any(char not in '0123456789abcdef' for char in value)):
+            raise serializers.ValidationError('Ожидается SHA-256 в шестнадцатеричном виде.')
+        return value
+    
+    def get_file(self, obj):
+        return obj.stored_file.name if obj.stored_file_id else None
+
+
+class PublicationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    """
+    Сериализатор для модели публикации.
+    
+    Файл можно передать обычной загрузкой в поле `file` или указать в поле
+    `upload` завершенную загрузку частями (см. uploads.py).
+    """
     
     authors = UserBriefSerializer(many=True, read_only=True)
     author_ids = serializers.PrimaryKeyRelatedField(
@@ -46,14 +131,37 @@ class PublicationSerializer(serializers.ModelSerializer):
         write_only=True,
         source='authors'
     )
+    upload = serializers.PrimaryKeyRelatedField(
+        queryset=UploadSession.objects.filter(status=UploadSession.STATUS_COMPLETED).select_related('stored_file'),
+        write_only=True,
+        required=False
+    )
     
     class Meta:
         model = Publication
         fields = ['id', 'title', 'authors', 'author_ids', 'publication_date', 'journal_name', 
-                  'doi', 'url', 'abstract', 'keywords', 'file', 'created_at', 'updated_at']
+                  'doi', 'url', 'abstract', 'keywords', 'file', 'upload', 'created_at', 'updated_at']
+    
+    def validate_upload(self, value):
+        request = self.context.get('request')
+        if request is None or value.user_id != request.user.pk or value.stored_file_id is None:
+            raise serializers.ValidationError('Загрузка не найдена.')
+        return value
+    
+    def attach_upload(self, validated_data):
+        upload = validated_data.pop('upload', None)
+        if upload is not None:
+            validated_data['file'] = upload.stored_file.name
+        return validated_data
+    
+    def create(self, validated_data):
+        return super().create(self.attach_upload(validated_data))
+    
+    def update(self, instance, validated_data):
+        return super().update(instance, self.attach_upload(validated_data))
 
 
-class MobilityProgramSerializer(serializers.ModelSerializer):
+class MobilityProgramSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для модели программы мобильности."""
     
     class Meta:
@@ -61,7 +169,7 @@ class MobilityProgramSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class ApplicationSerializer(serializers.ModelSerializer):
+class ApplicationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для модели заявки."""
     
     university_name = serializers.ReadOnlyField(source='university.university_name')
@@ -73,6 +181,18 @@ class ApplicationSerializer(serializers.ModelSerializer):
                   'status', 'status_display', 'university', 'university_name',
                   'created_at', 'updated_at']
         read_only_fields = ['status', 'university', 'created_at', 'updated_at']
+        expandable_fields = {'university': (UserBriefSerializer, {})}
+
+
+class ApplicationTransitionSerializer(serializers.Serializer):
+    """Запрос перевода заявок в другой статус."""
+    
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.APPLICATION_TRANSITION_MAX_IDS,
+    )
+    status = serializers.ChoiceField(choices=Application.STATUS_CHOICES)
 
 
 class ApplicationCreateSerializer(serializers.ModelSerializer):
@@ -86,9 +206,85 @@ class ApplicationCreateSerializer(serializers.ModelSerializer):
         }
 
 
+class CachedUniversityField(serializers.PrimaryKeyRelatedField):
+    """
+    Поле ВУЗа, которое при пакетной проверке берет пользователей из заранее
+    загруженного словаря context['universities'] вместо запроса на каждую строку.
+    """
+    
+    def to_internal_value(self, data):
+        universities = self.context.get('universities')
+        if universities is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in universities:
+            self.fail('does_not_exist', pk_value=data)
+        return universities[pk]
+
+
+class ApplicationBulkListSerializer(serializers.ListSerializer):
+    """
+    Пакетная проверка и создание заявок.
+    
+    Ошибки проверяются построчно и не прерывают обработку пакета: после
+    is_valid() в `row_errors` находятся ошибки по номерам строк, а
+    validated_data содержит только корректные строки.
+    """
+    
+    def to_internal_value(self, data):
+        self.row_errors = {}
+        self._row_index = 0
+        if isinstance(data, list):
+            ids = {
+                item.get('university') for item in data
+                if isinstance(item, dict) and isinstance(item.get('university'), (int, str))
+            }
+            ids = {int(pk) for pk in ids if str(pk).isdigit()}
+            queryset = self.child.fields['university'].queryset
+            self.context['universities'] = queryset.in_bulk(ids)
+        return [attrs for attrs in super().to_internal_value(data) if attrs is not None]
+    
+    def run_child_validation(self, data):
+        index = self._row_index
+        self._row_index += 1
+        try:
+            return super().run_child_validation(data)
+        except serializers.ValidationError as exc:
+            self.row_errors[index] = exc.detail
+            return None
+    
+    def create(self, validated_data):
+        """Создает корректные заявки пачками внутри одной транзакции."""
+        chunk_size = self.context.get('chunk_size', settings.APPLICATION_BULK_CHUNK_SIZE)
+        applications = [Application(**attrs) for attrs in validated_data]
+        with transaction.atomic():
+            applications = Application.objects.bulk_create(applications, batch_size=chunk_size)
+            # bulk_create() не отправляет сигналы, статистика обновляется здесь.
+            record_created(applications, using=router.db_for_write(Application))
+            return applications
+
+
+class ApplicationBulkCreateSerializer(ApplicationCreateSerializer):
+    """Сериализатор строки пакетной загрузки заявок."""
+    
+    university = CachedUniversityField(
+        queryset=User.objects.filter(role=User.UNIVERSITY),
+        required=False,
+        allow_null=True,
+    )
+    
+    class Meta(ApplicationCreateSerializer.Meta):
+        list_serializer_class = ApplicationBulkListSerializer
+
+
 # Расширенные сериализаторы для детального представления
 
-class ProgramDetailSerializer(serializers.ModelSerializer):
+class ProgramDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Детальный сериализатор для модели образовательной программы."""
     
     accreditations = AccreditationSerializer(many=True, read_only=True)
@@ -98,7 +294,7 @@ class ProgramDetailSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class AccreditationDetailSerializer(serializers.ModelSerializer):
+class AccreditationDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """Детальный сериализатор для модели аккредитации."""
     
     program = ProgramSerializer(read_only=True)
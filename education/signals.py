@@ -0,0 +1,79 @@
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save, m2m_changed
+from django.dispatch import receiver
+
+from .cache import bump_model_version
+from .indexing import enqueue_publication
+from .search import index_instance, is_indexed, remove_instance
+from .models import Program, Accreditation, MobilityProgram, Application, Publication
+from .stats import lock_previous_key, reassign_university, record_deleted, record_saved
+from users.models import User
+
+# Модели, ответы по которым кешируются (см. CachedResponseMixin).
+CACHED_MODELS = (Program, Accreditation, MobilityProgram)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_cached_responses(sender, **kwargs):
+    """Сбрасывает кеш ответов при изменении или удалении записи."""
+    if sender in CACHED_MODELS:
+        bump_model_version(sender)
+
+
+@receiver(m2m_changed)
+def invalidate_cached_relations(sender, instance, action, model, **kwargs):
+    """Сбрасывает кеш ответов при изменении связей многие-ко-многим."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    for changed in {type(instance), model}:
+        if changed in CACHED_MODELS:
+            bump_model_version(changed)
+
+
+@receiver(post_save, sender=Publication)
+def enqueue_text_extraction(sender, instance, using, raw=False, **kwargs):
+    """
+    Ставит новый файл публикации в очередь извлечения текста (indexing.py).
+    Подключен до update_search_index: текст замененного файла сбрасывается
+    до переиндексации.
+    """
+    if not raw:
+        enqueue_publication(instance, using)
+
+
+@receiver(post_save)
+def update_search_index(sender, instance, using, raw=False, **kwargs):
+    """Обновляет полнотекстовый индекс при сохранении публикации или программы."""
+    if is_indexed(sender) and not raw:
+        index_instance(instance, using=using)
+
+
+@receiver(post_delete)
+def remove_from_search_index(sender, instance, using, **kwargs):
+    """Удаляет запись из полнотекстового индекса."""
+    if is_indexed(sender):
+        remove_instance(instance, using=using)
+
+
+@receiver(pre_save, sender=Application)
+def lock_application_stat_key(sender, instance, using, **kwargs):
+    """Запоминает ключ статистики сохраненной версии заявки (см. stats.py)."""
+    instance._previous_stat_key = lock_previous_key(instance, using)
+
+
+@receiver(post_save, sender=Application)
+def update_application_stats(sender, instance, using, **kwargs):
+    """Переносит заявку между счетчиками статистики."""
+    record_saved(instance, instance.__dict__.pop('_previous_stat_key', None), using)
+
+
+@receiver(post_delete, sender=Application)
+def remove_application_stats(sender, instance, using, **kwargs):
+    """Уменьшает счетчик статистики удаленной заявки."""
+    record_deleted(instance, using)
+
+
+@receiver(pre_delete, sender=User)
+def reassign_application_stats(sender, instance, using, **kwargs):
+    """Счетчики удаляемого ВУЗа переходят к заявкам без ВУЗа."""
+    reassign_university(instance.pk, using)
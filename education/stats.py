@@ -0,0 +1,161 @@
+"""
+Статистика заявок по ВУЗам, статусам и дням создания.
+
+Таблица ApplicationStat хранит число заявок для каждого ключа
+(ВУЗ, статус, день создания) и обновляется приращениями в той же транзакции,
+что и сами заявки: при сохранении и удалении через сигналы (signals.py), при
+пакетной загрузке - явным вызовом record_created(), при переводе статусов
+(workflow.py) - через apply_deltas(). Поэтому запрос статистики
+читает группы, а не все заявки. Если таблица разошлась с заявками (например,
+после изменения заявок через QuerySet.update()), ее перестраивает команда
+rebuild_application_stats.
+"""
+
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Application, ApplicationStat
+
+
+def stat_key(university_id, status, created_at):
+    """Ключ статистики; день считается в текущем часовом поясе, как в TruncDate."""
+    if timezone.is_aware(created_at):
+        created_at = timezone.localtime(created_at)
+    return university_id, status, created_at.date()
+
+
+def application_key(application):
+    return stat_key(application.university_id, application.status, application.created_at)
+
+
+def apply_deltas(deltas, using='default'):
+    """Добавляет к счетчикам приращения {ключ: число}; вызывается внутри транзакции."""
+    for (university_id, status, day), delta in deltas.items():
+        if not delta:
+            continue
+        rows = ApplicationStat.objects.using(using).filter(university_id=university_id, status=status, day=day)
+        if rows.update(count=F('count') + delta):
+            continue
+        try:
+            with transaction.atomic(using=using):
+                ApplicationStat.objects.using(using).create(
+                    university_id=university_id, status=status, day=day, count=delta,
+                )
+        except IntegrityError:
+            # Строку ключа только что создала параллельная транзакция.
+            rows.update(count=F('count') + delta)
+
+
+def lock_previous_key(application, using):
+    """
+    Ключ сохраненной версии заявки. Строка блокируется до конца транзакции,
+    чтобы параллельные изменения статуса не перенесли одну заявку дважды.
+    """
+    if application.pk is None:
+        return None
+    row = (
+        Application.objects.using(using).select_for_update()
+        .filter(pk=application.pk).values('university_id', 'status', 'created_at').first()
+    )
+    if row is None:
+        return None
+    return stat_key(row['university_id'], row['status'], row['created_at'])
+
+
+def record_saved(application, previous, using='default'):
+    deltas = Counter({application_key(application): 1})
+    if previous is not None:
+        deltas[previous] -= 1
+    apply_deltas(deltas, using)
+
+
+def record_deleted(application, using='default'):
+    apply_deltas({application_key(application): -1}, using)
+
+
+def record_created(applications, using='default'):
+    """Учитывает заявки, созданные bulk_create() (он не отправляет сигналы)."""
+    apply_deltas(Counter(application_key(application) for application in applications), using)
+
+
+def reassign_university(university_id, using='default'):
+    """
+    Переносит счетчики удаляемого ВУЗа в заявки без ВУЗа: ForeignKey заявки
+    обнуляется (SET_NULL) запросом UPDATE, без сигналов.
+    """
+    rows = ApplicationStat.objects.using(using).filter(university_id=university_id)
+    deltas = Counter()
+    for status, day, count in rows.values_list('status', 'day', 'count'):
+        deltas[(None, status, day)] += count
+    rows.delete()
+    apply_deltas(deltas, using)
+
+
+def rebuild_stats(using='default', batch_size=1000):
+    """Пересчитывает таблицу статистики по заявкам. Возвращает число групп."""
+    groups = (
+        Application.objects.using(using)
+        .annotate(day=TruncDate('created_at'))
+        .values('university_id', 'status', 'day')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    with transaction.atomic(using=using):
+        ApplicationStat.objects.using(using).all().delete()
+        stats = ApplicationStat.objects.using(using).bulk_create(
+            (
+                ApplicationStat(
+                    university_id=group['university_id'], status=group['status'],
+                    day=group['day'], count=group['total'],
+                )
+                for group in groups.iterator()
+            ),
+            batch_size=batch_size,
+        )
+    return len(stats)
+
+
+def summarize(stats, by_university=False):
+    """
+    Сводка по queryset ApplicationStat: всего, по статусам, по дням и, если
+    нужно, по ВУЗам. Каждый разрез - один запрос с группировкой.
+    """
+    statuses = [status for status, _ in Application.STATUS_CHOICES]
+
+    def split(rows, key):
+        groups = {}
+        for row in rows:
+            group = groups.setdefault(row[key], dict.fromkeys(statuses, 0))
+            group[row['status']] = row['total']
+        return groups
+
+    def grouped(*fields):
+        return stats.exclude(count=0).values(*fields, 'status').annotate(total=Sum('count')).order_by(*fields)
+
+    by_status = dict.fromkeys(statuses, 0)
+    for row in grouped():
+        by_status[row['status']] = row['total']
+
+    data = {
+        'total': sum(by_status.values()),
+        'by_status': by_status,
+        'by_day': [
+            {'day': day.isoformat(), 'total': sum(counts.values()), 'by_status': counts}
+            for day, counts in split(grouped('day'), 'day').items()
+        ],
+    }
+    if by_university:
+        rows = list(grouped('university', 'university__university_name'))
+        names = {row['university']: row['university__university_name'] for row in rows}
+        data['by_university'] = [
+            {
+                'university': university, 'university_name': names[university],
+                'total': sum(counts.values()), 'by_status': counts,
+            }
+            for university, counts in split(rows, 'university').items()
+        ]
+    return data
@@ -0,0 +1,168 @@
+"""
+Стемминг русских и казахских слов для полнотекстового поиска.
+
+Стемминг выполняется в Python одинаково для индексируемых текстов и для
+поисковых запросов, поэтому поиск работает одинаково на SQLite (FTS5) и на
+PostgreSQL, в котором нет казахской конфигурации.
+"""
+
+import re
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+KAZAKH_LETTERS = set('әғқңөұүһі')
+
+# --- Русский язык: алгоритм Snowball (https://snowballstem.org/algorithms/russian/stemmer.html)
+
+RU_VOWELS = set('аеиоуыэюя')
+
+RU_PERFECTIVE_GERUND_1 = ('вшись', 'вши', 'в')
+RU_PERFECTIVE_GERUND_2 = ('ившись', 'ывшись', 'ивши', 'ывши', 'ив', 'ыв')
+RU_ADJECTIVE = (
+    'ими', 'ыми', 'его', 'ого', 'ему', 'ому', 'ее', 'ие', 'ые', 'ое', 'ей', 'ий', 'ый',
+    'ой', 'ем', 'им', 'ым', 'ом', 'их', 'ых', 'ую', 'юю', 'ая', 'яя', 'ою', 'ею',
+)
+RU_PARTICIPLE_1 = ('ем', 'нн', 'вш', 'ющ', 'щ')
+RU_PARTICIPLE_2 = ('ивш', 'ывш', 'ующ')
+RU_REFLEXIVE = ('ся', 'сь')
+RU_VERB_1 = (
+    'ете', 'йте', 'ешь', 'нно', 'ла', 'на', 'ли', 'ем', 'ло', 'но', 'ет', 'ют', 'ны', 'ть',
+    'й', 'л', 'н',
+)
+RU_VERB_2 = (
+    'ейте', 'уйте', 'ила', 'ыла', 'ена', 'ите', 'или', 'ыли', 'ило', 'ыло', 'ено', 'ует',
+    'уют', 'ены', 'ить', 'ыть', 'ишь', 'ей', 'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ят',
+    'ит', 'ыт', 'ую', 'ю',
+)
+RU_NOUN = (
+    'иями', 'ями', 'ами', 'ией', 'иям', 'ием', 'иях', 'ев', 'ов', 'ие', 'ье', 'еи', 'ии',
+    'ей', 'ой', 'ий', 'ям', 'ем', 'ам', 'ом', 'ах', 'ях', 'ию', 'ью', 'ия', 'ья',
+    'а', 'е', 'и', 'й', 'о', 'у', 'ы', 'ь', 'ю', 'я',
+)
+RU_SUPERLATIVE = ('ейше', 'ейш')
+RU_DERIVATIONAL = ('ость', 'ост')
+
+
+def _ru_regions(word):
+    """Возвращает начала областей RV и R2 слова."""
+    rv = r1 = r2 = len(word)
+    for i, char in enumerate(word):
+        if char in RU_VOWELS:
+            rv = i + 1
+            break
+    for i in range(1, len(word)):
+        if word[i - 1] in RU_VOWELS and word[i] not in RU_VOWELS:
+            r1 = i + 1
+            break
+    for i in range(r1 + 1, len(word)):
+        if word[i - 1] in RU_VOWELS and word[i] not in RU_VOWELS:
+            r2 = i + 1
+            break
+    return rv, r2
+
+
+def _strip(word, start, endings, preceded_by=None):
+    """
+    Удаляет самое длинное окончание из `endings`, целиком лежащее в области,
+    начинающейся с `start`. Если задан `preceded_by`, перед окончанием должна
+    стоять одна из этих букв (она не удаляется).
+    """
+    for ending in sorted(endings, key=len, reverse=True):
+        if not word.endswith(ending) or len(word) - len(ending) < start:
+            continue
+        if preceded_by:
+            position = len(word) - len(ending) - 1
+            if position < start or word[position] not in preceded_by:
+                continue
+        return word[:-len(ending)], True
+    return word, False
+
+
+def stem_russian(word):
+    word = word.replace('ё', 'е')
+    rv, r2 = _ru_regions(word)
+
+    # Шаг 1
+    word, found = _strip(word, rv, RU_PERFECTIVE_GERUND_1, preceded_by='ая')
+    if not found:
+        word, found = _strip(word, rv, RU_PERFECTIVE_GERUND_2)
+    if not found:
+        word, _ = _strip(word, rv, RU_REFLEXIVE)
+        word, found = _strip(word, rv, RU_ADJECTIVE)
+        if found:
+            word, participle = _strip(word, rv, RU_PARTICIPLE_1, preceded_by='ая')
+            if not participle:
+                word, _ = _strip(word, rv, RU_PARTICIPLE_2)
+        else:
+            word, found = _strip(word, rv, RU_VERB_1, preceded_by='ая')
+            if not found:
+                word, found = _strip(word, rv, RU_VERB_2)
+            if not found:
+                word, _ = _strip(word, rv, RU_NOUN)
+
+    # Шаг 2
+    word, _ = _strip(word, rv, ('и',))
+
+    # Шаг 3
+    word, _ = _strip(word, r2, RU_DERIVATIONAL)
+
+    # Шаг 4
+    if word.endswith('нн') and len(word) - 2 >= rv:
+        return word[:-1]
+    word, found = _strip(word, rv, RU_SUPERLATIVE)
+    if found:
+        if word.endswith('нн') and len(word) - 2 >= rv:
+            word = word[:-1]
+        return word
+    word, _ = _strip(word, rv, ('ь',))
+    return word
+
+
+# --- Казахский язык: облегченный стеммер. Аффиксы отсекаются справа налево
+# в порядке, обратном порядку их присоединения: падеж, принадлежность, число.
+
+KK_CASE = (
+    'дағы', 'дегі', 'тағы', 'тегі',
+    'ның', 'нің', 'дың', 'дің', 'тың', 'тің',
+    'дан', 'ден', 'тан', 'тен', 'нан', 'нен', 'нда', 'нде',
+    'мен', 'бен', 'пен',
+    'ға', 'ге', 'қа', 'ке', 'на', 'не', 'да', 'де', 'та', 'те',
+    'ды', 'ді', 'ты', 'ті', 'ны', 'ні',
+)
+# Окончания 1-го и 2-го лица единственного числа (-ым, -ің и т.п.) не отсекаются:
+# они совпадают с концом многих основ (білім, қалың) и редки в текстах каталога.
+KK_POSSESSIVE = (
+    'сыңыз', 'сіңіз', 'ымыз', 'іміз', 'ыңыз', 'іңіз',
+    'сы', 'сі', 'ы', 'і',
+)
+KK_PLURAL = ('лар', 'лер', 'дар', 'дер', 'тар', 'тер')
+
+KK_MIN_STEM = 3
+
+
+def stem_kazakh(word):
+    for suffixes in (KK_CASE, KK_POSSESSIVE, KK_PLURAL):
+        for suffix in suffixes:
+            if word.endswith(suffix) and len(word) - len(suffix) >= KK_MIN_STEM:
+                word = word[:-len(suffix)]
+                break
+    return word
+
+
+def stem_word(word):
+    """Приводит слово к основе с учетом языка (казахский, русский, прочие)."""
+    word = word.lower()
+    if KAZAKH_LETTERS.intersection(word):
+        return stem_kazakh(word)
+    if any('а' <= char <= 'я' or char == 'ё' for char in word):
+        return stem_russian(word)
+    return word
+
+
+def tokenize(text):
+    return WORD_RE.findall(text or '')
+
+
+def stem_text(text):
+    """Возвращает текст из основ слов, разделенных пробелами."""
+    return ' '.join(stem_word(word) for word in tokenize(text))
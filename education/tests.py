@@ -1,3 +1,1369 @@
-from django.test import TestCase
+import csv
+import datetime
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+import warnings
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.conf import settings
+from django.db import connection, connections, router as db_router
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from backend.benchmark import NO_CACHE, compare_results
+from backend.db_router import PIN_COOKIE, RoutingState, _routing_state
+from backend.metrics import registry
+from backend.pagination import KeysetCursorPagination
+from backend.sqlite import set_journal_mode
+from backend.testing import QueryCountAssertionsMixin
+from users.models import PasswordResetToken, User
+from . import indexing, views
+from .indexing import extract_batch
+from .seed import seed
+from .uploads import staging_path
+from .models import (
+    Program, Accreditation, Publication, MobilityProgram, Application, ApplicationStat, ApplicationStatusChange,
+    PublicationText, StoredFile, UploadSession
+)
+
+
+class PublicationQueryCountTests(QueryCountAssertionsMixin, TestCase):
+    """Число запросов к спискам публикаций не зависит от числа записей."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(email='author@example.com', password='pass')
+        self.counter = 0
+
+    def create_publications(self, count):
+        for _ in range(count):
+            self.counter += 1
+            publication = Publication.objects.create(
+                title=f'Публикация {self.counter}',
+                publication_date=datetime.date(2025, 1, 1),
+            )
+            coauthor = User.objects.create_user(email=f'coauthor{self.counter}@example.com')
+            publication.authors.add(self.author, coauthor)
+
+    def test_list(self):
+        self.assertConstantQueries('/api/publications/', self.create_publications)
+
+    def test_my_publications(self):
+        self.client.force_authenticate(self.author)
+        self.assertConstantQueries('/api/publications/my_publications/', self.create_publications)
+
+
+class AccreditationQueryCountTests(QueryCountAssertionsMixin, TestCase):
+    """Программа аккредитации присоединяется к запросу, а не загружается построчно."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.program = Program.objects.create(
+            name='Программа', description='Описание', duration=12,
+            start_date=datetime.date(2025, 9, 1), end_date=datetime.date(2026, 9, 1),
+        )
+
+    def create_accreditations(self, count):
+        for _ in range(count):
+            program = Program.objects.create(
+                name='Программа', description='Описание', duration=12,
+                start_date=datetime.date(2025, 9, 1), end_date=datetime.date(2026, 9, 1),
+            )
+            for target in (program, self.program):
+                Accreditation.objects.create(
+                    program=target, name='Аккредитация', organization='IAAR',
+                    date_received=datetime.date(2025, 1, 1),
+                    expiration_date=datetime.date(2030, 1, 1),
+                    certificate_number='AB-1',
+                )
+
+    def test_list(self):
+        self.assertConstantQueries('/api/accreditations/', self.create_accreditations)
+
+    def test_by_program(self):
+        self.assertConstantQueries(
+            f'/api/accreditations/by_program/?program_id={self.program.pk}',
+            self.create_accreditations,
+        )
+
+    def test_program_detail(self):
+        self.assertConstantQueries(f'/api/programs/{self.program.pk}/', self.create_accreditations)
+
+
+class ApplicationQueryCountTests(QueryCountAssertionsMixin, TestCase):
+    """Название ВУЗа в заявках берется из присоединенной таблицы."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(email='admin@example.com', role=User.ADMIN)
+        self.counter = 0
+
+    def create_applications(self, count):
+        for _ in range(count):
+            self.counter += 1
+            university = User.objects.create_user(
+                email=f'university{self.counter}@example.com',
+                role=User.UNIVERSITY, university_name=f'ВУЗ {self.counter}',
+            )
+            Application.objects.create(
+                name='Абитуриент', email='student@example.com', phone='+77000000000',
+                subject='Поступление', message='Текст заявки', university=university,
+            )
+
+    def test_list(self):
+        self.client.force_authenticate(self.admin)
+        self.assertConstantQueries('/api/applications/', self.create_applications)
+
+
+class ResponseCacheTests(TestCase):
+    """Ответы справочников кешируются и сбрасываются при изменении данных."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.program = Program.objects.create(
+            name='Программа', description='Описание', duration=12,
+            start_date=datetime.date(2025, 9, 1), end_date=datetime.date(2026, 9, 1),
+        )
+
+    def test_hit_and_invalidation(self):
+        url = f'/api/programs/{self.program.pk}/'
+        first = self.client.get(url)
+        second = self.client.get(url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.content, second.content)
+
+        Accreditation.objects.create(
+            program=self.program, name='Аккредитация', organization='IAAR',
+            date_received=datetime.date(2025, 1, 1), expiration_date=datetime.date(2030, 1, 1),
+            certificate_number='AB-1',
+        )
+        third = self.client.get(url)
+        self.assertEqual(third['X-Cache'], 'MISS')
+        self.assertEqual(len(third.json()['accreditations']), 1)
+
+
+class ConditionalGetTests(TestCase):
+    """Условные запросы отвечают 304 без сериализации, пока данные не изменились."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.program = MobilityProgram.objects.create(
+            name='Обмен', description='Описание', host_institution='KBTU',
+            country='Казахстан', city='Алматы',
+            start_date=datetime.date(2025, 9, 1), end_date=datetime.date(2026, 1, 1),
+            application_deadline=datetime.date(2025, 6, 1),
+        )
+
+    def test_etag(self):
+        url = '/api/mobility-programs/active/'
+        response = self.client.get(url)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.program.is_active = False
+        self.program.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+    def test_last_modified_only_for_detail(self):
+        detail = self.client.get(f'/api/mobility-programs/{self.program.pk}/')
+        self.assertTrue(detail.has_header('Last-Modified'))
+        response = self.client.get(
+            f'/api/mobility-programs/{self.program.pk}/', HTTP_IF_MODIFIED_SINCE=detail['Last-Modified'],
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(self.client.get('/api/mobility-programs/').has_header('Last-Modified'))
+
+    def create_other_program(self):
+        return MobilityProgram.objects.create(
+            name='Стажировка', description='Описание', host_institution='SDU',
+            country='Казахстан', city='Алматы',
+            start_date=datetime.date(2025, 9, 1), end_date=datetime.date(2026, 1, 1),
+            application_deadline=datetime.date(2025, 6, 1),
+        )
+
+    def test_if_modified_since_after_delete(self):
+        other = self.create_other_program()
+        since = http_date(time.time())
+        self.assertEqual(len(self.client.get('/api/mobility-programs/').json()['results']), 2)
+        other.delete()
+        response = self.client.get('/api/mobility-programs/', HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 1)
+
+    def test_if_modified_since_after_deactivation(self):
+        other = self.create_other_program()
+        since = http_date(time.time())
+        self.assertEqual(len(self.client.get('/api/mobility-programs/active/').json()), 2)
+        # Выпавшая из фильтра запись не меняет MAX(updated_at) оставшихся.
+        self.program.is_active = False
+        self.program.save()
+        response = self.client.get('/api/mobility-programs/active/', HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.json()], [other.pk])
+
+
+class SearchTests(TestCase):
+    """Полнотекстовый поиск учитывает морфологию и обновляется сигналами."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_program_search(self):
+        program = Program.objects.create(
+            name='Химия', description='Курс органической химии для студентов.', duration=12,
+            start_date=datetime.date(2025, 9, 1), end_date=datetime.date(2026, 9, 1),
+        )
+        response = self.client.get('/api/programs/search/', {'q': 'химией'})
+        self.assertEqual([item['id'] for item in response.json()], [program.pk])
+        self.assertIn('<mark>химии</mark>', response.json()[0]['search_snippet'])
+
+        program.delete()
+        response = self.client.get('/api/programs/search/', {'q': 'химия'})
+        self.assertEqual(response.json(), [])
+
+    def test_publication_search_kazakh(self):
+        publication = Publication.objects.create(
+            title='Қазақстандағы жоғары білім', publication_date=datetime.date(2025, 1, 1),
+        )
+        response = self.client.get('/api/publications/search/', {'q': 'білімі'})
+        self.assertEqual([item['id'] for item in response.json()], [publication.pk])
+
+
+class ApplicationBulkTests(TestCase):
+    """Пакетная загрузка создает корректные заявки и сообщает об ошибках по строкам."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(email='admin@example.com', role=User.ADMIN, is_staff=True)
+        )
+        self.university = User.objects.create_user(
+            email='university@example.com', role=User.UNIVERSITY, university_name='ВУЗ',
+        )
+        self.row = {
+            'name': 'Абитуриент', 'email': 'student@example.com', 'phone': '+77000000000',
+            'subject': 'Поступление', 'message': 'Текст заявки', 'university': self.university.pk,
+        }
+
+    def test_partial_errors(self):
+        rows = [self.row] * 10 + [dict(self.row, email='invalid'), dict(self.row, university=0)]
+        response = self.client.post('/api/applications/bulk/?chunk_size=3', rows, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['created'], 10)
+        self.assertEqual([error['row'] for error in response.json()['errors']], [10, 11])
+        self.assertEqual(Application.objects.filter(university=self.university).count(), 10)
+
+    def test_ndjson(self):
+        body = '\n'.join(json.dumps(row) for row in [self.row, self.row])
+        response = self.client.post('/api/applications/bulk/', body, content_type='application/x-ndjson')
+        self.assertEqual(response.json()['created'], 2)
+
+    def test_staff_only(self):
+        client = APIClient()
+        self.assertEqual(client.post('/api/applications/bulk/', [self.row], format='json').status_code, 401)
+        client.force_authenticate(self.university)
+        self.assertEqual(client.post('/api/applications/bulk/', [self.row], format='json').status_code, 403)
+        self.assertFalse(Application.objects.exists())
+
+
+class SparseFieldsetTests(QueryCountAssertionsMixin, TestCase):
+    """?fields= и ?expand= сокращают ответ и запрос к базе."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.counter = 0
+
+    def create_programs(self, count):
+        for _ in range(count):
+            self.counter += 1
+            program = Program.objects.create(
+                name=f'Программа {self.counter}', description='Длинное описание ' * 50, duration=12,
+                start_date=datetime.date(2025, 9, 1), end_date=datetime.date(2026, 9, 1),
+            )
+            Accreditation.objects.create(
+                program=program, name='Аккредитация', organization='IAAR',
+                date_received=datetime.date(2025, 1, 1), expiration_date=datetime.date(2030, 1, 1),
+                certificate_number='AB-1',
+            )
+
+    def test_fields_trim_response_and_columns(self):
+        self.create_programs(2)
+        with self.assertNumQueries(2) as context:
+            response = self.client.get('/api/programs/?fields=id,name')
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'name'})
+        select = context.captured_queries[-1]['sql']
+        self.assertIn('"name"', select)
+        self.assertNotIn('"description"', select)
+
+    def test_expand_accreditations(self):
+        self.assertConstantQueries('/api/programs/?fields=id&expand=accreditations', self.create_programs)
+        results = self.client.get('/api/programs/?fields=id&expand=accreditations').json()['results']
+        self.assertEqual(set(results[0]), {'id', 'accreditations'})
+        self.assertEqual(results[0]['accreditations'][0]['name'], 'Аккредитация')
+
+    def test_expand_program_on_accreditations(self):
+        self.assertConstantQueries('/api/accreditations/?fields=id&expand=program', self.create_programs)
+        result = self.client.get('/api/accreditations/?fields=id&expand=program').json()['results'][0]
+        self.assertEqual(result['program']['description'], 'Длинное описание ' * 50)
+
+    def test_expand_invalidates_conditional_get(self):
+        self.create_programs(1)
+        url = '/api/programs/?expand=accreditations'
+        etag = self.client.get(url)['ETag']
+        accreditation = Accreditation.objects.get()
+        accreditation.name = 'Новая аккредитация'
+        accreditation.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class FastSerializerTests(TestCase):
+    """Быстрые сериализаторы списков отдают те же байты, что и обычные."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(email='admin@example.com', role=User.ADMIN, first_name='Иван')
+        university = User.objects.create_user(
+            email='university@example.com', role=User.UNIVERSITY, university_name='ВУЗ «Алатау»',
+        )
+        statuses = [status for status, _ in Application.STATUS_CHOICES]
+        for index in range(4):
+            program = Program.objects.create(
+                name=f'Программа "{index}"\u2028', description='Описание\n', duration=12,
+                start_date=datetime.date(2025, 9, 1), end_date=datetime.date(2026, 9, 1),
+            )
+            Accreditation.objects.create(
+                program=program, name='Аккредитация', organization='IAAR',
+                date_received=datetime.date(2025, 1, index + 1), expiration_date=datetime.date(2030, 1, 1),
+                certificate_number='AB-1',
+            )
+            publication = Publication.objects.create(
+                title='Статья', publication_date=datetime.date(2025, 1, 1),
+                file='publications/article.pdf' if index % 2 else None,
+            )
+            publication.authors.add(university, self.admin)
+            MobilityProgram.objects.create(
+                name='Обмен', description='Описание', host_institution='TU Berlin', country='Германия',
+                city='Берлин', start_date=datetime.date(2025, 9, 1), end_date=datetime.date(2026, 2, 1),
+                application_deadline=datetime.date(2025, 5, index + 1),
+            )
+            Application.objects.create(
+                name='Абитуриент', email='student@example.com', phone='+77000000000',
+                subject='Поступление', message='Текст', status=statuses[index],
+                university=university if index % 2 else None,
+            )
+        self.client.force_authenticate(self.admin)
+
+    def test_byte_identical(self):
+        cases = [
+            ('/api/programs/?page_size=2', views.ProgramViewSet),
+            ('/api/programs/?fields=id,name', views.ProgramViewSet),
+            ('/api/accreditations/', views.AccreditationViewSet),
+            ('/api/publications/', views.PublicationViewSet),
+            ('/api/mobility-programs/active/', views.MobilityProgramViewSet),
+            ('/api/applications/', views.ApplicationViewSet),
+        ]
+        for url, viewset in cases:
+            with self.subTest(url=url):
+                cache.clear()
+                fast = self.client.get(url)
+                self.assertTrue(fast.renderer_context['view'].fast_serialized)
+                cache.clear()
+                with mock.patch.object(viewset, 'fast_serializer_class', None):
+                    regular = self.client.get(url)
+                self.assertEqual(fast.status_code, 200)
+                self.assertEqual(fast.content, regular.content)
+
+
+class ApplicationExportTests(TestCase):
+    """Выгрузка заявок ВУЗа потоком NDJSON или CSV с фильтрами."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.university = User.objects.create_user(
+            email='university@example.com', role=User.UNIVERSITY, university_name='ВУЗ, "Алатау"',
+        )
+        other = User.objects.create_user(email='other@example.com', role=User.UNIVERSITY)
+        for day, status in enumerate(['new', 'in_progress', 'completed'], start=1):
+            for university in (self.university, other):
+                application = Application.objects.create(
+                    name='Абитуриент', email='student@example.com', phone='+77000000000',
+                    subject='Поступление', message='Строка 1\nСтрока 2', status=status, university=university,
+                )
+                Application.objects.filter(pk=application.pk).update(
+                    created_at=datetime.datetime(2025, 1, day, 12, tzinfo=datetime.timezone.utc),
+                )
+        self.client.force_authenticate(self.university)
+
+    def export(self, query=''):
+        response = self.client.get(f'/api/applications/export/{query}')
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        response, body = self.export()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['status'] for row in rows], ['completed', 'in_progress', 'new'])
+        self.assertTrue(all(row['university'] == self.university.pk for row in rows))
+
+    def test_csv_with_filters(self):
+        response, body = self.export('?format=csv&status=new,completed&created_from=2025-01-03&fields=id,status')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines = body.splitlines()
+        self.assertEqual(lines[0], 'id,status')
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].endswith(',completed'))
+
+    def test_csv_escapes_formulas(self):
+        Application.objects.filter(university=self.university).update(
+            name='=HYPERLINK("http://example.com")', subject='@SUM(A1)', message='-1+1',
+        )
+        _, body = self.export('?format=csv&fields=name,phone,subject,message')
+        rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(rows[1], ["'=HYPERLINK(\"http://example.com\")", "'+77000000000", "'@SUM(A1)", "'-1+1"])
+
+    def test_invalid_filter(self):
+        response = self.client.get('/api/applications/export/?status=unknown')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('status', json.loads(response.content))
+
+
+class FilterTests(TestCase):
+    """Фильтры и сортировка списков заявок и программ мобильности."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.university = User.objects.create_user(email='university@example.com', role=User.UNIVERSITY)
+        self.admin = User.objects.create_user(email='admin@example.com', role=User.ADMIN, is_staff=True)
+        for index, country in enumerate(['Германия', 'Франция', 'Германия']):
+            MobilityProgram.objects.create(
+                name=f'Обмен {index}', description='Описание', host_institution='Университет',
+                country=country, city='Город', start_date=datetime.date(2025, 9, 1 + index),
+                end_date=datetime.date(2026, 1, 1), application_deadline=datetime.date(2025, 6, 1 + index),
+                is_active=index != 2,
+            )
+
+    def test_mobility_filters(self):
+        response = self.client.get(
+            '/api/mobility-programs/?country=Германия&start_from=2025-09-01&ordering=start_date'
+        )
+        self.assertEqual([item['name'] for item in response.data['results']], ['Обмен 0', 'Обмен 2'])
+        response = self.client.get('/api/mobility-programs/?is_active=true&deadline_to=2025-06-01')
+        self.assertEqual([item['name'] for item in response.data['results']], ['Обмен 0'])
+        self.assertEqual(self.client.get('/api/mobility-programs/?start_to=сентябрь').status_code, 400)
+
+    def test_application_filters(self):
+        for status in ('new', 'completed', 'new'):
+            Application.objects.create(
+                name='Абитуриент', email='student@example.com', phone='+77000000000',
+                subject='Поступление', message='Текст', status=status, university=self.university,
+            )
+        self.client.force_authenticate(self.university)
+        response = self.client.get('/api/applications/?status=new&ordering=created_at')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertLess(response.data['results'][0]['id'], response.data['results'][1]['id'])
+        self.assertEqual(self.client.get('/api/applications/?status=done').status_code, 400)
+
+    def test_my_applications_for_university(self):
+        other = User.objects.create_user(email='other@example.com', role=User.UNIVERSITY)
+        for university in (self.university, other):
+            Application.objects.create(
+                name='Абитуриент', email='student@example.com', phone='+77000000000',
+                subject='Поступление', message='Текст', university=university,
+            )
+        self.assertEqual(self.client.get('/api/applications/my_applications/').status_code, 401)
+        self.client.force_authenticate(self.university)
+        response = self.client.get('/api/applications/my_applications/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['university'] for item in response.json()], [self.university.pk])
+
+
+class FilterIndexTests(TestCase):
+    """Каждая поддерживаемая комбинация фильтров выполняется поиском по индексу."""
+
+    application_filters = [
+        {},
+        {'status': 'new'},
+        {'status': 'new,completed', 'created_from': '2025-01-01'},
+        {'status': 'new', 'created_from': '2025-01-01', 'created_to': '2025-02-01'},
+        {'created_from': '2025-01-01', 'created_to': '2025-02-01'},
+    ]
+    admin_application_filters = [
+        {'created_from': '2025-01-01'},
+        {'created_from': '2025-01-01', 'created_to': '2025-02-01'},
+    ]
+    mobility_filters = [
+        {'is_active': 'true'},
+        {'is_active': 'true', 'deadline_from': '2025-01-01'},
+        {'is_active': 'false', 'deadline_from': '2025-01-01', 'deadline_to': '2025-02-01'},
+        {'deadline_from': '2025-01-01', 'deadline_to': '2025-02-01'},
+        {'country': 'Германия'},
+        {'country': 'Германия,Франция', 'start_from': '2025-09-01'},
+        {'country': 'Германия', 'start_from': '2025-09-01', 'start_to': '2025-12-31'},
+    ]
+
+    def setUp(self):
+        self.university = User.objects.create_user(email='university@example.com', role=User.UNIVERSITY)
+        self.admin = User.objects.create_user(email='admin@example.com', role=User.ADMIN, is_staff=True)
+
+    def list_queryset(self, viewset, user, params):
+        """Queryset списка в том виде, в каком его выполняет пагинация."""
+        request = Request(APIRequestFactory().get('/', params))
+        request.user = user
+        view = viewset(action='list', request=request, format_kwarg=None, kwargs={})
+        queryset = view.filter_queryset(view.get_queryset())
+        return queryset.order_by(*KeysetCursorPagination().get_ordering(request, queryset, view))
+
+    def query_plan(self, queryset):
+        if connection.vendor == 'postgresql':
+            # На пустых таблицах планировщик всегда выбирает последовательное чтение.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def assertUsesIndex(self, queryset, params):
+        plan = self.query_plan(queryset)
+        table = queryset.model._meta.db_table
+        if connection.vendor == 'sqlite':
+            lines = [line for line in plan.splitlines() if f' {table} ' in f'{line} ']
+            self.assertTrue(lines, plan)
+            for line in lines:
+                self.assertIn('SEARCH', line, f'{params}: {plan}')
+                self.assertIn('INDEX', line, f'{params}: {plan}')
+        else:
+            self.assertNotIn('Seq Scan', plan, f'{params}: {plan}')
+            self.assertIn('Index', plan, f'{params}: {plan}')
+
+    def test_application_filters(self):
+        for params in self.application_filters:
+            with self.subTest(params=params):
+                queryset = self.list_queryset(views.ApplicationViewSet, self.university, params)
+                self.assertUsesIndex(queryset, params)
+        for params in self.admin_application_filters:
+            with self.subTest(params=params):
+                queryset = self.list_queryset(views.ApplicationViewSet, self.admin, params)
+                self.assertUsesIndex(queryset, params)
+
+    def test_mobility_filters(self):
+        for params in self.mobility_filters:
+            with self.subTest(params=params):
+                queryset = self.list_queryset(views.MobilityProgramViewSet, self.admin, params)
+                self.assertUsesIndex(queryset, params)
+
+
+class ApplicationStatsTests(QueryCountAssertionsMixin, TestCase):
+    """Статистика заявок поддерживается приращениями и совпадает с пересчетом."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.university = User.objects.create_user(
+            email='university@example.com', role=User.UNIVERSITY, university_name='ВУЗ',
+        )
+        self.admin = User.objects.create_user(email='admin@example.com', role=User.ADMIN, is_staff=True)
+        self.row = {
+            'name': 'Абитуриент', 'email': 'student@example.com', 'phone': '+77000000000',
+            'subject': 'Поступление', 'message': 'Текст заявки', 'university': self.university.pk,
+        }
+
+    def snapshot(self):
+        return list(
+            ApplicationStat.objects.exclude(count=0).order_by('university', 'status', 'day')
+            .values_list('university', 'status', 'day', 'count')
+        )
+
+    def create_applications(self, count, university=None):
+        for _ in range(count):
+            Application.objects.create(**dict(self.row, university=university or self.university))
+
+    def test_incremental_matches_rebuild(self):
+        self.client.post('/api/applications/', self.row, format='json')
+        self.client.post('/api/applications/', dict(self.row, university=None), format='json')
+        self.client.force_authenticate(self.admin)
+        self.client.post('/api/applications/bulk/', [self.row] * 3, format='json')
+
+        applications = list(Application.objects.filter(university=self.university))
+        applications[0].status = Application.STATUS_COMPLETED
+        applications[0].save()
+        applications[1].university = None
+        applications[1].save()
+        self.client.delete(f'/api/applications/{applications[2].pk}/')
+
+        incremental = self.snapshot()
+        self.assertEqual(sum(count for *_, count in incremental), 4)
+        call_command('rebuild_application_stats', stdout=io.StringIO())
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_university_deleted(self):
+        self.create_applications(2)
+        self.university.delete()
+        self.assertEqual(self.snapshot(), [(None, 'new', Application.objects.first().created_at.date(), 2)])
+
+    def test_endpoint(self):
+        other = User.objects.create_user(email='other@example.com', role=User.UNIVERSITY)
+        self.create_applications(1, university=other)
+        self.client.force_authenticate(self.university)
+        self.assertConstantQueries('/api/applications/stats/', self.create_applications)
+        data = self.client.get('/api/applications/stats/').json()
+        self.assertEqual(data['total'], 6)
+        self.assertEqual(data['by_status'], {'new': 6, 'in_progress': 0, 'completed': 0, 'rejected': 0})
+        self.assertEqual(len(data['by_day']), 1)
+        self.assertNotIn('by_university', data)
+
+        self.client.force_authenticate(self.admin)
+        data = self.client.get('/api/applications/stats/?created_from=2000-01-01').json()
+        self.assertEqual(data['total'], 7)
+        self.assertEqual(
+            {item['university']: item['total'] for item in data['by_university']},
+            {self.university.pk: 6, other.pk: 1},
+        )
+        data = self.client.get(f'/api/applications/stats/?university={other.pk}&created_to=2000-01-01').json()
+        self.assertEqual(data['total'], 0)
+
+
+class AsyncCatalogTests(TestCase):
+    """Асинхронные представления каталога отвечают так же, как ViewSet."""
+
+    def setUp(self):
+        author = User.objects.create_user(email='author@example.com', first_name='Айгерим', last_name='Оспанова')
+        for index in range(3):
+            program = Program.objects.create(
+                name=f'Программа {index}', description='Описание', duration=48,
+                start_date=datetime.date(2025, 9, 1), end_date=datetime.date(2029, 6, 30),
+            )
+            Accreditation.objects.create(
+                program=program, name='Институциональная', organization='IAAR',
+                date_received=datetime.date(2024, 1, 1 + index), expiration_date=datetime.date(2029, 1, 1),
+                certificate_number=f'KZ-{index}',
+            )
+            publication = Publication.objects.create(
+                title=f'Публикация {index}', publication_date=datetime.date(2024, 5, 1 + index),
+                journal_name='Вестник', abstract='Аннотация', keywords='наука',
+            )
+            publication.authors.add(author)
+            MobilityProgram.objects.create(
+                name=f'Обмен {index}', description='Описание', host_institution='Университет',
+                country='Германия' if index else 'Франция', city='Город',
+                start_date=datetime.date(2025, 9, 1 + index), end_date=datetime.date(2026, 1, 1),
+                application_deadline=datetime.date(2025, 6, 1 + index),
+            )
+        self.program, self.publication = program, publication
+
+    async def assertSameResponse(self, path):
+        expected = await self.async_client.get(f'/api/{path}')
+        response = await self.async_client.get(f'/api/async/{path}')
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content.replace(b'/api/async/', b'/api/'), expected.content)
+
+    async def test_lists(self):
+        for path in [
+            'programs/', 'programs/?page_size=2', 'publications/?fields=id,authors',
+            'mobility-programs/?country=Германия&ordering=start_date', 'mobility-programs/?start_from=май',
+        ]:
+            with self.subTest(path=path):
+                await self.assertSameResponse(path)
+
+    async def test_detail(self):
+        for path in [f'programs/{self.program.pk}/', f'publications/{self.publication.pk}/', 'programs/0/']:
+            with self.subTest(path=path):
+                await self.assertSameResponse(path)
+
+
+class UploadTests(TestCase):
+    """Загрузка файла публикации частями, дедупликация и скачивание с Range."""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        staging = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.addCleanup(staging.cleanup)
+        settings = override_settings(MEDIA_ROOT=media.name, UPLOAD_STAGING_ROOT=staging.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.client = APIClient()
+        self.admin = User.objects.create_user(email='admin@example.com', role=User.ADMIN, is_staff=True)
+        self.client.force_authenticate(self.admin)
+        self.content = bytes(range(256)) * 40
+        self.publication = Publication.objects.create(title='Статья', publication_date=datetime.date(2025, 1, 1))
+
+    def put_chunk(self, upload_id, start, end):
+        return self.client.put(
+            f'/api/uploads/{upload_id}/', self.content[start:end + 1],
+            content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{end}/{len(self.content)}',
+        )
+
+    def upload(self):
+        response = self.client.post('/api/uploads/', {
+            'filename': 'dir/article.pdf', 'size': len(self.content),
+            'sha256': hashlib.sha256(self.content).hexdigest(),
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['filename'], 'article.pdf')
+        upload_id = response.data['id']
+        self.assertEqual(self.put_chunk(upload_id, 0, 4095).data, {'offset': 4096})
+        # Повтор той же части после обрыва отклоняется с текущим смещением.
+        response = self.put_chunk(upload_id, 0, 4095)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['offset'], 4096)
+        self.assertEqual(self.client.get(f'/api/uploads/{upload_id}/').data['offset'], 4096)
+        self.assertEqual(self.put_chunk(upload_id, 4096, len(self.content) - 1).data['offset'], len(self.content))
+        response = self.client.post(f'/api/uploads/{upload_id}/complete/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], UploadSession.STATUS_COMPLETED)
+        return upload_id, response.data['file']
+
+    def test_upload_and_deduplicate(self):
+        upload_id, name = self.upload()
+        _, same_name = self.upload()
+        self.assertEqual(same_name, name)
+        self.assertEqual(StoredFile.objects.count(), 1)
+
+        response = self.client.patch(
+            f'/api/publications/{self.publication.pk}/', {'upload': upload_id}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.publication.refresh_from_db()
+        self.assertEqual(self.publication.file.name, name)
+        with self.publication.file.open('rb') as file:
+            self.assertEqual(file.read(), self.content)
+
+    def test_incomplete_and_foreign_uploads(self):
+        response = self.client.post('/api/uploads/', {'filename': 'a.pdf', 'size': 10}, format='json')
+        upload_id = response.data['id']
+        self.assertEqual(self.client.post(f'/api/uploads/{upload_id}/complete/').status_code, 400)
+        response = self.client.patch(
+            f'/api/publications/{self.publication.pk}/', {'upload': upload_id}, format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+
+        other = User.objects.create_user(email='other@example.com', role=User.ADMIN)
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(f'/api/uploads/{upload_id}/').status_code, 404)
+
+    def test_failed_chunk_write_keeps_offset(self):
+        response = self.client.post('/api/uploads/', {'filename': 'a.pdf', 'size': len(self.content)}, format='json')
+        upload_id = response.data['id']
+        self.client.raise_request_exception = False
+        with mock.patch('education.uploads.open', side_effect=OSError(28, 'No space left on device')):
+            self.assertEqual(self.put_chunk(upload_id, 0, 4095).status_code, 500)
+        self.assertEqual(UploadSession.objects.get(pk=upload_id).offset, 0)
+        # Повтор той же части после ошибки записи принимается.
+        self.assertEqual(self.put_chunk(upload_id, 0, 4095).data, {'offset': 4096})
+
+    def received_upload(self):
+        response = self.client.post('/api/uploads/', {'filename': 'a.pdf', 'size': len(self.content)}, format='json')
+        upload_id = response.data['id']
+        self.put_chunk(upload_id, 0, len(self.content) - 1)
+        return upload_id
+
+    def test_complete_in_progress_conflicts(self):
+        upload_id = self.received_upload()
+        # Другой запрос уже забрал загрузку и считает хеш.
+        UploadSession.objects.filter(pk=upload_id).update(status=UploadSession.STATUS_COMPLETING)
+        response = self.client.post(f'/api/uploads/{upload_id}/complete/')
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(StoredFile.objects.exists())
+
+        # Зависшее завершение повторяется после UPLOAD_COMPLETE_TIMEOUT.
+        UploadSession.objects.filter(pk=upload_id).update(
+            updated_at=timezone.now() - datetime.timedelta(seconds=settings.UPLOAD_COMPLETE_TIMEOUT + 1),
+        )
+        response = self.client.post(f'/api/uploads/{upload_id}/complete/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], UploadSession.STATUS_COMPLETED)
+
+    def test_complete_without_staging_file(self):
+        upload_id = self.received_upload()
+        staging_path(UploadSession.objects.get(pk=upload_id)).unlink()
+        response = self.client.post(f'/api/uploads/{upload_id}/complete/')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['offset'], 0)
+        session = UploadSession.objects.get(pk=upload_id)
+        self.assertEqual((session.status, session.offset), (UploadSession.STATUS_PENDING, 0))
+        self.assertEqual(self.put_chunk(upload_id, 0, 4095).data, {'offset': 4096})
+
+    def test_complete_read_error(self):
+        upload_id = self.received_upload()
+        with mock.patch('education.uploads.open', side_effect=PermissionError(13, 'Permission denied')):
+            response = self.client.post(f'/api/uploads/{upload_id}/complete/')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['offset'], len(self.content))
+        self.assertEqual(self.client.post(f'/api/uploads/{upload_id}/complete/').status_code, 200)
+
+    def test_download_ranges(self):
+        upload_id, name = self.upload()
+        self.client.patch(f'/api/publications/{self.publication.pk}/', {'upload': upload_id}, format='json')
+        url = f'/api/publications/{self.publication.pk}/download/'
+        size = len(self.content)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+        response = self.client.get(url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{size}')
+        self.assertEqual(response['Content-Length'], '100')
+        self.assertEqual(b''.join(response.streaming_content), self.content[100:200])
+
+        response = self.client.get(url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(b''.join(response.streaming_content), self.content[-10:])
+
+        response = self.client.get(url, HTTP_RANGE=f'bytes={size}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{size}')
+
+        with self.settings(FILE_DOWNLOAD_OFFLOAD='x-accel-redirect'):
+            response = self.client.get(url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + name)
+        self.assertEqual(response.content, b'')
+
+
+class TextExtractionTests(TestCase):
+    """Текст файлов публикаций извлекается обработчиком очереди и попадает в поиск."""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings = override_settings(MEDIA_ROOT=media.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client = APIClient()
+
+    def docx(self, *paragraphs):
+        body = ''.join(f'<w:p><w:r><w:t>{text}</w:t></w:r></w:p>' for text in paragraphs)
+        content = io.BytesIO()
+        with zipfile.ZipFile(content, 'w') as archive:
+            archive.writestr('word/document.xml', (
+                '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                f'<w:body>{body}</w:body></w:document>'
+            ))
+        return SimpleUploadedFile('article.docx', content.getvalue())
+
+    def search(self, query):
+        response = self.client.get('/api/publications/search/', {'q': query})
+        return [item['id'] for item in response.json()]
+
+    @override_settings(TEXT_EXTRACTION_KEYWORDS=2)
+    def test_extract_and_index(self):
+        publication = Publication.objects.create(
+            title='Статья', publication_date=datetime.date(2025, 1, 1),
+            file=self.docx('Кристаллография минералов.', 'Минералы и кристаллы минерала изучаются.'),
+        )
+        self.assertEqual(PublicationText.objects.get().status, PublicationText.STATUS_PENDING)
+        self.assertEqual(self.search('изучаются'), [])
+
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            self.assertEqual(extract_batch(executor=executor), (1, 0, 1))
+        text = PublicationText.objects.get()
+        self.assertEqual(text.status, PublicationText.STATUS_DONE)
+        self.assertIn('Минералы и кристаллы', text.text)
+        publication.refresh_from_db()
+        self.assertEqual(publication.keywords.split(', ')[:2], ['минералов', 'кристаллография'])
+        self.assertEqual(self.search('изучаются'), [publication.pk])
+        self.assertNotIn('text', self.client.get(f'/api/publications/{publication.pk}/').json())
+
+        # Новый файл заново ставится в очередь, текст старого уходит из поиска.
+        publication.file = self.docx('Гидрология рек.')
+        publication.save()
+        self.assertEqual(PublicationText.objects.get().status, PublicationText.STATUS_PENDING)
+        self.assertEqual(self.search('изучаются'), [])
+        self.assertEqual(extract_batch(), (1, 0, 1))
+        self.assertEqual(self.search('гидрология'), [publication.pk])
+
+    def test_unsupported_format(self):
+        Publication.objects.create(
+            title='Статья', publication_date=datetime.date(2025, 1, 1),
+            file=SimpleUploadedFile('scan.djvu', b'AT&TFORM'),
+        )
+        self.assertEqual(extract_batch(), (0, 1, 1))
+        text = PublicationText.objects.get()
+        self.assertEqual(text.status, PublicationText.STATUS_FAILED)
+        self.assertIn('.djvu', text.last_error)
+        self.assertEqual(extract_batch(), (0, 0, 0))
+
+    @mock.patch('education.extraction.PdfReader', None)
+    def test_missing_pdf_package_is_retried(self):
+        Publication.objects.create(
+            title='Статья', publication_date=datetime.date(2025, 1, 1),
+            file=SimpleUploadedFile('article.pdf', b'%PDF-1.4'),
+        )
+        self.assertEqual(extract_batch(), (0, 1, 1))
+        text = PublicationText.objects.get()
+        self.assertEqual(text.status, PublicationText.STATUS_PENDING)
+        self.assertEqual(text.attempts, 0)
+        self.assertIn('pypdf', text.last_error)
+        self.assertGreater(text.next_attempt_at, timezone.now())
+
+    def test_command_continues_after_replaced_file(self):
+        first = Publication.objects.create(
+            title='Статья', publication_date=datetime.date(2025, 1, 1),
+            file=self.docx('Кристаллография минералов.'),
+        )
+        second = Publication.objects.create(
+            title='Вторая статья', publication_date=datetime.date(2025, 1, 1),
+            file=self.docx('Гидрология рек.'),
+        )
+        PublicationText.objects.filter(publication=first).update(
+            next_attempt_at=timezone.now() - datetime.timedelta(minutes=1),
+        )
+        # Файл первой публикации заменили до записи результата: пачка забрана,
+        # но ничего не извлечено, а в очереди остается вторая публикация.
+        real_finish = indexing.finish
+        with mock.patch('education.indexing.finish') as finish:
+            finish.side_effect = lambda job, *result: (
+                False if job.publication_id == first.pk else real_finish(job, *result)
+            )
+            call_command('extract_publication_text', workers=0, batch_size=1, stdout=io.StringIO())
+        self.assertEqual(
+            PublicationText.objects.get(publication=second).status, PublicationText.STATUS_DONE,
+        )
+
+
+class MetricsTests(TestCase):
+    """Метрики запросов по действиям ViewSet и их выдача на /metrics."""
+
+    def setUp(self):
+        registry.clear()
+        self.addCleanup(registry.clear)
+        self.client = APIClient()
+        author = User.objects.create_user(email='author@example.com')
+        for index in range(3):
+            publication = Publication.objects.create(
+                title=f'Публикация {index}', publication_date=datetime.date(2025, 1, 1 + index),
+            )
+            publication.authors.add(author)
+
+    def metric(self, text, name):
+        line = next(line for line in text.splitlines() if line.startswith(name + ' '))
+        return float(line.rsplit(' ', 1)[1])
+
+    def test_endpoint_metrics(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/publications/')
+        query_count = len(queries)
+        labels = '{endpoint="PublicationViewSet.list",method="GET"}'
+
+        text = self.client.get('/metrics').content.decode()
+        self.assertEqual(
+            self.metric(text, 'http_requests_total{endpoint="PublicationViewSet.list",method="GET",status="200"}'), 1,
+        )
+        self.assertEqual(self.metric(text, f'http_request_db_queries_sum{labels}'), query_count)
+        self.assertEqual(self.metric(text, f'http_response_size_bytes_sum{labels}'), len(response.content))
+        for name in ('duration', 'db_duration', 'serialization', 'render'):
+            self.assertGreater(self.metric(text, f'http_request_{name}_seconds_sum{labels}'), 0)
+        self.assertIn(
+            'http_request_duration_seconds_bucket{endpoint="PublicationViewSet.list",method="GET",le="+Inf"} 1',
+            text,
+        )
+
+        with self.settings(METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+            response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+            self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_SLOW_SAMPLE_RATE=1.0, METRICS_SLOW_REQUEST_MS=0)
+    def test_slow_request_log(self):
+        with self.assertLogs('backend.metrics.slow', 'WARNING') as logs:
+            self.client.get('/api/publications/search/', {'q': 'секретный'})
+        self.assertIn('PublicationViewSet.search', logs.output[0])
+        self.assertIn('education_publication', logs.output[0])
+        self.assertIn('[параметров: ', logs.output[0])
+        # Ни значения параметров SQL, ни строка запроса в лог не попадают.
+        self.assertNotIn('секретный', logs.output[0])
+
+
+class SeedDataTests(TestCase):
+    """Генератор данных для нагрузочных тестов и сравнение результатов с базовыми."""
+
+    def test_seed(self):
+        created = seed(scale=0.05, seed=1)
+        self.assertEqual(created['applications'], Application.objects.count())
+        self.assertEqual(
+            set(User.objects.values_list('role', flat=True)), {User.USER, User.ADMIN, User.UNIVERSITY},
+        )
+        self.assertFalse(Publication.objects.filter(authors__isnull=True).exists())
+        # Статистика и поисковый индекс перестроены после bulk_create.
+        self.assertEqual(
+            sum(ApplicationStat.objects.values_list('count', flat=True)), Application.objects.count(),
+        )
+        title = Publication.objects.values_list('title', flat=True).first()
+        response = APIClient().get('/api/publications/search/', {'q': title})
+        self.assertTrue(response.json())
+
+    def test_compare_results(self):
+        baseline = {'client': {'list': {'p50_ms': 10.0, 'queries': 3, 'peak_memory_kb': 100.0}}}
+        results = {'client': {
+            'list': {'p50_ms': 12.0, 'queries': 4, 'peak_memory_kb': 140.0},
+            'new': {'p50_ms': 1.0, 'queries': 1, 'peak_memory_kb': 1.0},
+        }}
+        self.assertEqual(compare_results(results, baseline, tolerance=0.25), [
+            'client list: queries 3 -> 4', 'client list: peak_memory_kb 100.0 -> 140.0',
+        ])
+
+
+class AdminChangelistTests(QueryCountAssertionsMixin, TestCase):
+    """Списки админки для больших таблиц: присоединенные связи, фильтр по id и оценка числа строк."""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='pass')
+        self.client.force_login(self.admin)
+        self.counter = 0
+
+    def create_applications(self, count, university=None):
+        for _ in range(count):
+            self.counter += 1
+            Application.objects.create(
+                name='Абитуриент', email='student@example.com', phone='+77000000000',
+                subject='Поступление', message='Текст заявки',
+                university=university or User.objects.create_user(
+                    email=f'university{self.counter}@example.com', role=User.UNIVERSITY,
+                ),
+            )
+
+    def test_application_changelist_queries(self):
+        self.assertConstantQueries('/admin/education/application/', self.create_applications)
+
+    def test_university_id_filter(self):
+        self.create_applications(3)
+        university = User.objects.get(email='university2@example.com')
+        response = self.client.get('/admin/education/application/', {'university': university.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([application.university for application in response.context['cl'].result_list], [university])
+        # Список ВУЗов в фильтре не выводится.
+        self.assertNotContains(response, 'university__id__exact')
+        response = self.client.get('/admin/education/application/', {'university': 'abc'})
+        self.assertRedirects(response, '/admin/education/application/?e=1', fetch_redirect_response=False)
+
+    def test_estimated_count(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Оценка на PostgreSQL зависит от статистики планировщика.')
+        university = User.objects.create_user(email='university@example.com', role=User.UNIVERSITY)
+        self.create_applications(3, university)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.create_applications(2, university)
+
+        with self.settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1):
+            response = self.client.get('/admin/education/application/')
+            self.assertEqual(response.context['cl'].result_count, 3)
+            # Отфильтрованные выборки SQLite считает точно.
+            response = self.client.get('/admin/education/application/', {'status': Application.STATUS_NEW})
+            self.assertEqual(response.context['cl'].result_count, 5)
+        response = self.client.get('/admin/education/application/')
+        self.assertEqual(response.context['cl'].result_count, 5)
+
+    def test_date_hierarchy_indexed(self):
+        for model, model_admin in admin.site._registry.items():
+            if model._meta.app_label != 'education' or not model_admin.date_hierarchy:
+                continue
+            with self.subTest(model=model.__name__):
+                leading = {index.fields[0].lstrip('-') for index in model._meta.indexes}
+                self.assertIn(model_admin.date_hierarchy, leading)
+
+
+class ApplicationTransitionTests(TestCase):
+    """Пакетный перевод статусов: допустимые переходы, журнал и статистика без загрузки заявок."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.university = User.objects.create_user(email='university@example.com', role=User.UNIVERSITY)
+        self.admin = User.objects.create_user(email='admin@example.com', role=User.ADMIN, is_staff=True)
+
+    def create_applications(self, count, status=Application.STATUS_NEW, university=None):
+        return [
+            Application.objects.create(
+                name='Абитуриент', email='student@example.com', phone='+77000000000',
+                subject='Поступление', message='Текст заявки', status=status,
+                university=university or self.university,
+            ).pk
+            for _ in range(count)
+        ]
+
+    def transition(self, ids, status):
+        return self.client.post('/api/applications/transition/', {'ids': ids, 'status': status}, format='json')
+
+    def test_transition(self):
+        new = self.create_applications(3)
+        completed = self.create_applications(1, Application.STATUS_COMPLETED)
+        self.client.force_authenticate(self.admin)
+
+        response = self.transition(new + completed + [10 ** 6], Application.STATUS_IN_PROGRESS)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'status': 'in_progress', 'updated': 3, 'not_allowed': {'completed': 1}, 'not_found': 1,
+        })
+        self.assertEqual(Application.objects.filter(status=Application.STATUS_IN_PROGRESS).count(), 3)
+        self.assertEqual(
+            sorted(ApplicationStatusChange.objects.values_list('application', 'from_status', 'to_status', 'changed_by')),
+            [(pk, 'new', 'in_progress', self.admin.pk) for pk in new],
+        )
+        # Повторный перевод ничего не меняет.
+        self.assertEqual(self.transition(new, Application.STATUS_IN_PROGRESS).json()['updated'], 0)
+
+        stats = list(ApplicationStat.objects.exclude(count=0).order_by('status').values_list('status', 'count'))
+        self.assertEqual(stats, [('completed', 1), ('in_progress', 3)])
+        call_command('rebuild_application_stats', stdout=io.StringIO())
+        self.assertEqual(
+            list(ApplicationStat.objects.exclude(count=0).order_by('status').values_list('status', 'count')), stats,
+        )
+
+    def test_queries_do_not_grow(self):
+        self.client.force_authenticate(self.admin)
+        # Первый перевод создает строки статистики для нового статуса.
+        self.transition(self.create_applications(1), Application.STATUS_REJECTED)
+        counts = []
+        for size in (2, 20):
+            ids = self.create_applications(size)
+            with CaptureQueriesContext(connection) as context:
+                self.assertEqual(self.transition(ids, Application.STATUS_REJECTED).json()['updated'], size)
+            counts.append(len(context.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_university_scope(self):
+        other = User.objects.create_user(email='other@example.com', role=User.UNIVERSITY)
+        own = self.create_applications(1)
+        foreign = self.create_applications(1, university=other)
+        self.client.force_authenticate(self.university)
+        response = self.transition(own + foreign, Application.STATUS_REJECTED)
+        self.assertEqual(response.json()['updated'], 1)
+        self.assertEqual(response.json()['not_found'], 1)
+        self.assertEqual(Application.objects.get(pk=foreign[0]).status, Application.STATUS_NEW)
+
+    def test_validation(self):
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.transition([], Application.STATUS_REJECTED).status_code, 400)
+        self.assertEqual(self.transition([1], 'done').status_code, 400)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.transition([1], Application.STATUS_REJECTED).status_code, 401)
+
+
+class CleanupStaleDataTests(TestCase):
+    """Устаревшие токены, сессии и архивные программы мобильности удаляются пачками."""
+
+    def create_mobility_program(self, is_active, deadline):
+        return MobilityProgram.objects.create(
+            name='Семестр', description='Описание', host_institution='TU Berlin', country='Германия',
+            city='Берлин', start_date=deadline, end_date=deadline, application_deadline=deadline,
+            requirements='', benefits='', contact_email='exchange@example.com', is_active=is_active,
+        )
+
+    def test_cleanup(self):
+        user = User.objects.create_user(email='user@example.com')
+        for index in range(5):
+            PasswordResetToken.objects.create(user=user, token=f'old{index}')
+        PasswordResetToken.objects.update(created_at=timezone.now() - datetime.timedelta(days=30))
+        PasswordResetToken.objects.create(user=user, token='used', is_used=True)
+        PasswordResetToken.objects.create(user=user, token='valid')
+        for key, days in (('expired', -1), ('active', 1)):
+            Session.objects.create(
+                session_key=key, session_data='', expire_date=timezone.now() + datetime.timedelta(days=days),
+            )
+        old = datetime.date.today() - datetime.timedelta(days=800)
+        archived = self.create_mobility_program(False, old)
+        self.create_mobility_program(True, old)
+        self.create_mobility_program(False, datetime.date.today())
+
+        with CaptureQueriesContext(connection) as context:
+            call_command('cleanup_stale_data', batch_size=2, pause=0, stdout=io.StringIO())
+        self.assertEqual(list(PasswordResetToken.objects.values_list('token', flat=True)), ['valid'])
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['active'])
+        self.assertEqual(MobilityProgram.objects.count(), 2)
+        self.assertFalse(MobilityProgram.objects.filter(pk=archived.pk).exists())
+        # Шесть устаревших токенов удалены тремя пачками по две строки.
+        deletes = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('DELETE FROM "users_passwordresettoken"')
+        ]
+        self.assertEqual(len(deletes), 3)
+
+
+class DatabaseRoutingTests(TestCase):
+    """Маршрутизация чтений на реплику, проверенная на втором файле SQLite."""
+
+    replica = 'replica_test'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Реплика подключается после настройки TestCase: ее данные не
+        # откатываются транзакцией теста, а очищаются в setUp().
+        cls.replica_dir = tempfile.TemporaryDirectory()
+        replica_settings = {
+            **connections.settings['default'], 'NAME': os.path.join(cls.replica_dir.name, 'replica.sqlite3'),
+        }
+        connections.settings[cls.replica] = replica_settings
+        cls.databases = {*cls.databases, cls.replica}
+        cls.databases_override = override_settings(
+            DATABASES={**settings.DATABASES, cls.replica: replica_settings}, CACHES=NO_CACHE,
+        )
+        with warnings.catch_warnings():
+            # Соединение реплики уже настроено выше; get_replicas() читает DATABASES.
+            warnings.filterwarnings('ignore', 'Overriding setting DATABASES')
+            cls.databases_override.enable()
+        # Схема реплики создается напрямую: migrate для реплик запрещен роутером.
+        with connections[cls.replica].schema_editor() as editor:
+            for model in (Program, Accreditation):
+                editor.create_model(model)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.databases_override.disable()
+        connections[cls.replica].close()
+        del connections[cls.replica]
+        del connections.settings[cls.replica]
+        cls.databases = cls.databases - {cls.replica}
+        cls.replica_dir.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.program = Program.objects.create(
+            name='Основная', description='Описание', duration=12,
+            start_date=datetime.date(2025, 9, 1), end_date=datetime.date(2026, 6, 30),
+        )
+        Program.objects.using(self.replica).all().delete()
+        # bulk_create не отправляет сигналы, которым нужен поисковый индекс.
+        Program.objects.using(self.replica).bulk_create([Program(
+            pk=self.program.pk, name='Реплика', description='Описание', duration=12,
+            start_date=self.program.start_date, end_date=self.program.end_date,
+        )])
+        self.client = APIClient()
+
+    def test_safe_education_read_uses_replica(self):
+        response = self.client.get(f'/api/programs/{self.program.pk}/')
+        self.assertEqual(response.json()['name'], 'Реплика')
+
+    def test_pin_cookie(self):
+        response = self.client.post('/api/applications/', {
+            'name': 'Абитуриент', 'email': 'student@example.com', 'phone': '+77000000000',
+            'subject': 'Поступление', 'message': 'Текст заявки',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        # С cookie клиент читает с основного сервера и видит свои изменения.
+        response = self.client.get(f'/api/programs/{self.program.pk}/')
+        self.assertEqual(response.json()['name'], 'Основная')
+
+    def test_read_after_write_in_request(self):
+        state = RoutingState()
+        state.use_replica = True
+        token = _routing_state.set(state)
+        try:
+            self.assertEqual(db_router.db_for_read(Program), self.replica)
+            # Пользователи и остальные приложения всегда читаются с основного сервера.
+            self.assertEqual(db_router.db_for_read(User), 'default')
+            self.assertEqual(db_router.db_for_write(Application), 'default')
+            self.assertEqual(db_router.db_for_read(Program), 'default')
+        finally:
+            _routing_state.reset(token)
+        # Вне запроса реплика не используется.
+        self.assertEqual(db_router.db_for_read(Program), 'default')
+
+    def test_migrations_only_on_primary(self):
+        self.assertFalse(db_router.allow_migrate(self.replica, 'education'))
+        self.assertTrue(db_router.allow_migrate('default', 'education'))
+
+
+class KeysetPaginationTests(TestCase):
+    """Курсорная пагинация списков: переходы по страницам, равные значения сортировки, ?ordering=."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(email='admin@example.com', role=User.ADMIN))
+        statuses = ['new', 'completed', 'new', 'rejected', 'new', 'completed', 'new']
+        self.ids = [
+            Application.objects.create(
+                name='Абитуриент', email='student@example.com', phone='+77000000000',
+                subject='Поступление', message='Текст заявки', status=status,
+            ).pk
+            for status in statuses
+        ]
+        # Одинаковая дата создания: порядок определяет только id.
+        Application.objects.update(created_at=timezone.now())
+
+    def pages(self, url):
+        pages = []
+        while url:
+            data = self.client.get(url).json()
+            pages.append([row['id'] for row in data['results']])
+            url = data['next']
+        return pages, data
+
+    def test_next_and_previous(self):
+        pages, last = self.pages('/api/applications/?page_size=3')
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), sorted(self.ids, reverse=True))
+
+        previous = []
+        url = last['previous']
+        while url:
+            data = self.client.get(url).json()
+            previous.insert(0, [row['id'] for row in data['results']])
+            url = data['previous']
+        self.assertEqual(previous, pages[:-1])
+
+    def test_ordering_param(self):
+        pages, _ = self.pages('/api/applications/?ordering=status&page_size=2')
+        expected = Application.objects.order_by('status', 'id').values_list('id', flat=True)
+        self.assertEqual(sum(pages, []), list(expected))
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/api/applications/?cursor=invalid').status_code, 404)
+
+    def test_page_size_capped(self):
+        with mock.patch.object(KeysetCursorPagination, 'max_page_size', 2):
+            data = self.client.get('/api/applications/?page_size=50').json()
+        self.assertEqual(len(data['results']), 2)
+
+
+class SQLitePragmaTests(TestCase):
+    """Профиль производительности SQLite: PRAGMA соединения и режим WAL."""
+
+    def test_pragmas_on_new_connection(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Профиль относится только к SQLite.')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        wrapper = type(connections['default'])(
+            {**connections.settings['default'], 'NAME': os.path.join(directory.name, 'pragmas.sqlite3')},
+            alias='pragma_test',
+        )
+        self.addCleanup(wrapper.close)
+
+        def read_pragmas():
+            values = {}
+            with wrapper.cursor() as cursor:
+                for name in ('journal_mode', 'synchronous', 'busy_timeout'):
+                    cursor.execute(f'PRAGMA {name}')
+                    values[name] = cursor.fetchone()[0]
+            return values
+
+        with self.settings(SQLITE_PERFORMANCE_PROFILE=True):
+            # Соединение не меняет режим журнала, записанный в файле базы.
+            # synchronous: 1 - NORMAL.
+            self.assertEqual(read_pragmas(), {'journal_mode': 'delete', 'synchronous': 1, 'busy_timeout': 5000})
+            self.assertEqual(set_journal_mode(wrapper), 'wal')
+            wrapper.close()
+            self.assertEqual(read_pragmas(), {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000})
@@ -0,0 +1,210 @@
+"""
+Загрузка файлов публикаций частями с возможностью продолжения.
+
+Клиент создает загрузку (UploadSession) с именем и размером файла и
+отправляет части запросами PUT с заголовком Content-Range. Сервер принимает
+только часть, начинающуюся с уже полученного смещения: после обрыва клиент
+запрашивает загрузку, узнает смещение и продолжает с него. Части пишутся
+в файл в UPLOAD_STAGING_ROOT, память на запрос ограничена UPLOAD_SPOOL_SIZE.
+
+После последней части загрузка завершается: считается SHA-256 содержимого,
+и если такой файл уже есть (StoredFile), новый в хранилище не сохраняется.
+Завершение забирает загрузку условным UPDATE, как и запись части, поэтому
+повторный или параллельный запрос не читает файл, который уже обрабатывается.
+Имя файла в хранилище - хеш, поэтому одинаковые PDF хранятся один раз.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import StoredFile, UploadSession
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+# Часть до этого размера собирается в памяти, больше - во временном файле.
+UPLOAD_SPOOL_SIZE = 1024 * 1024
+COPY_BLOCK_SIZE = 64 * 1024
+
+
+class UploadConflict(APIException):
+    """Часть начинается не с текущего смещения загрузки."""
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Часть не совпадает с текущим смещением загрузки.'
+    default_code = 'conflict'
+
+
+class StagedFile(File):
+    """
+    Собранный файл загрузки. FileSystemStorage перемещает файл с
+    temporary_file_path() вместо копирования, остальные хранилища читают его.
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def staging_path(session):
+    return Path(settings.UPLOAD_STAGING_ROOT) / f'{session.pk}.part'
+
+
+def parse_content_range(header, size):
+    """Разбирает 'bytes first-last/total' и возвращает (начало, длина)."""
+    match = CONTENT_RANGE_RE.match(header or '')
+    if match is None:
+        raise ValidationError({'Content-Range': 'Ожидается заголовок вида "bytes 0-1048575/10485760".'})
+    first, last, total = (int(value) for value in match.groups())
+    if total != size or first > last or last >= size:
+        raise ValidationError({'Content-Range': f'Диапазон не соответствует размеру файла ({size} байт).'})
+    return first, last - first + 1
+
+
+def write_chunk(session, stream, content_range):
+    """
+    Принимает часть из потока запроса и возвращает новое смещение.
+
+    Часть сначала читается целиком, затем смещение сдвигается условным
+    UPDATE: из параллельных запросов с одним началом проходит только один,
+    остальные получают UploadConflict. UPDATE и запись части в файл
+    выполняются в одной транзакции.
+    """
+    start, length = parse_content_range(content_range, session.size)
+    if length > settings.UPLOAD_CHUNK_MAX_SIZE:
+        raise ValidationError({'Content-Range': f'Часть больше {settings.UPLOAD_CHUNK_MAX_SIZE} байт.'})
+    if session.status != UploadSession.STATUS_PENDING:
+        raise UploadConflict('Загрузка уже завершена.')
+    if start != session.offset:
+        raise UploadConflict()
+
+    with tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_SIZE) as buffer:
+        received = 0
+        while received <= length:
+            block = stream.read(min(COPY_BLOCK_SIZE, length + 1 - received)) if stream else b''
+            if not block:
+                break
+            buffer.write(block)
+            received += len(block)
+        if received != length:
+            raise ValidationError({'detail': f'Получено {received} байт вместо {length}.'})
+
+        # Смещение сдвигается только вместе с записью части: при ошибке
+        # записи (нет места, нет доступа к UPLOAD_STAGING_ROOT) UPDATE
+        # откатывается и клиент может повторить ту же часть.
+        with transaction.atomic():
+            claimed = UploadSession.objects.filter(
+                pk=session.pk, status=UploadSession.STATUS_PENDING, offset=start,
+            ).update(offset=start + length, updated_at=timezone.now())
+            if not claimed:
+                raise UploadConflict()
+
+            path = staging_path(session)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            buffer.seek(0)
+            with open(os.open(path, os.O_WRONLY | os.O_CREAT, 0o600), 'wb') as part:
+                part.seek(start)
+                while block := buffer.read(COPY_BLOCK_SIZE):
+                    part.write(block)
+
+    session.offset = start + length
+    return session.offset
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        while block := file.read(COPY_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def store_file(path, digest, size, filename):
+    """Сохраняет файл в хранилище, если файла с таким хешем там еще нет."""
+    existing = StoredFile.objects.filter(sha256=digest).first()
+    if existing is not None:
+        return existing
+    extension = Path(filename).suffix.lower()[:10]
+    with open(path, 'rb') as file:
+        name = default_storage.save(f'publications/{digest[:2]}/{digest}{extension}', StagedFile(file))
+    try:
+        with transaction.atomic():
+            return StoredFile.objects.create(sha256=digest, name=name, size=size)
+    except IntegrityError:
+        # Такой же файл одновременно сохранила другая загрузка.
+        default_storage.delete(name)
+        return StoredFile.objects.get(sha256=digest)
+
+
+def release_upload(session, offset):
+    """Возвращает забранную для завершения загрузку к приему частей с `offset`."""
+    UploadSession.objects.filter(pk=session.pk, status=UploadSession.STATUS_COMPLETING).update(
+        status=UploadSession.STATUS_PENDING, offset=offset, updated_at=timezone.now(),
+    )
+    session.status = UploadSession.STATUS_PENDING
+    session.offset = offset
+
+
+def complete_upload(session):
+    """
+    Проверяет собранный файл и сохраняет его в хранилище. При несовпадении
+    хеша с заявленным загрузка начинается заново (смещение сбрасывается).
+
+    Загрузка, которую уже завершает другой запрос, дает UploadConflict;
+    завершение, зависшее дольше UPLOAD_COMPLETE_TIMEOUT, можно повторить.
+    """
+    if session.status == UploadSession.STATUS_COMPLETED:
+        return session
+    if session.offset != session.size:
+        raise ValidationError({'detail': f'Получено {session.offset} из {session.size} байт.'})
+
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.UPLOAD_COMPLETE_TIMEOUT)
+    claimed = UploadSession.objects.filter(
+        Q(status=UploadSession.STATUS_PENDING) | Q(status=UploadSession.STATUS_COMPLETING, updated_at__lt=stale),
+        pk=session.pk, offset=session.size,
+    ).update(status=UploadSession.STATUS_COMPLETING, updated_at=now)
+    if not claimed:
+        raise UploadConflict('Загрузка уже завершается.')
+
+    path = staging_path(session)
+    try:
+        digest = file_digest(path)
+        if session.sha256 and session.sha256 != digest:
+            path.unlink(missing_ok=True)
+            release_upload(session, 0)
+            raise ValidationError({'sha256': 'Хеш полученного файла не совпадает с заявленным, загрузите файл заново.'})
+        stored_file = store_file(path, digest, session.size, session.filename)
+    except FileNotFoundError:
+        # Частей нет в UPLOAD_STAGING_ROOT этого сервера: папка не общая или
+        # файл удален. Загрузка начинается заново.
+        release_upload(session, 0)
+        raise UploadConflict('Полученные части не найдены, загрузите файл заново.')
+    except OSError as exc:
+        release_upload(session, session.size)
+        raise UploadConflict(f'Не удалось прочитать полученный файл, повторите завершение: {exc.strerror}')
+    except Exception:
+        release_upload(session, session.offset)
+        raise
+
+    session.stored_file = stored_file
+    session.sha256 = digest
+    session.status = UploadSession.STATUS_COMPLETED
+    session.save(update_fields=['stored_file', 'sha256', 'status', 'updated_at'])
+    path.unlink(missing_ok=True)
+    return session
+
+
+def discard_upload(session):
+    staging_path(session).unlink(missing_ok=True)
+    session.delete()
@@ -1,13 +1,39 @@
+from itertools import islice
+
 from django.shortcuts import render
-from rest_framework import viewsets, permissions
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework import mixins, viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
-from .models import Program, Accreditation, Publication, MobilityProgram, Application
+from backend.files import file_response
+from .models import (
+    Program, Accreditation, Publication, MobilityProgram, Application, ApplicationStat, UploadSession
+)
 from .serializers import (
     ProgramSerializer, ProgramDetailSerializer,
     AccreditationSerializer, AccreditationDetailSerializer,
     PublicationSerializer, MobilityProgramSerializer,
-    ApplicationSerializer, ApplicationCreateSerializer
+    ApplicationSerializer, ApplicationCreateSerializer, ApplicationBulkCreateSerializer,
+    ApplicationTransitionSerializer, UploadSessionSerializer
+)
+from .filters import ApplicationFilter, ApplicationStatFilter, MobilityProgramFilter
+from .parsers import NDJSONParser
+from .renderers import CSVRenderer, NDJSONRenderer
+from .cache import CachedResponseMixin
+from .conditional import ConditionalGetMixin
+from .stats import summarize
+from .uploads import UploadConflict, complete_upload, discard_upload, write_chunk
+from .workflow import TransitionConflict, apply_transition
+from .fast_serializers import (
+    AccreditationFastSerializer, ApplicationFastSerializer, MobilityProgramFastSerializer,
+    ProgramFastSerializer, PublicationFastSerializer
+)
+from .mixins import (
+    FastReadMixin, FullTextSearchMixin, prefetch_authors, prefetch_accreditations,
+    select_program, select_program_name, select_university_name
 )
 
 
@@ -23,12 +49,22 @@ class IsAdminOrReadOnly(permissions.BasePermission):
         return request.user and request.user.is_admin
 
 
-class ProgramViewSet(viewsets.ModelViewSet):
+class ProgramViewSet(CachedResponseMixin, FastReadMixin, ConditionalGetMixin,
+                     FullTextSearchMixin, viewsets.ModelViewSet):
     """ViewSet для работы с образовательными программами."""
     
     queryset = Program.objects.all()
     serializer_class = ProgramSerializer
+    fast_serializer_class = ProgramFastSerializer
     permission_classes = [IsAdminOrReadOnly]
+    queryset_optimizations = {
+        'retrieve': prefetch_accreditations,
+    }
+    cached_actions = ('list', 'retrieve', 'search')
+    cache_models = (Program, Accreditation)
+    conditional_dependencies = {
+        'retrieve': ('accreditations',),
+    }
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -36,72 +72,191 @@ class ProgramViewSet(viewsets.ModelViewSet):
         return self.serializer_class
 
 
-class AccreditationViewSet(viewsets.ModelViewSet):
+class AccreditationViewSet(CachedResponseMixin, FastReadMixin, ConditionalGetMixin,
+                           viewsets.ModelViewSet):
     """ViewSet для работы с аккредитациями."""
     
     queryset = Accreditation.objects.all()
     serializer_class = AccreditationSerializer
+    fast_serializer_class = AccreditationFastSerializer
+    fast_actions = ('list', 'by_program')
     permission_classes = [IsAdminOrReadOnly]
+    queryset_optimizations = {
+        'default': select_program_name,
+        'retrieve': select_program,
+        'destroy': None,
+    }
+    sparse_queryset_actions = ('list', 'retrieve', 'by_program')
+    cached_actions = ('list', 'retrieve', 'by_program')
+    cache_models = (Accreditation, Program)
+    conditional_actions = ('list', 'retrieve', 'by_program')
+    conditional_dependencies = {
+        'default': ('program',),
+    }
     
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return AccreditationDetailSerializer
         return self.serializer_class
     
+    def get_queryset(self):
+        """Для by_program ограничивает аккредитации выбранной программой."""
+        queryset = super().get_queryset()
+        if self.action == 'by_program':
+            queryset = queryset.filter(program_id=self.request.query_params.get('program_id'))
+        return queryset
+    
     @action(detail=False, methods=['get'])
     def by_program(self, request):
         """Получение аккредитаций по ID программы."""
         program_id = request.query_params.get('program_id')
         if program_id:
-            accreditations = Accreditation.objects.filter(program_id=program_id)
-            serializer = self.get_serializer(accreditations, many=True)
-            return Response(serializer.data)
+            return Response(self.serialize_list(self.get_queryset()))
         return Response({"detail": "Необходимо указать program_id."}, status=400)
 
 
-class PublicationViewSet(viewsets.ModelViewSet):
+class PublicationViewSet(FullTextSearchMixin, FastReadMixin, viewsets.ModelViewSet):
     """ViewSet для работы с публикациями."""
     
     queryset = Publication.objects.all()
     serializer_class = PublicationSerializer
+    fast_serializer_class = PublicationFastSerializer
+    fast_actions = ('list', 'my_publications')
     permission_classes = [IsAdminOrReadOnly]
+    queryset_optimizations = {
+        'default': prefetch_authors,
+        'destroy': None,
+        'download': None,
+    }
+    sparse_queryset_actions = ('list', 'retrieve', 'my_publications')
+    
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """
+        Файл публикации. Поддерживает Range (206) для продолжения скачивания;
+        отдачу можно передать веб-серверу (FILE_DOWNLOAD_OFFLOAD).
+        """
+        publication = self.get_object()
+        if not publication.file:
+            return Response({"detail": "У публикации нет файла."}, status=404)
+        return file_response(request, publication.file)
     
     @action(detail=False, methods=['get'])
     def my_publications(self, request):
         """Получение публикаций текущего пользователя."""
         if request.user.is_authenticated:
-            publications = Publication.objects.filter(authors=request.user)
-            serializer = self.get_serializer(publications, many=True)
-            return Response(serializer.data)
+            publications = self.optimize_queryset(
+                Publication.objects.filter(authors=request.user)
+            )
+            return Response(self.serialize_list(publications))
         return Response({"detail": "Необходима аутентификация."}, status=401)
 
 
-class MobilityProgramViewSet(viewsets.ModelViewSet):
+class UploadViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin,
+                    mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Загрузка файлов публикаций частями с продолжением после обрыва.
+    
+    POST создает загрузку (имя, размер, по желанию SHA-256), PUT с заголовком
+    Content-Range передает очередную часть, GET возвращает полученное смещение,
+    POST complete/ собирает файл. Завершенную загрузку указывают в поле
+    `upload` публикации. Подробности - в uploads.py.
+    """
+    
+    queryset = UploadSession.objects.all()
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOnly]
+    
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.request.user).select_related('stored_file')
+    
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+    
+    def update(self, request, pk=None):
+        """Часть файла: тело запроса - байты части, диапазон - в Content-Range."""
+        session = self.get_object()
+        try:
+            offset = write_chunk(session, request.stream, request.META.get('HTTP_CONTENT_RANGE'))
+        except UploadConflict as exc:
+            session.refresh_from_db(fields=['offset', 'status'])
+            return Response({"detail": exc.detail, "offset": session.offset}, status=exc.status_code)
+        return Response({"offset": offset})
+    
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        """Завершение загрузки: проверка хеша и сохранение файла в хранилище."""
+        session = self.get_object()
+        try:
+            session = complete_upload(session)
+        except UploadConflict as exc:
+            session.refresh_from_db(fields=['offset', 'status'])
+            return Response({"detail": exc.detail, "offset": session.offset}, status=exc.status_code)
+        return Response(self.get_serializer(session).data)
+    
+    def perform_destroy(self, instance):
+        discard_upload(instance)
+
+
+class MobilityProgramViewSet(CachedResponseMixin, FastReadMixin, ConditionalGetMixin,
+                             viewsets.ModelViewSet):
     """ViewSet для работы с программами мобильности."""
     
     queryset = MobilityProgram.objects.all()
     serializer_class = MobilityProgramSerializer
+    fast_serializer_class = MobilityProgramFastSerializer
+    fast_actions = ('list', 'active')
     permission_classes = [IsAdminOrReadOnly]
+    filter_backends = [MobilityProgramFilter, OrderingFilter]
+    ordering_fields = ['application_deadline', 'start_date', 'created_at', 'name']
+    sparse_queryset_actions = ('list', 'retrieve', 'active')
+    cached_actions = ('list', 'retrieve', 'active')
+    conditional_actions = ('list', 'retrieve', 'active')
+    
+    def get_queryset(self):
+        """Для active оставляет только активные программы."""
+        queryset = super().get_queryset()
+        if self.action == 'active':
+            # Сравнение, а не "WHERE is_active": так SQLite использует индекс
+            # (is_active, application_deadline).
+            queryset = queryset.filter(is_active__in=[True])
+        return queryset
     
     @action(detail=False, methods=['get'])
     def active(self, request):
         """Получение только активных программ мобильности."""
-        active_programs = MobilityProgram.objects.filter(is_active=True)
-        serializer = self.get_serializer(active_programs, many=True)
-        return Response(serializer.data)
+        return Response(self.serialize_list(self.filter_queryset(self.get_queryset())))
 
 
-class ApplicationViewSet(viewsets.ModelViewSet):
+class ApplicationViewSet(FastReadMixin, viewsets.ModelViewSet):
     """ViewSet для работы с заявками."""
     
     queryset = Application.objects.all()
     serializer_class = ApplicationSerializer
+    fast_serializer_class = ApplicationFastSerializer
+    fast_actions = ('list', 'my_applications')
+    filter_backends = [ApplicationFilter, OrderingFilter]
+    ordering_fields = ['created_at', 'updated_at', 'status']
+    queryset_optimizations = {
+        'default': select_university_name,
+        'create': None,
+        'destroy': None,
+        'transition': None,
+    }
+    sparse_queryset_actions = ('list', 'retrieve', 'my_applications')
     
     def get_permissions(self):
         """Определяет права доступа в зависимости от действия."""
         if self.action == 'create':
             permission_classes = [permissions.AllowAny]
-        elif self.action in ['retrieve', 'update', 'partial_update', 'destroy', 'list']:
+        elif self.action == 'bulk':
+            # Пакеты заявок партнерских порталов принимаются только от
+            # служебных учетных записей персонала, а не анонимно.
+            permission_classes = [permissions.IsAdminUser]
+        elif self.action in [
+            'retrieve', 'update', 'partial_update', 'destroy', 'list', 'my_applications',
+            'export', 'stats', 'transition',
+        ]:
             permission_classes = [permissions.IsAuthenticated]
         else:
             permission_classes = [permissions.IsAdminUser]
@@ -111,11 +266,15 @@ class ApplicationViewSet(viewsets.ModelViewSet):
         """Возвращает соответствующий сериализатор в зависимости от действия."""
         if self.action == 'create':
             return ApplicationCreateSerializer
+        elif self.action == 'bulk':
+            return ApplicationBulkCreateSerializer
+        elif self.action == 'transition':
+            return ApplicationTransitionSerializer
         return self.serializer_class
     
     def get_queryset(self):
         """Фильтрует заявки в зависимости от роли пользователя."""
-        queryset = Application.objects.all()
+        queryset = self.optimize_queryset(Application.objects.all())
         user = self.request.user
         
         if user.is_authenticated:
@@ -130,7 +289,126 @@ class ApplicationViewSet(viewsets.ModelViewSet):
     def my_applications(self, request):
         """Получение заявок текущего пользователя (для ВУЗов)."""
         if request.user.is_authenticated and request.user.is_university:
-            applications = Application.objects.filter(university=request.user)
-            serializer = self.get_serializer(applications, many=True)
-            return Response(serializer.data)
+            applications = self.filter_queryset(self.optimize_queryset(
+                Application.objects.filter(university=request.user)
+            ))
+            return Response(self.serialize_list(applications))
         return Response({"detail": "Необходима аутентификация как ВУЗ."}, status=403)
+    
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """
+        Число заявок по статусам и дням создания, для администраторов - и по ВУЗам.
+        
+        Считается по таблице ApplicationStat (см. stats.py), поэтому стоимость
+        запроса зависит от числа групп, а не от числа заявок. Фильтры - в
+        ApplicationStatFilter.
+        """
+        user = request.user
+        stats = ApplicationStat.objects.all()
+        if user.is_university:
+            stats = stats.filter(university=user)
+        elif not user.is_admin:
+            return Response({"detail": "Статистика доступна ВУЗам и администраторам."}, status=403)
+        stats = ApplicationStatFilter().filter_queryset(request, stats, self)
+        return Response(summarize(stats, by_university=user.is_admin))
+    
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        """
+        Пакетная загрузка заявок (JSON-массив или NDJSON), только для персонала.
+        
+        Корректные строки создаются пачками в одной транзакции, ошибки
+        возвращаются по номерам строк и не прерывают загрузку.
+        """
+        if not isinstance(request.data, list):
+            return Response({"detail": "Ожидается список заявок."}, status=400)
+        if len(request.data) > settings.APPLICATION_BULK_MAX_ROWS:
+            return Response(
+                {"detail": f"Не более {settings.APPLICATION_BULK_MAX_ROWS} заявок за запрос."},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        
+        try:
+            chunk_size = int(request.query_params.get('chunk_size', settings.APPLICATION_BULK_CHUNK_SIZE))
+        except ValueError:
+            return Response({"detail": "chunk_size должен быть числом."}, status=400)
+        chunk_size = max(1, min(chunk_size, settings.APPLICATION_BULK_CHUNK_SIZE_MAX))
+        
+        serializer = self.get_serializer(data=request.data, many=True, context={
+            **self.get_serializer_context(), 'chunk_size': chunk_size,
+        })
+        serializer.is_valid()
+        applications = serializer.save()
+        
+        errors = [
+            {"row": row, "errors": detail}
+            for row, detail in sorted(serializer.row_errors.items())
+        ]
+        return Response(
+            {
+                "created": len(applications),
+                "failed": len(errors),
+                "ids": [application.pk for application in applications],
+                "errors": errors,
+            },
+            status=status.HTTP_201_CREATED if applications else status.HTTP_400_BAD_REQUEST,
+        )
+    
+    @action(detail=False, methods=['post'])
+    def transition(self, request):
+        """
+        Перевод заявок в другой статус: {"ids": [...], "status": "..."}.
+        
+        Переводятся только заявки, доступные пользователю и находящиеся в
+        статусе, из которого переход разрешен (Application.TRANSITIONS);
+        остальные возвращаются в счетчиках not_allowed (по текущему статусу)
+        и not_found. Перевод выполняется целиком в одной транзакции, см.
+        workflow.py.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            result = apply_transition(
+                self.get_queryset(), serializer.validated_data['ids'],
+                serializer.validated_data['status'], user=request.user,
+            )
+        except TransitionConflict:
+            return Response(
+                {"detail": "Заявки изменились во время перевода, повторите запрос."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response({"status": serializer.validated_data['status'], **result})
+    
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """
+        Потоковая выгрузка заявок в NDJSON (по умолчанию) или CSV (?format=csv).
+        
+        Поддерживает фильтры ApplicationFilter и ?fields=.
+        Записи читаются курсором пачками по APPLICATION_EXPORT_CHUNK_SIZE
+        (на PostgreSQL - серверным курсором), поэтому память не зависит от
+        числа заявок.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = ApplicationFastSerializer(
+            context=self.get_serializer_context(), fields=self.get_sparse_param('fields'),
+        )
+        # База выбирается сейчас: строки читаются уже после выхода из представления.
+        rows = serializer.values(queryset.using(queryset.db).order_by('-created_at', '-id'))
+        chunk_size = settings.APPLICATION_EXPORT_CHUNK_SIZE
+        
+        def chunks():
+            iterator = rows.iterator(chunk_size=chunk_size)
+            while chunk := list(islice(iterator, chunk_size)):
+                yield serializer.to_representation(chunk)
+        
+        renderer = request.accepted_renderer
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f'{content_type}; charset={renderer.charset}'
+        response = StreamingHttpResponse(
+            renderer.stream(chunks(), serializer.field_names), content_type=content_type,
+        )
+        response['Content-Disposition'] = f'attachment; filename="applications.{renderer.format}"'
+        return response
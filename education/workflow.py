@@ -0,0 +1,91 @@
+"""
+Переходы статусов заявок.
+
+Допустимые переходы заданы в Application.TRANSITIONS. apply_transition() переводит
+заявки пачками: для каждой пачки id читает (блокируя на PostgreSQL) только
+ключи строк, выполняет один условный UPDATE (id и прочитанный статус),
+записывает журнал ApplicationStatusChange через bulk_create и применяет
+приращения статистики заявок (stats.py). Экземпляры Application не создаются
+и сигналы не отправляются, поэтому все побочные эффекты сохранения
+выполняются здесь же, в одной транзакции.
+"""
+
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Application, ApplicationStatusChange
+from .stats import apply_deltas, stat_key
+
+
+class TransitionConflict(Exception):
+    """Заявки изменились параллельно между чтением и UPDATE; транзакция отменена."""
+
+
+def allowed_sources(status):
+    """Статусы, из которых разрешен переход в `status`."""
+    return [source for source, targets in Application.TRANSITIONS.items() if status in targets]
+
+
+def apply_transition(queryset, ids, status, user=None, chunk_size=None):
+    """
+    Переводит заявки `queryset` с указанными id в статус `status`.
+
+    Возвращает {'updated': число, 'not_allowed': {текущий статус: число},
+    'not_found': число}; не найдены id вне `queryset`.
+    """
+    chunk_size = chunk_size or settings.APPLICATION_TRANSITION_CHUNK_SIZE
+    sources = allowed_sources(status)
+    ids = sorted(set(ids))
+    using = queryset.db
+    updated, not_found = 0, 0
+    not_allowed = Counter()
+
+    with transaction.atomic(using=using):
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            rows = list(
+                queryset.filter(pk__in=chunk).select_for_update().order_by()
+                .values_list('id', 'status', 'university_id', 'created_at')
+            )
+            not_found += len(chunk) - len(rows)
+            movable, by_source = [], {}
+            for row in rows:
+                if row[1] in sources:
+                    movable.append(row)
+                    by_source.setdefault(row[1], []).append(row[0])
+                else:
+                    not_allowed[row[1]] += 1
+            if not movable:
+                continue
+
+            now = timezone.now()
+            # Условие включает прочитанный статус каждой строки, поэтому
+            # UPDATE не тронет заявку, статус которой успели изменить.
+            condition = Q()
+            for source, pks in by_source.items():
+                condition |= Q(pk__in=pks, status=source)
+            count = Application.objects.using(using).filter(condition).update(status=status, updated_at=now)
+            # На PostgreSQL строки заблокированы выше; SQLite блокирует базу
+            # только при записи, и параллельная смена статуса отменяет перевод.
+            if count != len(movable):
+                raise TransitionConflict()
+            updated += count
+
+            ApplicationStatusChange.objects.using(using).bulk_create(
+                ApplicationStatusChange(
+                    application_id=pk, from_status=previous, to_status=status,
+                    changed_by=user, changed_at=now,
+                )
+                for pk, previous, _, _ in movable
+            )
+            deltas = Counter()
+            for _, previous, university_id, created_at in movable:
+                deltas[stat_key(university_id, previous, created_at)] -= 1
+                deltas[stat_key(university_id, status, created_at)] += 1
+            apply_deltas(deltas, using)
+
+    return {'updated': updated, 'not_allowed': dict(not_allowed), 'not_found': not_found}
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
-from .models import User, PasswordResetToken
+from .models import User, PasswordResetToken, OutgoingEmail
 
 
 @admin.register(User)
@@ -39,3 +39,14 @@ class PasswordResetTokenAdmin(admin.ModelAdmin):
     list_filter = ('is_used', 'created_at')
     search_fields = ('user__email', 'token')
     readonly_fields = ('token', 'created_at')
+
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """Административная панель для очереди исходящих писем."""
+    
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('subject',)
+    readonly_fields = ('created_at', 'sent_at', 'claim_token', 'claimed_at', 'last_error')
@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework import authentication, exceptions
+
+from .tokens import ACCESS, InvalidToken, verify_token
+
+User = get_user_model()
+
+
+def user_from_claims(claims):
+    """
+    Создает пользователя из утверждений токена без запроса к базе.
+
+    Остальные поля модели отложены (deferred) и загрузятся из базы только при
+    обращении к ним. Сохранять такого пользователя следует с явным
+    update_fields, чтобы не перезаписать роль значениями из токена.
+    """
+    known = {
+        'id': claims['uid'],
+        'role': claims['role'],
+        'is_staff': claims['staff'],
+        'is_superuser': claims['su'],
+        'is_active': True,
+    }
+    # from_db ожидает значения в порядке полей модели.
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in known]
+    return User.from_db('default', field_names, [known[name] for name in field_names])
+
+
+class TokenAuthentication(authentication.BaseAuthentication):
+    """Аутентификация по заголовку "Authorization: Bearer <токен доступа>"."""
+    
+    keyword = 'Bearer'
+    
+    def authenticate(self, request):
+        header = authentication.get_authorization_header(request).split()
+        if not header or header[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(header) != 2:
+            raise exceptions.AuthenticationFailed(_('Некорректный заголовок Authorization.'))
+        
+        try:
+            claims = verify_token(header[1].decode('latin-1'), ACCESS)
+        except (InvalidToken, UnicodeError) as exc:
+            raise exceptions.AuthenticationFailed(str(exc))
+        
+        request.token_claims = claims
+        return user_from_claims(claims), claims
+    
+    def authenticate_header(self, request):
+        return self.keyword
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Кеши, данные которых видны только текущему процессу.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, Tags.security, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Списки отозванных токенов (tokens.py) и ведра троттлинга (throttling.py)
+    хранятся в кеше по умолчанию. В кеше одного процесса отзыв токена при
+    выходе или смене пароля действует только в этом процессе, а лимит
+    попыток умножается на число процессов.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Error(
+        f'Кеш по умолчанию {backend} не общий для процессов сервера: отозванные токены '
+        f'принимаются другими процессами, а лимиты троттлинга действуют в каждом отдельно.',
+        hint='Задайте CACHE_BACKEND общего кеша (Redis, Memcached, база данных или, '
+             'для одного сервера, файловый кеш).',
+        id='users.E001',
+    )]
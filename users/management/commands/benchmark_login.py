@@ -0,0 +1,128 @@
+import logging
+import queue
+import random
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client
+
+from backend.benchmark import benchmark_database, percentiles
+from users.views import UserViewSet
+
+User = get_user_model()
+
+PASSWORD = 'Benchmark-pass-123'
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет задержку входа (p50/p99) легитимных пользователей во время подбора '
+        'паролей без ограничения частоты и с ограничителями users.throttling. '
+        'Прогон выполняется на временной базе данных.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Всего попыток входа в прогоне.')
+        parser.add_argument('--attack-ratio', type=float, default=0.9, help='Доля атакующих попыток.')
+        parser.add_argument('--attackers', type=int, default=2, help='Число IP-адресов атакующих.')
+        parser.add_argument('--users', type=int, default=20, help='Число легитимных пользователей.')
+        parser.add_argument('--rate', type=float, default=20.0, help='Поступающих попыток в секунду.')
+        parser.add_argument('--workers', type=int, default=16, help='Число потоков-обработчиков.')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        # Отклоненные попытки (400, 429) не выводим в журнал
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        with benchmark_database():
+            password = make_password(PASSWORD)
+            User.objects.bulk_create(
+                User(email=f'user{index}@example.com', password=password)
+                for index in range(options['users'])
+            )
+            attempts = self.build_attempts(options)
+
+            original = UserViewSet.auth_throttle_classes
+            try:
+                for name, throttles in (('unthrottled', []), ('throttled', original)):
+                    UserViewSet.auth_throttle_classes = throttles
+                    cache.clear()
+                    self.report(name, self.run(attempts, options['rate'], options['workers']))
+            finally:
+                UserViewSet.auth_throttle_classes = original
+                cache.clear()
+
+    def build_attempts(self, options):
+        """Перемешанный список попыток: (вид, IP, email, пароль)."""
+        rng = random.Random(options['seed'])
+        attack = round(options['requests'] * options['attack_ratio'])
+        attempts = [
+            # Подбор по списку утекших адресов: неверные пароли к существующим и чужим email
+            ('attack', f'203.0.113.{index % options["attackers"] + 1}',
+             f'user{rng.randrange(options["users"] * 5)}@example.com', f'guess-{index}')
+            for index in range(attack)
+        ]
+        attempts += [
+            ('legit', f'198.51.100.{index % 250 + 1}', f'user{index % options["users"]}@example.com', PASSWORD)
+            for index in range(options['requests'] - attack)
+        ]
+        rng.shuffle(attempts)
+        return attempts
+
+    def run(self, attempts, rate, workers):
+        """
+        Попытки поступают с постоянной частотой `rate` независимо от того,
+        успевает ли сервер их обработать, и обрабатываются `workers` потоками.
+        Задержка считается от момента поступления, то есть включает ожидание
+        в очереди. Возвращает {вид: [(статус, секунды)]}.
+        """
+        tasks = queue.Queue()
+        for index, attempt in enumerate(attempts):
+            tasks.put((index / rate, attempt))
+        results = {'attack': [], 'legit': []}
+        lock = threading.Lock()
+        started = time.perf_counter()
+
+        def worker():
+            client = Client()
+            while True:
+                try:
+                    arrival, (kind, ip, email, password) = tasks.get_nowait()
+                except queue.Empty:
+                    break
+                delay = started + arrival - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                response = client.post(
+                    '/api/users/login/', {'email': email, 'password': password},
+                    content_type='application/json', REMOTE_ADDR=ip,
+                )
+                elapsed = time.perf_counter() - started - arrival
+                client.cookies.clear()
+                with lock:
+                    results[kind].append((response.status_code, elapsed))
+            connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results['wall'] = time.perf_counter() - started
+        return results
+
+    def report(self, name, results):
+        self.stdout.write(f'{name} (всего {results["wall"]:.1f} с)')
+        for kind in ('legit', 'attack'):
+            samples = results[kind]
+            stats = percentiles([elapsed * 1000 for _, elapsed in samples], points=(50, 99))
+            ok = sum(1 for code, _ in samples if code == 200)
+            throttled = sum(1 for code, _ in samples if code == 429)
+            self.stdout.write(
+                f'  {kind:<7} n={len(samples):<5} p50: {stats["p50"]:>8.1f} мс   '
+                f'p99: {stats["p99"]:>8.1f} мс   200: {ok:<5} 429: {throttled}'
+            )
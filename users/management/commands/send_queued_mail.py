@@ -0,0 +1,50 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users.outbox import send_batch
+
+logger = logging.getLogger('users.outbox')
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди пачками через одно SMTP-соединение.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Число писем в пачке.',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, опрашивая очередь.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help='Пауза между опросами пустой очереди в режиме --loop, с.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, failed = send_batch(options['batch_size'])
+            except Exception:
+                if not options['loop']:
+                    raise
+                logger.exception('Ошибка при отправке писем из очереди')
+                time.sleep(options['interval'])
+                continue
+            if sent or failed:
+                self.stdout.write(f'Отправлено: {sent}, ошибок: {failed}')
+            if sent:
+                # Очередь не пуста - сразу берем следующую пачку.
+                continue
+            if failed:
+                # Ни одно письмо не ушло (например, SMTP недоступен): письма
+                # пачки отложены, остальные ждут следующего опроса.
+                logger.error('Не удалось отправить ни одного письма из пачки (%d)', failed)
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
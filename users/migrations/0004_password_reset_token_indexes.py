@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='passwordresettoken',
+            index=models.Index(fields=['token', 'is_used', 'created_at'], name='reset_token_lookup_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passwordresettoken',
+            index=models.Index(fields=['created_at'], name='reset_token_created_idx'),
+        ),
+    ]
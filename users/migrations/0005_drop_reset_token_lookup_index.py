@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:49
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_password_reset_token_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='passwordresettoken',
+            name='reset_token_lookup_idx',
+        ),
+    ]
@@ -1,3 +1,6 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.utils import timezone
@@ -98,6 +101,20 @@ class User(AbstractBaseUser, PermissionsMixin):
         return self.role == self.UNIVERSITY
 
 
+class PasswordResetTokenQuerySet(models.QuerySet):
+    """Действующие и устаревшие токены; срок жизни - PASSWORD_RESET_TOKEN_TTL секунд."""
+    
+    def expiry_cutoff(self):
+        return timezone.now() - timedelta(seconds=settings.PASSWORD_RESET_TOKEN_TTL)
+    
+    def valid(self):
+        return self.filter(is_used=False, created_at__gte=self.expiry_cutoff())
+    
+    def stale(self):
+        """Использованные и просроченные токены, которые можно удалить."""
+        return self.filter(models.Q(is_used=True) | models.Q(created_at__lt=self.expiry_cutoff()))
+
+
 class PasswordResetToken(models.Model):
     """Модель для хранения токенов сброса пароля."""
     
@@ -106,5 +123,55 @@ class PasswordResetToken(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_used = models.BooleanField(default=False)
     
+    objects = PasswordResetTokenQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            # Токен при подтверждении сброса ищется по уникальному индексу поля
+            # token. Индекс ниже нужен для поиска устаревших токенов командой
+            # cleanup_stale_data.
+            models.Index(fields=['created_at'], name='reset_token_created_idx'),
+        ]
+    
     def __str__(self):
         return f"Token for {self.user.email}"
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку (см. команду send_queued_mail)."""
+    
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    
+    STATUS_CHOICES = [
+        (STATUS_PENDING, _('В очереди')),
+        (STATUS_SENDING, _('Отправляется')),
+        (STATUS_SENT, _('Отправлено')),
+        (STATUS_FAILED, _('Ошибка')),
+    ]
+    
+    subject = models.CharField(_('Тема'), max_length=255)
+    body = models.TextField(_('Текст'))
+    from_email = models.CharField(_('Отправитель'), max_length=255)
+    recipients = models.JSONField(_('Получатели'))
+    status = models.CharField(_('Статус'), max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(_('Попыток'), default=0)
+    next_attempt_at = models.DateTimeField(_('Следующая попытка'), default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(_('Последняя ошибка'), blank=True)
+    created_at = models.DateTimeField(_('Дата создания'), auto_now_add=True)
+    sent_at = models.DateTimeField(_('Дата отправки'), null=True, blank=True)
+    
+    class Meta:
+        verbose_name = _('исходящее письмо')
+        verbose_name_plural = _('исходящие письма')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outgoing_email_queue_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)}"
@@ -0,0 +1,132 @@
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger('users.outbox')
+
+
+def enqueue_email(subject, body, recipients, from_email=None):
+    """Ставит письмо в очередь. Отправка выполняется командой send_queued_mail."""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipients),
+    )
+
+
+def claim_batch(size):
+    """
+    Забирает из очереди до `size` писем, готовых к отправке.
+
+    Письма помечаются уникальным токеном условным UPDATE, поэтому несколько
+    обработчиков не отправят одно письмо дважды. Письма, зависшие в статусе
+    "отправляется" дольше EMAIL_OUTBOX_CLAIM_TIMEOUT, возвращаются в работу.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT)
+    ready = (
+        Q(status=OutgoingEmail.STATUS_PENDING, next_attempt_at__lte=now)
+        | Q(status=OutgoingEmail.STATUS_SENDING, claimed_at__lt=stale)
+    )
+    ids = list(
+        OutgoingEmail.objects.filter(ready)
+        .order_by('next_attempt_at')
+        .values_list('id', flat=True)[:size]
+    )
+    if not ids:
+        return []
+
+    token = uuid.uuid4().hex
+    OutgoingEmail.objects.filter(ready, id__in=ids).update(
+        status=OutgoingEmail.STATUS_SENDING, claim_token=token, claimed_at=now,
+    )
+    return list(OutgoingEmail.objects.filter(claim_token=token, status=OutgoingEmail.STATUS_SENDING))
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.EMAIL_OUTBOX_MAX_RETRY_DELAY))
+
+
+def send_batch(size=None, connection=None):
+    """
+    Отправляет одну пачку писем через одно SMTP-соединение.
+
+    Возвращает пару (отправлено, ошибок).
+    """
+    emails = claim_batch(size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not emails:
+        return 0, 0
+
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        # SMTP-сервер недоступен: вся пачка возвращается в очередь с задержкой.
+        for email in emails:
+            record_failure(email, exc)
+        return 0, len(emails)
+
+    sent = failed = 0
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject, email.body, email.from_email, email.recipients,
+                connection=connection,
+            )
+            try:
+                connection.send_messages([message])
+            except Exception as exc:
+                failed += 1
+                record_failure(email, exc)
+            else:
+                sent += 1
+                email.attempts += 1
+                email.status = OutgoingEmail.STATUS_SENT
+                email.sent_at = timezone.now()
+                email.last_error = ''
+                save_result(email)
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def record_failure(email, exc):
+    """Отмечает неудачную попытку: повтор с задержкой или окончательная ошибка."""
+    email.attempts += 1
+    email.last_error = str(exc)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = OutgoingEmail.STATUS_FAILED
+    else:
+        email.status = OutgoingEmail.STATUS_PENDING
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    save_result(email)
+
+
+def save_result(email):
+    """
+    Записывает результат попытки, только если письмо все еще забрано этим
+    обработчиком. Если отправка длилась дольше EMAIL_OUTBOX_CLAIM_TIMEOUT,
+    письмо мог забрать другой обработчик, и его результат не перезаписывается.
+    """
+    updated = OutgoingEmail.objects.filter(
+        pk=email.pk, claim_token=email.claim_token, status=OutgoingEmail.STATUS_SENDING,
+    ).update(
+        status=email.status, attempts=email.attempts, next_attempt_at=email.next_attempt_at,
+        last_error=email.last_error, sent_at=email.sent_at, claim_token='',
+    )
+    if not updated:
+        logger.warning(
+            'Письмо %s забрано другим обработчиком, результат попытки (%s) не записан.',
+            email.pk, email.status,
+        )
+    return bool(updated)
@@ -1,13 +1,14 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model, authenticate
 from django.utils.translation import gettext_lazy as _
+from backend.metrics import SerializationTimingMixin
 from .models import PasswordResetToken
 import uuid
 
 User = get_user_model()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SerializationTimingMixin, serializers.ModelSerializer):
     """Сериализатор для модели пользователя."""
     
     class Meta:
@@ -111,9 +112,9 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
             raise serializers.ValidationError({"password_confirm": _("Пароли не совпадают.")})
         
         try:
-            token_obj = PasswordResetToken.objects.get(token=attrs['token'], is_used=False)
+            token_obj = PasswordResetToken.objects.valid().get(token=attrs['token'])
         except PasswordResetToken.DoesNotExist:
-            raise serializers.ValidationError({"token": _("Недействительный или использованный токен.")})
+            raise serializers.ValidationError({"token": _("Недействительный, просроченный или использованный токен.")})
         
         attrs['token_obj'] = token_obj
         return attrs
@@ -135,4 +136,10 @@ class PasswordChangeSerializer(serializers.Serializer):
     def validate(self, attrs):
         if attrs['new_password'] != attrs['new_password_confirm']:
             raise serializers.ValidationError({"new_password_confirm": _("Пароли не совпадают.")})
-        return attrs 
\ No newline at end of file
+        return attrs 
+
+
+class TokenRefreshSerializer(serializers.Serializer):
+    """Сериализатор для обновления токенов."""
+    
+    refresh = serializers.CharField(required=True)
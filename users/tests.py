@@ -1,3 +1,266 @@
-from django.test import TestCase
+import io
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.checks import run_checks
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import User, OutgoingEmail, PasswordResetToken
+from .outbox import claim_batch, save_result, send_batch
+from .throttling import AuthIPThrottle
+
+
+class BrokenConnection:
+    """Почтовое соединение, которое не может отправить ни одного письма."""
+
+    def open(self):
+        return True
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class EmailOutboxTests(TestCase):
+    """Письма сброса пароля ставятся в очередь и отправляются отдельно."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        User.objects.create_user(email='user@example.com', password='pass')
+
+    def test_reset_password_request_enqueues(self):
+        response = self.client.post(
+            '/api/users/reset_password_request/', {'email': 'user@example.com'}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutgoingEmail.objects.filter(status=OutgoingEmail.STATUS_PENDING).count(), 1)
+
+        self.assertEqual(send_batch(), (1, 0))
+        self.assertEqual(mail.outbox[0].to, ['user@example.com'])
+        self.assertEqual(OutgoingEmail.objects.get().status, OutgoingEmail.STATUS_SENT)
+        self.assertEqual(send_batch(), (0, 0))
+
+    def test_retry_with_backoff(self):
+        self.client.post('/api/users/reset_password_request/', {'email': 'user@example.com'}, format='json')
+
+        self.assertEqual(send_batch(connection=BrokenConnection()), (0, 1))
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.status, OutgoingEmail.STATUS_PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, email.created_at)
+        # Следующая попытка еще не наступила.
+        self.assertEqual(send_batch(), (0, 0))
+
+    def test_connection_failure(self):
+        for _ in range(2):
+            self.client.post('/api/users/reset_password_request/', {'email': 'user@example.com'}, format='json')
+
+        with mock.patch('users.outbox.get_connection') as get_connection:
+            get_connection.return_value.open.side_effect = ConnectionRefusedError('SMTP недоступен')
+            self.assertEqual(send_batch(), (0, 2))
+        for email in OutgoingEmail.objects.all():
+            self.assertEqual(email.status, OutgoingEmail.STATUS_PENDING)
+            self.assertEqual(email.attempts, 1)
+            self.assertEqual(email.claim_token, '')
+            self.assertGreater(email.next_attempt_at, email.created_at)
+            self.assertIn('SMTP недоступен', email.last_error)
+
+    def test_expired_claim_does_not_overwrite_new_owner(self):
+        self.client.post('/api/users/reset_password_request/', {'email': 'user@example.com'}, format='json')
+        email, = claim_batch(10)
+        # Пока отправка шла, письмо забрал другой обработчик.
+        OutgoingEmail.objects.update(claim_token='other')
+        email.status = OutgoingEmail.STATUS_SENT
+        email.attempts += 1
+        with self.assertLogs('users.outbox', 'WARNING'):
+            self.assertFalse(save_result(email))
+        stored = OutgoingEmail.objects.get()
+        self.assertEqual((stored.status, stored.attempts, stored.claim_token), (OutgoingEmail.STATUS_SENDING, 0, 'other'))
+
+    def test_loop_survives_errors(self):
+        # Первая пачка падает, вторая прерывает бесконечный цикл.
+        with mock.patch('users.management.commands.send_queued_mail.send_batch',
+                        side_effect=[DatabaseError('база недоступна'), KeyboardInterrupt]), \
+                mock.patch('users.management.commands.send_queued_mail.time.sleep') as sleep, \
+                self.assertLogs('users.outbox', 'ERROR'):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command('send_queued_mail', loop=True, stdout=io.StringIO())
+        sleep.assert_called_once()
+
+
+class TokenAuthenticationTests(TestCase):
+    """Токены проверяются без запросов к базе, обновляются с ротацией и отзываются."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='university@example.com', password='Old-pass-123', role=User.UNIVERSITY,
+        )
+        response = self.client.post(
+            '/api/users/login/', {'email': 'university@example.com', 'password': 'Old-pass-123'},
+            format='json',
+        )
+        self.tokens = response.json()
+        # Проверяем именно токены, а не сессию, созданную при входе.
+        self.client.logout()
+
+    def auth(self, token):
+        return {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def test_access_without_user_query(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                '/api/publications/my_publications/', **self.auth(self.tokens['access']),
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.wsgi_request.user.is_university)
+        # Единственный запрос - выборка публикаций, без загрузки пользователя.
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_refresh_rotation(self):
+        response = self.client.post('/api/users/refresh/', {'refresh': self.tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.json())
+
+        response = self.client.post('/api/users/refresh/', {'refresh': self.tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_change_password_revokes_tokens(self):
+        response = self.client.post(
+            '/api/users/change_password/',
+            {'old_password': 'Old-pass-123', 'new_password': 'New-pass-456', 'new_password_confirm': 'New-pass-456'},
+            format='json', **self.auth(self.tokens['access']),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('New-pass-456'))
+        self.assertEqual(self.user.role, User.UNIVERSITY)
+
+        response = self.client.get('/api/applications/', **self.auth(self.tokens['access']))
+        self.assertEqual(response.status_code, 401)
+
+    def test_deploy_check_requires_shared_cache(self):
+        def errors():
+            return [error.id for error in run_checks(include_deployment_checks=True) if error.id == 'users.E001']
+
+        local = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        with override_settings(CACHES=local):
+            self.assertEqual(errors(), ['users.E001'])
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp'}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(errors(), [])
+
+
+class AuthThrottlingTests(TestCase):
+    """Попытки входа и сброса пароля ограничиваются до проверки пароля."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        User.objects.create_user(email='user@example.com', password='pass')
+
+    def login(self, email, password, ip='192.0.2.1'):
+        return self.client.post(
+            '/api/users/login/', {'email': email, 'password': password},
+            format='json', REMOTE_ADDR=ip,
+        )
+
+    def test_identity_bucket_rejects_before_hashing(self):
+        # Попытки с разных адресов расходуют одно ведро учетной записи.
+        for index in range(5):
+            self.assertEqual(self.login('User@example.com', 'wrong', ip=f'192.0.2.{index}').status_code, 400)
+
+        with mock.patch('users.serializers.authenticate') as authenticate:
+            response = self.login('user@example.com', 'pass', ip='192.0.2.100')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        authenticate.assert_not_called()
+
+        # Другая учетная запись не затронута.
+        self.assertEqual(self.login('other@example.com', 'wrong', ip='192.0.2.100').status_code, 400)
+
+    def test_ip_bucket_covers_reset_password(self):
+        with mock.patch.object(AuthIPThrottle, 'THROTTLE_RATES', {'auth_ip': '2/min'}):
+            self.assertEqual(self.login('a@example.com', 'wrong').status_code, 400)
+            response = self.client.post(
+                '/api/users/reset_password_request/', {'email': 'user@example.com'},
+                format='json', REMOTE_ADDR='192.0.2.1',
+            )
+            self.assertEqual(response.status_code, 200)
+            response = self.client.post(
+                '/api/users/reset_password_confirm/',
+                {'token': 'x' * 64, 'password': 'New-pass-456', 'password_confirm': 'New-pass-456'},
+                format='json', REMOTE_ADDR='192.0.2.1',
+            )
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(self.login('b@example.com', 'wrong', ip='192.0.2.2').status_code, 400)
+
+    def test_forwarded_for_does_not_reset_ip_bucket(self):
+        with mock.patch.object(AuthIPThrottle, 'THROTTLE_RATES', {'auth_ip': '2/min'}):
+            statuses = [
+                self.client.post(
+                    '/api/users/login/', {'email': f'user{index}@example.com', 'password': 'wrong'},
+                    format='json', REMOTE_ADDR='192.0.2.1', HTTP_X_FORWARDED_FOR=f'198.51.100.{index}',
+                ).status_code
+                for index in range(3)
+            ]
+        self.assertEqual(statuses, [400, 400, 429])
+
+    def test_concurrent_requests_do_not_overspend(self):
+        throttle = AuthIPThrottle()
+        throttle.key = 'throttle_auth_ip_test'
+        # Пока ведро занято другим запросом, токен не выдается.
+        cache.add(f'{throttle.key}:lock', True)
+        request = mock.Mock(META={'REMOTE_ADDR': '192.0.2.1'})
+        with mock.patch.object(AuthIPThrottle, 'get_cache_key', return_value=throttle.key):
+            self.assertFalse(throttle.allow_request(request, None))
+            cache.delete(f'{throttle.key}:lock')
+            self.assertTrue(throttle.allow_request(request, None))
+
+    def test_expired_lock_is_not_released_by_previous_owner(self):
+        throttle = AuthIPThrottle()
+        throttle.key = 'throttle_auth_ip_test'
+        lock = throttle.acquire_lock()
+        # Блокировка истекла, и ее взял другой запрос.
+        cache.set(f'{throttle.key}:lock', 'other')
+        throttle.release_lock(lock)
+        self.assertEqual(cache.get(f'{throttle.key}:lock'), 'other')
+
+
+class PasswordResetTokenExpiryTests(TestCase):
+    """Токен сброса пароля действует PASSWORD_RESET_TOKEN_TTL секунд и только один раз."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='user@example.com', password='pass')
+
+    def confirm(self, token):
+        return self.client.post('/api/users/reset_password_confirm/', {
+            'token': token, 'password': 'New-pass-123', 'password_confirm': 'New-pass-123',
+        }, format='json')
+
+    def test_expired_token(self):
+        PasswordResetToken.objects.create(user=self.user, token='expired')
+        PasswordResetToken.objects.update(created_at=timezone.now() - timedelta(days=2))
+        with self.settings(PASSWORD_RESET_TOKEN_TTL=24 * 60 * 60):
+            response = self.confirm('expired')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('token', response.json())
+
+    def test_token_used_once(self):
+        PasswordResetToken.objects.create(user=self.user, token='valid')
+        self.assertEqual(self.confirm('valid').status_code, 200)
+        self.assertEqual(self.confirm('valid').status_code, 400)
+        self.assertEqual(list(PasswordResetToken.objects.stale().values_list('token', flat=True)), ['valid'])
@@ -0,0 +1,117 @@
+"""
+Ограничение частоты попыток аутентификации.
+
+Каждая попытка входа или сброса пароля запускает проверку хеша PBKDF2, поэтому
+перебор паролей занимает все ядра процессора. Троттлинг выполняется в
+APIView.initial() до валидации сериализатора: отклоненный запрос не доходит
+до authenticate() и не стоит ни одного вычисления хеша.
+"""
+
+import hashlib
+import time
+import uuid
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Троттлинг по алгоритму "ведро с токенами".
+
+    Частота задается в DEFAULT_THROTTLE_RATES как у SimpleRateThrottle
+    ('10/min'): число запросов - емкость ведра, а токены восполняются
+    равномерно за период. В отличие от скользящего окна, в кеше хранится
+    только пара (токены, время обновления), а не история всех запросов.
+    """
+
+    # Чтение и запись ведра выполняются под блокировкой в кеше (cache.add),
+    # иначе одновременные запросы читают одно состояние и тратят токен
+    # несколько раз. Блокировка, которую не удалось взять за LOCK_WAIT
+    # секунд, считается перегрузкой, и запрос отклоняется. Ведра и
+    # блокировки общие для процессов, только если общий кеш по умолчанию
+    # (проверка users.E001); в LocMemCache лимит действует в каждом процессе.
+    LOCK_TIMEOUT = 1
+    LOCK_WAIT = 0.05
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        lock = self.acquire_lock()
+        if lock is None:
+            self.wait_time = 1
+            return False
+        try:
+            return self.take_token()
+        finally:
+            self.release_lock(lock)
+
+    def acquire_lock(self):
+        """Возвращает уникальное значение взятой блокировки или None."""
+        lock = uuid.uuid4().hex
+        deadline = time.monotonic() + self.LOCK_WAIT
+        while not self.cache.add(f'{self.key}:lock', lock, self.LOCK_TIMEOUT):
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.005)
+        return lock
+
+    def release_lock(self, lock):
+        # Блокировка могла истечь и достаться другому запросу: ее не удаляем.
+        if self.cache.get(f'{self.key}:lock') == lock:
+            self.cache.delete(f'{self.key}:lock')
+
+    def take_token(self):
+        capacity = self.num_requests
+        refill_rate = capacity / self.duration
+        self.now = self.timer()
+        tokens, updated = self.cache.get(self.key, (capacity, self.now))
+        tokens = min(capacity, tokens + (self.now - updated) * refill_rate)
+
+        if tokens < 1:
+            self.wait_time = (1 - tokens) / refill_rate
+            self.cache.set(self.key, (tokens, self.now), self.duration)
+            return False
+        self.cache.set(self.key, (tokens - 1, self.now), self.duration)
+        return True
+
+    def wait(self):
+        return getattr(self, 'wait_time', None)
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    """
+    Попытки аутентификации с одного IP-адреса. Адрес определяет get_ident():
+    X-Forwarded-For учитывается только за NUM_PROXIES доверенными прокси.
+    """
+
+    scope = 'auth_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class AuthIdentityThrottle(TokenBucketThrottle):
+    """
+    Попытки аутентификации для одной учетной записи: по email при входе и
+    запросе сброса пароля, по токену при подтверждении сброса. Защищает от
+    перебора пароля одного пользователя с множества адресов.
+    """
+
+    scope = 'auth_identity'
+    identity_fields = ('email', 'token')
+
+    def get_cache_key(self, request, view):
+        # Ошибка разбора тела (ParseError) здесь же возвращается клиенту как 400.
+        data = request.data
+        for field in self.identity_fields:
+            value = data.get(field) if hasattr(data, 'get') else None
+            if isinstance(value, str) and value.strip():
+                value = value.strip().lower() if field == 'email' else value.strip()
+                ident = hashlib.sha256(value.encode()).hexdigest()
+                return self.cache_format % {'scope': self.scope, 'ident': f'{field}:{ident}'}
+        return None
@@ -0,0 +1,115 @@
+"""
+Подписанные токены доступа и обновления.
+
+Токен - это словарь утверждений (claims), подписанный django.core.signing
+с SECRET_KEY. Проверка подписи и срока действия не требует обращения к базе;
+роль и флаги пользователя берутся из утверждений. Отозванные токены хранятся
+в кеше до истечения их срока действия.
+"""
+
+import time
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+ACCESS = 'access'
+REFRESH = 'refresh'
+
+SALT = 'users.tokens'
+REVOKED_PREFIX = 'token-revoked'
+
+
+class InvalidToken(Exception):
+    """Токен поврежден, просрочен, отозван или имеет неверный тип."""
+
+
+def _lifetime(token_type):
+    key = 'ACCESS_TOKEN_LIFETIME' if token_type == ACCESS else 'REFRESH_TOKEN_LIFETIME'
+    return int(settings.TOKEN_AUTH[key].total_seconds())
+
+
+def issue_token(user, token_type):
+    now = time.time()
+    claims = {
+        'typ': token_type,
+        'jti': uuid.uuid4().hex,
+        'uid': user.pk,
+        'role': user.role,
+        'staff': user.is_staff,
+        'su': user.is_superuser,
+        'iat': now,
+        'exp': now + _lifetime(token_type),
+    }
+    return signing.dumps(claims, salt=SALT, compress=True)
+
+
+def issue_token_pair(user):
+    """Возвращает новую пару токенов для ответа API."""
+    return {
+        'access': issue_token(user, ACCESS),
+        'refresh': issue_token(user, REFRESH),
+        'access_expires_in': _lifetime(ACCESS),
+    }
+
+
+def _jti_key(jti):
+    return f'{REVOKED_PREFIX}:jti:{jti}'
+
+
+def _user_key(user_id):
+    return f'{REVOKED_PREFIX}:user:{user_id}'
+
+
+def verify_token(token, token_type):
+    """Проверяет токен и возвращает его утверждения или вызывает InvalidToken."""
+    try:
+        claims = signing.loads(token, salt=SALT)
+    except signing.BadSignature:
+        raise InvalidToken('Недействительный токен.')
+    if claims.get('typ') != token_type:
+        raise InvalidToken('Неверный тип токена.')
+    if claims['exp'] <= time.time():
+        raise InvalidToken('Срок действия токена истек.')
+
+    revoked = cache.get_many([_jti_key(claims['jti']), _user_key(claims['uid'])])
+    if _jti_key(claims['jti']) in revoked:
+        raise InvalidToken('Токен отозван.')
+    revoked_before = revoked.get(_user_key(claims['uid']))
+    if revoked_before is not None and claims['iat'] <= revoked_before:
+        raise InvalidToken('Токен отозван.')
+    return claims
+
+
+def revoke_token(claims):
+    """
+    Отзывает один токен до конца срока его действия.
+
+    Возвращает False, если токен уже был отозван.
+    """
+    ttl = int(claims['exp'] - time.time()) + 1
+    return cache.add(_jti_key(claims['jti']), True, timeout=ttl)
+
+
+def revoke_user_tokens(user):
+    """Отзывает все ранее выданные токены пользователя (например, после смены пароля)."""
+    cache.set(_user_key(user.pk), time.time(), timeout=_lifetime(REFRESH))
+
+
+def rotate_refresh_token(token, load_user):
+    """
+    Обменивает токен обновления на новую пару токенов.
+
+    Использованный токен обновления отзывается, поэтому повторно его
+    применить нельзя. `load_user(user_id)` должна вернуть актуального
+    активного пользователя или None: роль в новых токенах берется из базы.
+    """
+    claims = verify_token(token, REFRESH)
+    user = load_user(claims['uid'])
+    if user is None:
+        raise InvalidToken('Пользователь не найден или неактивен.')
+    if not revoke_token(claims):
+        # Параллельный запрос уже обменял этот токен.
+        raise InvalidToken('Токен отозван.')
+    return issue_token_pair(user)
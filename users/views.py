@@ -4,13 +4,18 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.contrib.auth import login, logout, get_user_model
 from django.utils.crypto import get_random_string
-from django.core.mail import send_mail
 from django.conf import settings
 from .models import PasswordResetToken
+from .outbox import enqueue_email
+from .throttling import AuthIPThrottle, AuthIdentityThrottle
+from .tokens import (
+    REFRESH, InvalidToken, issue_token_pair, revoke_token,
+    revoke_user_tokens, rotate_refresh_token, verify_token
+)
 from .serializers import (
     UserSerializer, UserCreateSerializer, UniversityCreateSerializer, LoginSerializer,
     PasswordResetRequestSerializer, PasswordResetConfirmSerializer,
-    PasswordChangeSerializer
+    PasswordChangeSerializer, TokenRefreshSerializer
 )
 
 User = get_user_model()
@@ -21,17 +26,27 @@ class UserViewSet(viewsets.ModelViewSet):
     
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    # Действия, запускающие проверку или установку пароля, и их ограничители частоты
+    auth_throttled_actions = ('login', 'reset_password_request', 'reset_password_confirm')
+    auth_throttle_classes = [AuthIPThrottle, AuthIdentityThrottle]
     
     def get_permissions(self):
         """Определяет права доступа в зависимости от действия."""
-        if self.action in ['create', 'register_university', 'login', 'reset_password_request', 'reset_password_confirm']:
+        if self.action in ['create', 'register_university', 'login', 'refresh',
+                           'reset_password_request', 'reset_password_confirm']:
             permission_classes = [permissions.AllowAny]
-        elif self.action in ['retrieve', 'update', 'partial_update', 'change_password']:
+        elif self.action in ['retrieve', 'update', 'partial_update', 'change_password', 'logout']:
             permission_classes = [permissions.IsAuthenticated]
         else:
             permission_classes = [permissions.IsAdminUser]
         return [permission() for permission in permission_classes]
     
+    def get_throttles(self):
+        """Ограничивает частоту попыток аутентификации по IP и по учетной записи."""
+        if self.action in self.auth_throttled_actions:
+            return [throttle() for throttle in self.auth_throttle_classes]
+        return super().get_throttles()
+    
     def get_serializer_class(self):
         """Возвращает соответствующий сериализатор в зависимости от действия."""
         if self.action == 'create':
@@ -46,6 +61,8 @@ class UserViewSet(viewsets.ModelViewSet):
             return PasswordResetConfirmSerializer
         elif self.action == 'change_password':
             return PasswordChangeSerializer
+        elif self.action == 'refresh':
+            return TokenRefreshSerializer
         return self.serializer_class
     
     @action(detail=False, methods=['post'])
@@ -72,11 +89,35 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data['user']
         login(request, user)
-        return Response(UserSerializer(user).data)
+        return Response({**UserSerializer(user).data, **issue_token_pair(user)})
+    
+    @action(detail=False, methods=['post'])
+    def refresh(self, request):
+        """Обмен токена обновления на новую пару токенов."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            tokens = rotate_refresh_token(
+                serializer.validated_data['refresh'],
+                lambda pk: User.objects.filter(pk=pk, is_active=True).first(),
+            )
+        except InvalidToken as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_401_UNAUTHORIZED)
+        return Response(tokens)
     
     @action(detail=False, methods=['post'])
     def logout(self, request):
         """Выход пользователя."""
+        # Отзыв токена доступа текущего запроса и переданного токена обновления
+        claims = getattr(request, 'token_claims', None)
+        if claims is not None:
+            revoke_token(claims)
+        refresh = request.data.get('refresh')
+        if refresh:
+            try:
+                revoke_token(verify_token(refresh, REFRESH))
+            except InvalidToken:
+                pass
         logout(request)
         return Response({"detail": "Успешный выход из системы."})
     
@@ -93,14 +134,12 @@ class UserViewSet(viewsets.ModelViewSet):
         token = get_random_string(64)
         PasswordResetToken.objects.create(user=user, token=token)
         
-        # Отправка письма
+        # Письмо ставится в очередь и отправляется командой send_queued_mail
         reset_url = f"{settings.FRONTEND_URL}/reset-password/{token}/"
-        send_mail(
+        enqueue_email(
             'Сброс пароля',
             f'Для сброса пароля перейдите по ссылке: {reset_url}',
-            settings.DEFAULT_FROM_EMAIL,
             [email],
-            fail_silently=False,
         )
         
         return Response({"detail": "Инструкции по сбросу пароля отправлены на указанный email."})
@@ -115,6 +154,7 @@ class UserViewSet(viewsets.ModelViewSet):
         user = token_obj.user
         user.set_password(serializer.validated_data['password'])
         user.save()
+        revoke_user_tokens(user)
         
         # Отметка токена как использованного
         token_obj.is_used = True
@@ -130,7 +170,9 @@ class UserViewSet(viewsets.ModelViewSet):
         
         user = request.user
         user.set_password(serializer.validated_data['new_password'])
-        user.save()
+        # Пользователь из токена загружен частично: сохраняем только пароль
+        user.save(update_fields=['password'])
+        revoke_user_tokens(user)
         
         return Response({"detail": "Пароль успешно изменен."})
     